@@ -1,27 +1,38 @@
 """The AI Automation Suggester integration."""
 import logging
+from functools import partial
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.typing import ConfigType
 
 from .api import async_register_http_views
+from .batch import BATCH_POLL_INTERVAL
 from .const import (
     ATTR_CUSTOM_PROMPT,
     ATTR_PROVIDER_CONFIG,
+    CONF_BATCH_AUTOMATIC_RUNS,
+    CONF_HISTORY_SAVE_DELAY,
     CONF_PROVIDER,
     CONFIG_VERSION,
+    DEFAULT_BATCH_AUTOMATIC_RUNS,
+    DEFAULT_HISTORY_SAVE_DELAY,
     DOMAIN,
     PLATFORMS,
+    SERVICE_CANCEL_GENERATION,
     SERVICE_CLEAR_HISTORY,
     SERVICE_GENERATE_SUGGESTIONS,
     SERVICE_UPDATE_SUGGESTION,
 )
 from .coordinator import AIAutomationCoordinator
 from .error_utils import sanitize_provider_error
+from .generation_queue import PRIORITY_AUTOMATIC
+from .litellm_loader import async_import_litellm
 from .store import async_get_suggestion_store
+from .websocket import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -66,6 +77,7 @@ GENERATE_SUGGESTIONS_SCHEMA = vol.Schema(
         vol.Optional("automation_limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
         vol.Optional("script_read_yaml", default=False): bool,
         vol.Optional("script_limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+        vol.Optional("batch", default=False): bool,
     }
 )
 
@@ -77,10 +89,18 @@ UPDATE_SUGGESTION_SCHEMA = vol.Schema(
     }
 )
 
+CANCEL_GENERATION_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PROVIDER_CONFIG): str,
+        vol.Optional("clear_queue", default=False): bool,
+    }
+)
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the AI Automation Suggester component."""
     hass.data.setdefault(DOMAIN, {})
     async_register_http_views(hass)
+    async_register_websocket_commands(hass)
 
     async def handle_generate_suggestions(call: ServiceCall) -> None:
         """Handle the generate_suggestions service call."""
@@ -111,6 +131,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
                 automation_limit=call.data.get("automation_limit", 100),
                 script_read_yaml=call.data.get("script_read_yaml", False),
                 script_limit=call.data.get("script_limit", 100),
+                batch=call.data.get("batch", False),
             )
 
         except ServiceValidationError:
@@ -126,6 +147,21 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
         await async_get_suggestion_store(hass).async_clear()
 
+    async def handle_cancel_generation(call: ServiceCall) -> None:
+        """Cancel running (and optionally queued) generations."""
+
+        provider_config = call.data.get(ATTR_PROVIDER_CONFIG)
+        if provider_config:
+            coordinator = hass.data[DOMAIN].get(provider_config)
+            if not isinstance(coordinator, AIAutomationCoordinator):
+                raise ServiceValidationError("Provider configuration not found")
+            coordinators = [coordinator]
+        else:
+            coordinators = [coord for coord in hass.data[DOMAIN].values() if isinstance(coord, AIAutomationCoordinator)]
+        for coordinator in coordinators:
+            if await coordinator.async_cancel_generation(clear_queue=call.data["clear_queue"]):
+                _LOGGER.info("Cancelled suggestion generation for %s", coordinator.entry.title)
+
     async def handle_update_suggestion(call: ServiceCall) -> None:
         """Update a stored suggestion status."""
 
@@ -147,6 +183,12 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         SERVICE_CLEAR_HISTORY,
         handle_clear_history,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CANCEL_GENERATION,
+        handle_cancel_generation,
+        schema=CANCEL_GENERATION_SCHEMA,
+    )
     hass.services.async_register(
         DOMAIN,
         SERVICE_UPDATE_SUGGESTION,
@@ -162,8 +204,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if CONF_PROVIDER not in entry.data:
             raise ConfigEntryNotReady("Provider not specified in config")
 
+        if entry.options.get(CONF_PROVIDER, entry.data[CONF_PROVIDER]) == "LiteLLM":
+            # Importing LiteLLM takes seconds; do it in an executor now rather than on the loop mid-request.
+            await async_import_litellm(hass)
+
         coordinator = AIAutomationCoordinator(hass, entry)
         hass.data[DOMAIN][entry.entry_id] = coordinator
+        # History is shared by all entries; the shortest write-behind window of the loaded entries applies.
+        suggestion_store = async_get_suggestion_store(hass)
+        suggestion_store.configure_save_delay(
+            entry.entry_id, float(entry.options.get(CONF_HISTORY_SAVE_DELAY, DEFAULT_HISTORY_SAVE_DELAY))
+        )
+        entry.async_on_unload(partial(suggestion_store.unconfigure_save_delay, entry.entry_id))
+        entry.async_on_unload(coordinator.async_start_tracking())
 
         # Use the new async_forward_entry_setups method (plural) instead of the deprecated async_forward_entry_setup.
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -176,13 +229,33 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
+        if coordinator.ollama_warmup_enabled:
+            hass.async_create_background_task(coordinator.async_warmup(), f"{DOMAIN} Ollama warmup")
+
+        async def poll_batch_jobs(_now=None):
+            try:
+                await coordinator.async_poll_batch_jobs()
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.warning("Batch job polling failed for %s: %s", entry.title, sanitize_provider_error(err))
+
+        # Jobs submitted before a restart are still pending; check them now and then periodically.
+        hass.async_create_background_task(poll_batch_jobs(), f"{DOMAIN} batch poll")
+        entry.async_on_unload(async_track_time_interval(hass, poll_batch_jobs, BATCH_POLL_INTERVAL))
+
         @callback
         def handle_custom_event(event):
             _LOGGER.debug("Received custom event '%s', triggering suggestions with all_entities=True", event.event_type)
             hass.async_create_task(coordinator_request_all_suggestions())
 
         async def coordinator_request_all_suggestions():
-            await coordinator.async_generate_suggestions(all_entities=True)
+            if coordinator.ollama_warmup_enabled:
+                # Load the model while entities are collected and the prompt is built.
+                hass.async_create_background_task(coordinator.async_warmup(), f"{DOMAIN} Ollama warmup")
+            await coordinator.async_generate_suggestions(
+                all_entities=True,
+                batch=entry.options.get(CONF_BATCH_AUTOMATIC_RUNS, DEFAULT_BATCH_AUTOMATIC_RUNS),
+                priority=PRIORITY_AUTOMATIC,
+            )
 
         entry.async_on_unload(hass.bus.async_listen("ai_automation_suggester_update", handle_custom_event))
 
@@ -198,6 +271,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
         if unload_ok:
             hass.data[DOMAIN].pop(entry.entry_id)
+            await async_get_suggestion_store(hass).async_flush()
         return unload_ok
     except Exception as err:
         _LOGGER.error("Error unloading entry: %s", err)
@@ -2,24 +2,81 @@
 
 from __future__ import annotations
 
-from aiohttp import web
+from aiohttp import hdrs, web
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
 
+from .cache_utils import LRUCache
+from .history_query import (
+    HistoryQuery,
+    QueryError,
+    accepts_gzip,
+    encode_body,
+    etag_matches,
+    make_etag,
+    select_records,
+)
 from .store import async_get_suggestion_store
 
+# Encoded bodies kept per (store revision, query, gzip); polls of an
+# unchanged history reuse them instead of serializing again.
+RESPONSE_CACHE_SIZE = 32
+
 
 class AISuggestionsView(HomeAssistantView):
-    """Return stored suggestions for Lovelace cards and dashboards."""
+    """Return stored suggestions for Lovelace cards and dashboards.
+
+    Without ``limit`` or ``cursor`` the response is the plain newest-first
+    list used by the custom card. ``status``, ``provider`` (comma-separated)
+    and ``since`` filter it; ``limit``/``cursor`` switch to a paged envelope
+    with ``next_cursor``. Responses carry a strong ETag derived from the
+    store revision and answer a matching ``If-None-Match`` with 304.
+    """
 
     url = "/api/ai_automation_suggester/suggestions"
     name = "api:ai_automation_suggester:suggestions"
     requires_auth = True
 
+    def __init__(self) -> None:
+        self._bodies: LRUCache[tuple[bytes, bool]] = LRUCache(RESPONSE_CACHE_SIZE)
+
     async def get(self, request: web.Request) -> web.Response:
         hass: HomeAssistant = request.app["hass"]
+        try:
+            query = HistoryQuery.from_params(request.query)
+        except QueryError as err:
+            return self.json({"success": False, "error": str(err)}, status_code=400)
+
         store = async_get_suggestion_store(hass)
-        return self.json(await store.async_list())
+        records = await store.async_list()
+        revision = store.revision
+        headers = {hdrs.CACHE_CONTROL: "no-cache", hdrs.VARY: hdrs.ACCEPT_ENCODING}
+        if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+        for etag in (make_etag(revision, query, gzipped=True), make_etag(revision, query)):
+            if etag_matches(if_none_match, etag):
+                headers[hdrs.ETAG] = etag
+                return web.Response(status=304, headers=headers)
+
+        allow_gzip = accepts_gzip(request.headers.get(hdrs.ACCEPT_ENCODING))
+        cache_key = (revision, query.key, allow_gzip)
+        cached = self._bodies.get(cache_key)
+        if cached is None:
+            try:
+                page, next_cursor = select_records(records, query)
+            except QueryError as err:
+                return self.json({"success": False, "error": str(err)}, status_code=400)
+            payload = (
+                {"suggestions": page, "next_cursor": next_cursor, "revision": revision} if query.paginated else page
+            )
+            cached = encode_body(json_bytes(payload), allow_gzip=allow_gzip)
+            self._bodies.set(cache_key, cached)
+
+        body, gzipped = cached
+        headers[hdrs.ETAG] = make_etag(revision, query, gzipped=gzipped)
+        if gzipped:
+            headers[hdrs.CONTENT_ENCODING] = "gzip"
+        return web.Response(body=body, content_type="application/json", headers=headers)
 
 
 class AISuggestionActionView(HomeAssistantView):
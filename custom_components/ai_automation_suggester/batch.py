@@ -0,0 +1,234 @@
+"""Submit shard prompts as provider batch jobs and collect their results."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, VERSION_ANTHROPIC
+
+BATCH_STORE_VERSION = 1
+BATCH_STORE_KEY = f"{DOMAIN}.batch_jobs"
+HASS_BATCH_JOBS_KEY = "_batch_jobs"
+
+BATCH_PROVIDERS = ("OpenAI", "Anthropic")
+BATCH_POLL_INTERVAL = timedelta(minutes=10)
+# Polls that may fail to store a finished batch before its run is recorded as failed.
+BATCH_INGEST_ATTEMPTS = 3
+BATCH_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=300)
+
+OPENAI_API_BASE = "https://api.openai.com/v1"
+ANTHROPIC_API_BASE = "https://api.anthropic.com/v1"
+
+_OPENAI_TERMINAL = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+class BatchError(RuntimeError):
+    """Raised when a batch API request fails."""
+
+
+@dataclass(frozen=True)
+class BatchStatus:
+    """Provider-reported progress of one batch job."""
+
+    status: str
+    done: bool
+    results: tuple[str, ...] = ()
+    counts: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Response body, or error, for one request in a batch."""
+
+    body: dict[str, Any] | None
+    error: str | None = None
+
+
+class _BatchClient:
+    def __init__(self, session: aiohttp.ClientSession, headers: dict[str, str], base_url: str) -> None:
+        self._session = session
+        self._headers = headers
+        self._base_url = base_url.rstrip("/")
+
+    def _url(self, path: str) -> str:
+        return path if path.startswith(("http://", "https://")) else f"{self._base_url}/{path.lstrip('/')}"
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> str:
+        async with self._session.request(
+            method, self._url(path), headers=self._headers, timeout=BATCH_REQUEST_TIMEOUT, **kwargs
+        ) as response:
+            text = await response.text()
+            if not 200 <= response.status < 300:
+                raise BatchError(f"Batch API error {response.status}: {text[:500]}")
+            return text
+
+    async def _request_json(self, method: str, path: str, **kwargs: Any) -> dict[str, Any]:
+        text = await self._request(method, path, **kwargs)
+        try:
+            return json.loads(text)
+        except ValueError as err:
+            raise BatchError(f"Batch API returned a non-JSON response: {text[:200]}") from err
+
+    async def _jsonl(self, path: str) -> list[dict[str, Any]]:
+        lines = []
+        for line in (await self._request("GET", path)).splitlines():
+            if line.strip():
+                try:
+                    lines.append(json.loads(line))
+                except ValueError:
+                    continue
+        return lines
+
+
+class OpenAIBatchClient(_BatchClient):
+    """OpenAI Batch API: upload a JSONL file, create a batch, download the output file."""
+
+    def __init__(self, session: aiohttp.ClientSession, api_key: str, base_url: str | None = None) -> None:
+        super().__init__(session, {"Authorization": f"Bearer {api_key}"}, base_url or OPENAI_API_BASE)
+
+    async def async_submit(self, endpoint: str, requests: list[tuple[str, dict[str, Any]]]) -> str:
+        """Submit ``(custom_id, body)`` requests for ``endpoint`` and return the batch ID."""
+
+        payload = "\n".join(
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": endpoint, "body": body})
+            for custom_id, body in requests
+        )
+        form = aiohttp.FormData()
+        form.add_field("purpose", "batch")
+        form.add_field("file", payload.encode("utf-8"), filename="suggestions.jsonl", content_type="application/jsonl")
+        upload = await self._request_json("POST", "files", data=form)
+        batch = await self._request_json(
+            "POST",
+            "batches",
+            json={"input_file_id": upload["id"], "endpoint": endpoint, "completion_window": "24h"},
+        )
+        return batch["id"]
+
+    async def async_status(self, batch_id: str) -> BatchStatus:
+        batch = await self._request_json("GET", f"batches/{batch_id}")
+        status = str(batch.get("status"))
+        # Expired and cancelled batches still return the requests that finished.
+        files = tuple(
+            f"files/{batch[key]}/content" for key in ("output_file_id", "error_file_id") if batch.get(key)
+        )
+        return BatchStatus(status, status in _OPENAI_TERMINAL, files, batch.get("request_counts") or {})
+
+    async def async_results(self, status: BatchStatus) -> dict[str, BatchResult]:
+        results: dict[str, BatchResult] = {}
+        for path in status.results:
+            for line in await self._jsonl(path):
+                response = line.get("response") or {}
+                if response.get("status_code") == 200 and isinstance(response.get("body"), dict):
+                    results[line.get("custom_id")] = BatchResult(response["body"])
+                else:
+                    error = line.get("error") or (response.get("body") or {}).get("error") or response
+                    results[line.get("custom_id")] = BatchResult(None, str(error)[:500])
+        return results
+
+
+class AnthropicBatchClient(_BatchClient):
+    """Anthropic Message Batches API."""
+
+    def __init__(self, session: aiohttp.ClientSession, api_key: str, base_url: str | None = None) -> None:
+        super().__init__(
+            session,
+            {"x-api-key": api_key, "anthropic-version": VERSION_ANTHROPIC},
+            base_url or ANTHROPIC_API_BASE,
+        )
+
+    async def async_submit(self, endpoint: str, requests: list[tuple[str, dict[str, Any]]]) -> str:
+        batch = await self._request_json(
+            "POST",
+            "messages/batches",
+            json={"requests": [{"custom_id": custom_id, "params": body} for custom_id, body in requests]},
+        )
+        return batch["id"]
+
+    async def async_status(self, batch_id: str) -> BatchStatus:
+        batch = await self._request_json("GET", f"messages/batches/{batch_id}")
+        status = str(batch.get("processing_status"))
+        results = (batch["results_url"],) if batch.get("results_url") else ()
+        return BatchStatus(status, status == "ended", results, batch.get("request_counts") or {})
+
+    async def async_results(self, status: BatchStatus) -> dict[str, BatchResult]:
+        results: dict[str, BatchResult] = {}
+        for path in status.results:
+            for line in await self._jsonl(path):
+                result = line.get("result") or {}
+                if result.get("type") == "succeeded" and isinstance(result.get("message"), dict):
+                    results[line.get("custom_id")] = BatchResult(result["message"])
+                else:
+                    error = result.get("error") or result.get("type") or "missing result"
+                    results[line.get("custom_id")] = BatchResult(None, str(error)[:500])
+        return results
+
+
+class BatchJobStore:
+    """Submitted batch jobs, persisted so polling resumes after a restart.
+
+    Jobs are few and must not be lost between submission and ingestion, so
+    every change is saved immediately.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, BATCH_STORE_VERSION, BATCH_STORE_KEY)
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def _async_load(self) -> None:
+        if self._loaded:
+            return
+        data = await self._store.async_load() or {}
+        for job in data.get("jobs") or []:
+            if isinstance(job, dict) and job.get("id") and job.get("batch_id"):
+                self._jobs[job["id"]] = job
+        self._loaded = True
+
+    async def _async_save(self) -> None:
+        await self._store.async_save({"jobs": list(self._jobs.values())})
+
+    async def async_list(self, entry_id: str | None = None) -> list[dict[str, Any]]:
+        """Return copies of the stored jobs, optionally for one config entry."""
+
+        async with self._lock:
+            await self._async_load()
+            return [dict(job) for job in self._jobs.values() if entry_id is None or job.get("entry_id") == entry_id]
+
+    async def async_add(self, job: dict[str, Any]) -> None:
+        async with self._lock:
+            await self._async_load()
+            self._jobs[job["id"]] = dict(job)
+            await self._async_save()
+
+    async def async_update(self, job_id: str, **changes: Any) -> None:
+        async with self._lock:
+            await self._async_load()
+            if job_id in self._jobs:
+                self._jobs[job_id].update(changes)
+                await self._async_save()
+
+    async def async_remove(self, job_id: str) -> None:
+        async with self._lock:
+            await self._async_load()
+            if self._jobs.pop(job_id, None) is not None:
+                await self._async_save()
+
+
+def async_get_batch_job_store(hass: HomeAssistant) -> BatchJobStore:
+    """Return the batch job store shared by all config entries."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    store = domain_data.get(HASS_BATCH_JOBS_KEY)
+    if store is None:
+        store = BatchJobStore(hass)
+        domain_data[HASS_BATCH_JOBS_KEY] = store
+    return store
@@ -0,0 +1,67 @@
+"""Small in-memory cache helpers."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Generic, TypeVar
+
+_V = TypeVar("_V")
+
+
+class LRUCache(Generic[_V]):
+    """Size-bounded least-recently-used cache with hit and miss counters."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[Hashable, _V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def get(self, key: Hashable) -> _V | None:
+        """Return a cached value and mark it recently used, or None."""
+
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: _V) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def pop(self, key: Hashable) -> _V | None:
+        """Remove and return a cached value without touching the counters."""
+
+        return self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached values; counters are kept for diagnostics."""
+
+        self._items.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters suitable for diagnostics."""
+
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
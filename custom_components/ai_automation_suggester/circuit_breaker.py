@@ -0,0 +1,243 @@
+"""Provider circuit breaker with rate-limit-aware backoff, shared by config entries."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import time
+from collections.abc import Callable, Mapping
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+HASS_CIRCUIT_BREAKERS_KEY = "_circuit_breakers"
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_BASE_DELAY = 5.0  # seconds before the first half-open probe
+DEFAULT_MAX_DELAY = 600.0
+# Server-provided waits are honoured, but never beyond this.
+MAX_RETRY_AFTER = 3600.0
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+def is_transient_status(status: int) -> bool:
+    """Return whether an HTTP status means the provider is overloaded or down."""
+
+    return status in (408, 429) or status >= 500
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse ``1.5``, ``20ms``, or Go-style ``6m0s`` durations into seconds."""
+
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def _parse_timestamp(value: str, now: float) -> float | None:
+    try:
+        moment = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() - now
+
+
+def retry_after_seconds(headers: Mapping[str, str] | None, now: float | None = None) -> float | None:
+    """Return how long the provider asked clients to wait, if it said so.
+
+    Reads ``Retry-After`` (seconds or an HTTP date), ``retry-after-ms``, and,
+    for exhausted limits only, the OpenAI/Groq ``x-ratelimit-reset-*``
+    durations and Anthropic ``anthropic-ratelimit-*-reset`` timestamps.
+    """
+
+    if not headers:
+        return None
+    now = time.time() if now is None else now
+    lowered = {str(key).lower(): str(value) for key, value in headers.items()}
+    waits: list[float] = []
+
+    if "retry-after-ms" in lowered:
+        duration = _parse_duration(lowered["retry-after-ms"])
+        if duration is not None:
+            waits.append(duration / 1000)
+    if "retry-after" in lowered:
+        value = lowered["retry-after"]
+        duration = _parse_duration(value)
+        if duration is None:
+            try:
+                duration = parsedate_to_datetime(value).timestamp() - now
+            except (TypeError, ValueError):
+                duration = None
+        if duration is not None:
+            waits.append(duration)
+
+    for key, value in lowered.items():
+        if key.startswith("x-ratelimit-reset-"):
+            remaining = lowered.get("x-ratelimit-remaining-" + key.removeprefix("x-ratelimit-reset-"))
+            if remaining is not None and remaining.strip() in ("0", "0.0"):
+                duration = _parse_duration(value)
+                if duration is not None:
+                    waits.append(duration)
+        elif key.startswith("anthropic-ratelimit-") and key.endswith("-reset"):
+            remaining = lowered.get(key.removesuffix("-reset") + "-remaining")
+            if remaining is not None and remaining.strip() == "0":
+                duration = _parse_timestamp(value, now)
+                if duration is not None:
+                    waits.append(duration)
+
+    if not waits:
+        return None
+    return min(MAX_RETRY_AFTER, max(0.0, max(waits)))
+
+
+class CircuitBreaker:
+    """Closed, open, and half-open circuit for one provider.
+
+    Consecutive transient failures open the circuit after
+    ``failure_threshold`` attempts; a rate limit opens it at once. While
+    open, requests fail locally. After the wait, which honours the
+    provider's rate-limit headers and otherwise backs off exponentially with
+    jitter, one half-open probe is let through: success closes the circuit
+    and failure reopens it with a longer wait.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._jitter = jitter
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._retry_at: float | None = None
+        self._probing = False
+        self.last_retry_after: float | None = None
+
+    @property
+    def state(self) -> str:
+        """Return the current state, moving to half-open once the wait is over."""
+
+        if self._state == CIRCUIT_OPEN and self._clock() >= self._open_until:
+            return CIRCUIT_HALF_OPEN
+        return self._state
+
+    def before_request(self) -> bool:
+        """Raise :class:`CircuitOpenError` unless a request may be sent now.
+
+        Returns True when the request is the half-open probe; the caller
+        must then record its outcome or call :meth:`release_probe`.
+        """
+
+        state = self.state
+        if state == CIRCUIT_OPEN:
+            wait = max(0.0, self._open_until - self._clock())
+            raise CircuitOpenError(
+                f"{self.name} is unavailable after repeated failures; requests resume in {wait:.0f} seconds."
+            )
+        if state == CIRCUIT_HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError(f"{self.name} is recovering; waiting for a test request to finish.")
+            self._state = CIRCUIT_HALF_OPEN
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a request the provider answered."""
+
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._retry_at = None
+        self._probing = False
+
+    def record_failure(self, retry_after: float | None = None, *, rate_limited: bool = False) -> None:
+        """Count a transient failure, opening the circuit when warranted."""
+
+        self._failures += 1
+        self.last_retry_after = retry_after
+        if rate_limited or retry_after is not None or self.state == CIRCUIT_HALF_OPEN:
+            self._open(retry_after)
+        elif self._failures >= self.failure_threshold:
+            self._open(None)
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Allow another probe when one ended without an outcome, e.g. when cancelled."""
+
+        self._probing = False
+
+    def _open(self, retry_after: float | None) -> None:
+        self._trips += 1
+        if retry_after is not None:
+            delay = min(MAX_RETRY_AFTER, max(0.0, retry_after))
+        else:
+            backoff = min(self.max_delay, self.base_delay * 2 ** (self._trips - 1))
+            # Equal jitter keeps at least half the backoff while spreading retries.
+            delay = backoff / 2 + self._jitter() * backoff / 2
+        self._state = CIRCUIT_OPEN
+        self._open_until = self._clock() + delay
+        self._retry_at = self._wall_clock() + delay
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return state suitable for sensor attributes and diagnostics."""
+
+        state = self.state
+        return {
+            "circuit_state": state,
+            "consecutive_failures": self._failures,
+            "circuit_retry_at": (
+                datetime.fromtimestamp(self._retry_at, tz=timezone.utc).isoformat()
+                if state == CIRCUIT_OPEN and self._retry_at is not None
+                else None
+            ),
+        }
+
+
+def async_get_circuit_breaker(hass: HomeAssistant, provider: str, credential: str) -> CircuitBreaker:
+    """Return the breaker shared by every entry using this provider credential."""
+
+    digest = hashlib.sha256(credential.encode("utf-8")).hexdigest()[:16]
+    breakers = hass.data.setdefault(DOMAIN, {}).setdefault(HASS_CIRCUIT_BREAKERS_KEY, {})
+    breaker = breakers.get((provider, digest))
+    if breaker is None:
+        breaker = CircuitBreaker(provider)
+        breakers[(provider, digest)] = breaker
+    return breaker
@@ -16,6 +16,8 @@ from .const import (
     CONF_ANTHROPIC_API_KEY,
     CONF_ANTHROPIC_MODEL,
     CONF_ANTHROPIC_TEMPERATURE,
+    CONF_BATCH_AUTOMATIC_RUNS,
+    CONF_COMPACT_ATTRIBUTES,
     CONF_CUSTOM_OPENAI_API_KEY,
     CONF_CUSTOM_OPENAI_ENDPOINT,
     CONF_CUSTOM_OPENAI_MODEL,
@@ -24,6 +26,7 @@ from .const import (
     CONF_EXCLUDED_AREAS,
     CONF_EXCLUDED_DOMAINS,
     CONF_EXCLUDED_ENTITIES,
+    CONF_GENERATION_DEADLINE,
     CONF_GENERIC_OPENAI_API_KEY,
     CONF_GENERIC_OPENAI_ENABLE_VALIDATION,
     CONF_GENERIC_OPENAI_ENDPOINT,
@@ -36,7 +39,10 @@ from .const import (
     CONF_GROQ_API_KEY,
     CONF_GROQ_MODEL,
     CONF_GROQ_TEMPERATURE,
+    CONF_HEDGE_DELAY,
+    CONF_HEDGE_ENTRY,
     CONF_HISTORY_RETENTION,
+    CONF_HISTORY_SAVE_DELAY,
     CONF_LITELLM_API_BASE,
     CONF_LITELLM_API_KEY,
     CONF_LITELLM_MODEL,
@@ -56,9 +62,11 @@ from .const import (
     CONF_OLLAMA_DISABLE_THINK,
     CONF_OLLAMA_HTTPS,
     CONF_OLLAMA_IP_ADDRESS,
+    CONF_OLLAMA_KEEP_ALIVE,
     CONF_OLLAMA_MODEL,
     CONF_OLLAMA_PORT,
     CONF_OLLAMA_TEMPERATURE,
+    CONF_OLLAMA_WARMUP,
     CONF_OPENAI_API_KEY,
     CONF_OPENAI_AZURE_API_KEY,
     CONF_OPENAI_AZURE_API_VERSION,
@@ -76,18 +84,46 @@ from .const import (
     CONF_PERPLEXITY_MODEL,
     CONF_PERPLEXITY_TEMPERATURE,
     CONF_PROVIDER,
+    CONF_RATE_LIMIT_RPM,
+    CONF_RATE_LIMIT_TPM,
     CONF_REQUEST_TIMEOUT,
     CONF_REQUESTY_API_KEY,
     CONF_REQUESTY_MODEL,
     CONF_REQUESTY_REASONING_MAX_TOKENS,
     CONF_REQUESTY_TEMPERATURE,
+    CONF_RESPONSE_CACHE,
+    CONF_RESPONSE_CACHE_ANY_TEMPERATURE,
+    CONF_RESPONSE_CACHE_TTL,
+    CONF_SHARD_CONCURRENCY,
+    CONF_SHARD_GROUPING,
+    CONF_SHARDED_GENERATION,
+    CONF_STABLE_PROMPT_LAYOUT,
+    CONF_STREAM_RESPONSES,
     CONFIG_VERSION,
+    DEFAULT_BATCH_AUTOMATIC_RUNS,
+    DEFAULT_COMPACT_ATTRIBUTES,
+    DEFAULT_GENERATION_DEADLINE,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_HEDGE_ENTRY,
     DEFAULT_HISTORY_RETENTION,
+    DEFAULT_HISTORY_SAVE_DELAY,
     DEFAULT_MAX_INPUT_TOKENS,
     DEFAULT_MAX_OUTPUT_TOKENS,
     DEFAULT_MODELS,
+    DEFAULT_OLLAMA_KEEP_ALIVE,
+    DEFAULT_OLLAMA_WARMUP,
     DEFAULT_OPENAI_REASONING_EFFORT,
+    DEFAULT_RATE_LIMIT_RPM,
+    DEFAULT_RATE_LIMIT_TPM,
     DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_RESPONSE_CACHE,
+    DEFAULT_RESPONSE_CACHE_ANY_TEMPERATURE,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_SHARD_CONCURRENCY,
+    DEFAULT_SHARD_GROUPING,
+    DEFAULT_SHARDED_GENERATION,
+    DEFAULT_STABLE_PROMPT_LAYOUT,
+    DEFAULT_STREAM_RESPONSES,
     DEFAULT_TEMPERATURE,
     DOMAIN,
     ENDPOINT_PERPLEXITY,
@@ -762,8 +798,43 @@ class AIAutomationOptionsFlowHandler(config_entries.OptionsFlow):
             vol.Optional(CONF_EXCLUDED_AREAS, default=self._get_option(CONF_EXCLUDED_AREAS, "")): str,
             vol.Optional(CONF_HISTORY_RETENTION, default=self._get_option(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION)): vol.All(vol.Coerce(int), vol.Range(min=1, max=250)),
             vol.Optional(CONF_REQUEST_TIMEOUT, default=self._get_option(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT)): vol.All(vol.Coerce(int), vol.Range(min=10, max=1800)),
+            vol.Optional(CONF_GENERATION_DEADLINE, default=self._get_option(CONF_GENERATION_DEADLINE, DEFAULT_GENERATION_DEADLINE)): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+            vol.Optional(CONF_HISTORY_SAVE_DELAY, default=self._get_option(CONF_HISTORY_SAVE_DELAY, DEFAULT_HISTORY_SAVE_DELAY)): vol.All(vol.Coerce(int), vol.Range(min=0, max=300)),
+
+            vol.Optional(CONF_STREAM_RESPONSES, default=self._get_option(CONF_STREAM_RESPONSES, DEFAULT_STREAM_RESPONSES)): bool,
+            vol.Optional(CONF_RESPONSE_CACHE, default=self._get_option(CONF_RESPONSE_CACHE, DEFAULT_RESPONSE_CACHE)): bool,
+            vol.Optional(CONF_RESPONSE_CACHE_TTL, default=self._get_option(CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL)): vol.All(vol.Coerce(int), vol.Range(min=60, max=604800)),
+            vol.Optional(CONF_RESPONSE_CACHE_ANY_TEMPERATURE, default=self._get_option(CONF_RESPONSE_CACHE_ANY_TEMPERATURE, DEFAULT_RESPONSE_CACHE_ANY_TEMPERATURE)): bool,
+            vol.Optional(CONF_STABLE_PROMPT_LAYOUT, default=self._get_option(CONF_STABLE_PROMPT_LAYOUT, DEFAULT_STABLE_PROMPT_LAYOUT)): bool,
+            vol.Optional(CONF_SHARDED_GENERATION, default=self._get_option(CONF_SHARDED_GENERATION, DEFAULT_SHARDED_GENERATION)): bool,
+            vol.Optional(CONF_SHARD_GROUPING, default=self._get_option(CONF_SHARD_GROUPING, DEFAULT_SHARD_GROUPING)): vol.In(["area", "domain", "size"]),
+            vol.Optional(CONF_SHARD_CONCURRENCY, default=self._get_option(CONF_SHARD_CONCURRENCY, DEFAULT_SHARD_CONCURRENCY)): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
+            vol.Optional(CONF_COMPACT_ATTRIBUTES, default=self._get_option(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES)): bool,
         }
 
+        # Hedging races another configured provider entry when this one is slow.
+        hedge_entries = {DEFAULT_HEDGE_ENTRY: "Disabled"}
+        hedge_entries.update(
+            {
+                entry.entry_id: entry.title
+                for entry in self.hass.config_entries.async_entries(DOMAIN)
+                if entry.entry_id != self._config_entry.entry_id
+            }
+        )
+        hedge_entry = self._get_option(CONF_HEDGE_ENTRY, DEFAULT_HEDGE_ENTRY)
+        if hedge_entry not in hedge_entries:
+            hedge_entry = DEFAULT_HEDGE_ENTRY
+        schema[vol.Optional(CONF_HEDGE_ENTRY, default=hedge_entry)] = vol.In(hedge_entries)
+        schema[vol.Optional(CONF_HEDGE_DELAY, default=self._get_option(CONF_HEDGE_DELAY, DEFAULT_HEDGE_DELAY))] = vol.All(vol.Coerce(int), vol.Range(min=1, max=600))
+
+        # Client-side limits, shared by entries using the same credential.
+        schema[vol.Optional(CONF_RATE_LIMIT_RPM, default=self._get_option(CONF_RATE_LIMIT_RPM, DEFAULT_RATE_LIMIT_RPM))] = vol.All(vol.Coerce(int), vol.Range(min=0, max=100000))
+        schema[vol.Optional(CONF_RATE_LIMIT_TPM, default=self._get_option(CONF_RATE_LIMIT_TPM, DEFAULT_RATE_LIMIT_TPM))] = vol.All(vol.Coerce(int), vol.Range(min=0, max=100000000))
+
+        # Batch APIs trade same-day latency for lower prices on automatic runs.
+        if provider in ("OpenAI", "Anthropic"):
+            schema[vol.Optional(CONF_BATCH_AUTOMATIC_RUNS, default=self._get_option(CONF_BATCH_AUTOMATIC_RUNS, DEFAULT_BATCH_AUTOMATIC_RUNS))] = bool
+
         # provider‑specific editable fields
         if provider == "OpenAI":
             schema[vol.Optional(CONF_OPENAI_API_KEY, default=self._get_option(CONF_OPENAI_API_KEY))] = TextSelector(TextSelectorConfig(type="password"))
@@ -797,6 +868,8 @@ class AIAutomationOptionsFlowHandler(config_entries.OptionsFlow):
             schema[vol.Optional(CONF_OLLAMA_MODEL, default=self._get_option(CONF_OLLAMA_MODEL, DEFAULT_MODELS["Ollama"]))] = str
             schema[vol.Optional(CONF_OLLAMA_TEMPERATURE, default=self._get_option(CONF_OLLAMA_TEMPERATURE, DEFAULT_TEMPERATURE))] = vol.All(vol.Coerce(float), vol.Range(min=0.0, max=2.0))
             schema[vol.Optional(CONF_OLLAMA_DISABLE_THINK, default=self._get_option(CONF_OLLAMA_DISABLE_THINK, False))] = bool    
+            schema[vol.Optional(CONF_OLLAMA_KEEP_ALIVE, default=self._get_option(CONF_OLLAMA_KEEP_ALIVE, DEFAULT_OLLAMA_KEEP_ALIVE))] = str
+            schema[vol.Optional(CONF_OLLAMA_WARMUP, default=self._get_option(CONF_OLLAMA_WARMUP, DEFAULT_OLLAMA_WARMUP))] = bool
         elif provider == "Custom OpenAI":
             schema[vol.Optional(CONF_CUSTOM_OPENAI_ENDPOINT, default=self._get_option(CONF_CUSTOM_OPENAI_ENDPOINT))] = str
             schema[vol.Optional(CONF_CUSTOM_OPENAI_API_KEY, default=self._get_option(CONF_CUSTOM_OPENAI_API_KEY))] = TextSelector(TextSelectorConfig(type="password"))
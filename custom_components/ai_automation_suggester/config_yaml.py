@@ -0,0 +1,98 @@
+"""Cached, executor-backed rendering of automations.yaml and scripts.yaml."""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import yaml
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Prefer the LibYAML bindings; they parse and emit several times faster.
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+KIND_AUTOMATIONS = "automations"
+KIND_SCRIPTS = "scripts"
+
+
+@dataclass
+class _RenderedFile:
+    """Parsed items and the prompt blocks rendered from them so far."""
+
+    signature: tuple[int, int]
+    items: list[Any]
+    blocks: list[str] = field(default_factory=list)
+    warning: str | None = None
+
+
+def _parse_items(kind: str, content: str) -> tuple[list[Any], str | None]:
+    data = yaml.load(content, Loader=SafeLoader)  # noqa: S506 - SafeLoader variant
+    if kind == KIND_AUTOMATIONS:
+        data = data or []
+        if not isinstance(data, list):
+            return [], "automations.yaml did not parse as a list"
+        return [item for item in data if isinstance(item, dict)], None
+    data = data or {}
+    if not isinstance(data, dict):
+        return [], "scripts.yaml did not parse as a dict"
+    return [{script_id: script} for script_id, script in data.items() if isinstance(script, dict)], None
+
+
+def _render_block(kind: str, item: Any) -> str:
+    if kind == KIND_AUTOMATIONS:
+        dumped = yaml.dump([item], Dumper=SafeDumper, sort_keys=False)
+        return f"Automation YAML:\n```yaml\n{dumped}```\n---\n"
+    dumped = yaml.dump(item, Dumper=SafeDumper, sort_keys=False)
+    return f"Script YAML:\n```yaml\n{dumped}```\n---\n"
+
+
+class YamlBlockCache:
+    """Render YAML prompt blocks in the executor and reuse unchanged files.
+
+    Entries are keyed by file path and validated against the file's
+    modification time and size, so repeated generations skip YAML parsing
+    and dumping entirely until the file is edited.
+    """
+
+    def __init__(self) -> None:
+        self._files: dict[tuple[str, str], _RenderedFile] = {}
+
+    async def async_blocks(self, hass: HomeAssistant, kind: str, path: Path, limit: int) -> list[str]:
+        """Return up to ``limit`` rendered blocks for a configuration file."""
+
+        key = (kind, str(path))
+        try:
+            rendered = await hass.async_add_executor_job(self._load, kind, path, limit, self._files.get(key))
+        except FileNotFoundError:
+            _LOGGER.warning("%s.yaml file was not found", kind)
+            self._files.pop(key, None)
+            return []
+        except yaml.YAMLError as err:
+            _LOGGER.warning("Error parsing %s.yaml: %s", kind, err)
+            self._files.pop(key, None)
+            return []
+        self._files[key] = rendered
+        if rendered.warning:
+            _LOGGER.warning(rendered.warning)
+        return rendered.blocks[:limit]
+
+    @staticmethod
+    def _load(kind: str, path: Path, limit: int, cached: _RenderedFile | None) -> _RenderedFile:
+        """Stat, parse, and render in one executor job."""
+
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if cached is None or cached.signature != signature:
+            content = Path(path).read_text(encoding="utf-8")
+            items, warning = _parse_items(kind, content)
+            cached = _RenderedFile(signature, items, warning=warning)
+        # Render lazily so a small limit does not dump a very large file.
+        for item in cached.items[len(cached.blocks) : limit]:
+            cached.blocks.append(_render_block(kind, item))
+        return cached
@@ -26,6 +26,30 @@ DEFAULT_TEMPERATURE = 0.7
 DEFAULT_REQUEST_TIMEOUT = 900
 DEFAULT_HISTORY_RETENTION = 25
 DEFAULT_OPENAI_REASONING_EFFORT = "low"
+DEFAULT_STREAM_RESPONSES = False
+DEFAULT_HISTORY_SAVE_DELAY = 0  # seconds; 0 writes history immediately
+DEFAULT_COMPACT_ATTRIBUTES = False
+DEFAULT_GENERATION_DEADLINE = 0  # seconds; 0 uses the request timeout
+DEFAULT_RESPONSE_CACHE = False
+DEFAULT_RESPONSE_CACHE_TTL = 3600  # seconds
+DEFAULT_RESPONSE_CACHE_ANY_TEMPERATURE = False
+DEFAULT_STABLE_PROMPT_LAYOUT = False
+DEFAULT_SHARDED_GENERATION = False
+DEFAULT_SHARD_GROUPING = "area"
+DEFAULT_SHARD_CONCURRENCY = 3
+DEFAULT_HEDGE_ENTRY = ""  # no hedging
+DEFAULT_HEDGE_DELAY = 20  # seconds without output before hedging
+DEFAULT_RATE_LIMIT_RPM = 0  # 0 relies on limits reported by the provider
+DEFAULT_RATE_LIMIT_TPM = 0
+DEFAULT_BATCH_AUTOMATIC_RUNS = False
+DEFAULT_OLLAMA_KEEP_ALIVE = ""  # server default, usually 5 minutes
+DEFAULT_OLLAMA_WARMUP = False
+
+# Rendered per-entity prompt blocks kept between runs (per config entry)
+PROMPT_BLOCK_CACHE_SIZE = 5000
+
+# Upper bound on provider calls made by one sharded generation
+MAX_GENERATION_SHARDS = 16
 
 # ─────────────────────────────────────────────────────────────
 # Provider‑selection key
@@ -37,6 +61,22 @@ CONF_EXCLUDED_ENTITIES = "excluded_entities"
 CONF_EXCLUDED_AREAS = "excluded_areas"
 CONF_HISTORY_RETENTION = "history_retention"
 CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_STREAM_RESPONSES = "stream_responses"
+CONF_HISTORY_SAVE_DELAY = "history_save_delay"
+CONF_COMPACT_ATTRIBUTES = "compact_attributes"
+CONF_GENERATION_DEADLINE = "generation_deadline"
+CONF_RESPONSE_CACHE = "response_cache"
+CONF_RESPONSE_CACHE_TTL = "response_cache_ttl"
+CONF_RESPONSE_CACHE_ANY_TEMPERATURE = "response_cache_any_temperature"
+CONF_STABLE_PROMPT_LAYOUT = "stable_prompt_layout"
+CONF_SHARDED_GENERATION = "sharded_generation"
+CONF_SHARD_GROUPING = "shard_grouping"
+CONF_SHARD_CONCURRENCY = "shard_concurrency"
+CONF_HEDGE_ENTRY = "hedge_entry"
+CONF_HEDGE_DELAY = "hedge_delay"
+CONF_RATE_LIMIT_RPM = "rate_limit_rpm"
+CONF_RATE_LIMIT_TPM = "rate_limit_tpm"
+CONF_BATCH_AUTOMATIC_RUNS = "batch_automatic_runs"
 
 # ─────────────────────────────────────────────────────────────
 # Provider‑specific keys
@@ -86,6 +126,8 @@ CONF_OLLAMA_API_KEY = "ollama_api_key"
 CONF_OLLAMA_MODEL = "ollama_model"
 CONF_OLLAMA_TEMPERATURE = "ollama_temperature"
 CONF_OLLAMA_DISABLE_THINK = "ollama_disable_think"
+CONF_OLLAMA_KEEP_ALIVE = "ollama_keep_alive"
+CONF_OLLAMA_WARMUP = "ollama_warmup"
 
 # Custom OpenAI
 CONF_CUSTOM_OPENAI_ENDPOINT = "custom_openai_endpoint"
@@ -164,6 +206,7 @@ ATTR_CUSTOM_PROMPT = "custom_prompt"
 SERVICE_GENERATE_SUGGESTIONS = "generate_suggestions"
 SERVICE_CLEAR_HISTORY = "clear_history"
 SERVICE_UPDATE_SUGGESTION = "update_suggestion"
+SERVICE_CANCEL_GENERATION = "cancel_generation"
 
 # ─────────────────────────────────────────────────────────────
 # Provider‑status sensor values
@@ -172,6 +215,7 @@ PROVIDER_STATUS_CONNECTED = "connected"
 PROVIDER_STATUS_DISCONNECTED = "disconnected"
 PROVIDER_STATUS_ERROR        = "error"
 PROVIDER_STATUS_INITIALIZING = "initializing"
+PROVIDER_STATUS_CIRCUIT_OPEN = "circuit_open"
 
 # ─────────────────────────────────────────────────────────────
 # REST endpoints
@@ -7,16 +7,20 @@ import inspect
 import logging
 import random
 import re
-from dataclasses import dataclass
+import time
+from collections.abc import Callable, Coroutine
+from contextlib import suppress
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
 import aiohttp
-import anyio
-import yaml
 from homeassistant.components import persistent_notification
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import (
     area_registry as ar,
 )
@@ -29,6 +33,18 @@ from homeassistant.helpers import (
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
+from .batch import (
+    BATCH_INGEST_ATTEMPTS,
+    BATCH_PROVIDERS,
+    AnthropicBatchClient,
+    BatchError,
+    BatchResult,
+    OpenAIBatchClient,
+    async_get_batch_job_store,
+)
+from .cache_utils import LRUCache
+from .circuit_breaker import CircuitOpenError, async_get_circuit_breaker, is_transient_status, retry_after_seconds
+from .config_yaml import KIND_AUTOMATIONS, KIND_SCRIPTS, YamlBlockCache
 from .const import (
     CONF_ANTHROPIC_API_KEY,
     CONF_ANTHROPIC_MODEL,
@@ -41,6 +57,7 @@ from .const import (
     CONF_EXCLUDED_AREAS,
     CONF_EXCLUDED_DOMAINS,
     CONF_EXCLUDED_ENTITIES,
+    CONF_GENERATION_DEADLINE,
     CONF_GENERIC_OPENAI_API_KEY,
     CONF_GENERIC_OPENAI_ENDPOINT,
     CONF_GENERIC_OPENAI_MODEL,
@@ -51,6 +68,8 @@ from .const import (
     CONF_GROQ_API_KEY,
     CONF_GROQ_MODEL,
     CONF_GROQ_TEMPERATURE,
+    CONF_HEDGE_DELAY,
+    CONF_HEDGE_ENTRY,
     CONF_HISTORY_RETENTION,
     CONF_LITELLM_API_BASE,
     CONF_LITELLM_API_KEY,
@@ -72,9 +91,11 @@ from .const import (
     CONF_OLLAMA_DISABLE_THINK,
     CONF_OLLAMA_HTTPS,
     CONF_OLLAMA_IP_ADDRESS,
+    CONF_OLLAMA_KEEP_ALIVE,
     CONF_OLLAMA_MODEL,
     CONF_OLLAMA_PORT,
     CONF_OLLAMA_TEMPERATURE,
+    CONF_OLLAMA_WARMUP,
     CONF_OPENAI_API_KEY,
     CONF_OPENAI_AZURE_API_KEY,
     CONF_OPENAI_AZURE_API_VERSION,
@@ -92,16 +113,41 @@ from .const import (
     CONF_PERPLEXITY_MODEL,
     CONF_PERPLEXITY_TEMPERATURE,
     CONF_PROVIDER,
+    CONF_RATE_LIMIT_RPM,
+    CONF_RATE_LIMIT_TPM,
     CONF_REQUEST_TIMEOUT,
     CONF_REQUESTY_API_KEY,
     CONF_REQUESTY_MODEL,
     CONF_REQUESTY_REASONING_MAX_TOKENS,
     CONF_REQUESTY_TEMPERATURE,
+    CONF_RESPONSE_CACHE,
+    CONF_RESPONSE_CACHE_ANY_TEMPERATURE,
+    CONF_RESPONSE_CACHE_TTL,
+    CONF_SHARD_CONCURRENCY,
+    CONF_SHARD_GROUPING,
+    CONF_SHARDED_GENERATION,
+    CONF_STABLE_PROMPT_LAYOUT,
+    CONF_STREAM_RESPONSES,
+    DEFAULT_GENERATION_DEADLINE,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_HEDGE_ENTRY,
     DEFAULT_HISTORY_RETENTION,
     DEFAULT_MAX_TOKENS,
     DEFAULT_MODELS,
+    DEFAULT_OLLAMA_KEEP_ALIVE,
+    DEFAULT_OLLAMA_WARMUP,
     DEFAULT_OPENAI_REASONING_EFFORT,
+    DEFAULT_RATE_LIMIT_RPM,
+    DEFAULT_RATE_LIMIT_TPM,
     DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_RESPONSE_CACHE,
+    DEFAULT_RESPONSE_CACHE_ANY_TEMPERATURE,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_SHARD_CONCURRENCY,
+    DEFAULT_SHARD_GROUPING,
+    DEFAULT_SHARDED_GENERATION,
+    DEFAULT_STABLE_PROMPT_LAYOUT,
+    DEFAULT_STREAM_RESPONSES,
     DEFAULT_TEMPERATURE,
     DOMAIN,
     ENDPOINT_ANTHROPIC,
@@ -112,26 +158,57 @@ from .const import (
     ENDPOINT_OPENROUTER,
     ENDPOINT_PERPLEXITY,
     ENDPOINT_REQUESTY,
+    MAX_GENERATION_SHARDS,
+    PROMPT_BLOCK_CACHE_SIZE,
     VERSION_ANTHROPIC,
 )
 from .endpoint_utils import bearer_auth_headers, ollama_api_candidates, ollama_base_url, openai_chat_endpoint
+from .entity_index import EntityContextIndex, EntityIndex, entity_snapshot
 from .error_utils import sanitize_provider_error
+from .events import (
+    EVENT_FIRST_TOKEN,
+    EVENT_GENERATION_FAILED,
+    EVENT_GENERATION_FINISHED,
+    EVENT_GENERATION_STARTED,
+    EVENT_PROMPT_BUILT,
+    EVENT_SUGGESTION_PARSED,
+    async_publish,
+)
+from .generation_queue import PRIORITY_MANUAL, GenerationQueue
 from .language_utils import suggestion_language_instruction
+from .litellm_loader import async_import_litellm
 from .model_catalog import (
     chat_token_parameter,
     compatibility_warnings,
+    get_model_capabilities,
     google_json_schema_response_format,
     json_schema_response_format,
     model_uses_responses_api,
     should_send_temperature,
     supports_json_schema,
 )
+from .rate_governor import async_get_rate_governor
+from .response_cache import async_get_response_cache, is_truncated_response, make_cache_key
+from .sharding import ShardItem, merge_suggestions, partition_entities, shard_group
 from .store import async_get_suggestion_store
+from .streaming import (
+    AnthropicStream,
+    ChatCompletionStream,
+    GoogleStream,
+    OllamaStream,
+    ResponsesStream,
+    StreamDecoder,
+    iter_ndjson,
+    iter_sse_json,
+)
 from .suggestions import (
     STRUCTURED_OUTPUT_INSTRUCTIONS,
+    StreamingSuggestionParser,
+    build_run_record,
     format_suggestion_notification,
     parse_suggestion_response,
 )
+from .token_utils import cached_input_tokens, get_token_counter, usage_total_tokens
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -149,6 +226,10 @@ If you see a lot of text in a different language, focus on it for a translation
 """
 
 
+ENTITY_HEADING = "Entities in your Home Assistant (sampled):\n"
+MAX_PROMPT_ATTRIBUTE_CHARS = 500
+
+
 @dataclass(frozen=True)
 class PromptBuildResult:
     """Prompt text plus an exact record of the context sent to the model."""
@@ -156,6 +237,81 @@ class PromptBuildResult:
     prompt: str
     entity_ids: tuple[str, ...]
     warnings: tuple[str, ...]
+    token_count: int = 0
+    input_budget: int = 0
+    context_window: int | None = None
+    tokenizer: str | None = None
+    static_prefix: str = ""
+
+
+def _responses_text(response: dict[str, Any]) -> str | None:
+    """Return the output text of an OpenAI Responses API response."""
+
+    if isinstance(response.get("output_text"), str):
+        return response["output_text"]
+    text_parts: list[str] = []
+    for item in response.get("output") or []:
+        for content in item.get("content", []) if isinstance(item, dict) else []:
+            if isinstance(content, dict) and content.get("type") in {"output_text", "text"}:
+                text_parts.append(str(content.get("text", "")))
+    return "".join(text_parts) if text_parts else None
+
+
+def _anthropic_text(response: dict[str, Any]) -> str:
+    """Return the text of an Anthropic Messages API response."""
+
+    content = response.get("content") or []
+    text_parts = [part.get("text", "") for part in content if isinstance(part, dict) and part.get("type") == "text"]
+    if text_parts:
+        return "".join(text_parts)
+    raise ValueError("Anthropic response is missing text content")
+
+
+@dataclass
+class RequestState:
+    """Error and response metadata recorded by one provider request."""
+
+    last_error: str | None = None
+    response_metadata: dict[str, Any] = field(default_factory=dict)
+    prompt_static_prefix: str = ""
+    prompt_tokens: int = 0
+    stream_listener: Callable[[str], None] | None = None
+
+
+# Sharded and hedged runs dispatch several requests at once. Each extra
+# request task sets its own state here so provider handlers, which record
+# errors and metadata on the coordinator, do not overwrite each other.
+# Otherwise the coordinator's own run state is used.
+_REQUEST_STATE: ContextVar[RequestState | None] = ContextVar(f"{DOMAIN}_request_state", default=None)
+
+
+@dataclass(frozen=True)
+class ShardResult:
+    """Outcome of one shard's provider request."""
+
+    text: str | None
+    last_error: str | None
+    response_metadata: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class EntityPromptBlocks:
+    """Rendered prompt text for one entity."""
+
+    full: str
+    compact: str
+    attributes_truncated: bool
+    full_tokens: int
+    compact_tokens: int
+
+
+async def _async_dispatch_in_state(
+    coordinator: AIAutomationCoordinator, prompt: str, state: RequestState
+) -> str | None:
+    """Dispatch on ``coordinator`` with errors and metadata recorded in ``state``."""
+
+    _REQUEST_STATE.set(state)
+    return await coordinator._dispatch(prompt)
 
 
 class AIAutomationCoordinator(DataUpdateCoordinator):
@@ -168,11 +324,20 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         self.last_update: datetime | None = None
         self.session = async_get_clientsession(hass)
         self._generation_lock = asyncio.Lock()
-        self._last_error: str | None = None
-        self._last_response_metadata: dict[str, Any] = {}
+        self._generation_queue = GenerationQueue(
+            lambda coro: hass.async_create_background_task(coro, f"{DOMAIN} generation queue")
+        )
+        self._run_state = RequestState()
+        # Chat URL that last answered, tried first so Open WebUI proxies do
+        # not pay for a failing native Ollama path on every request.
+        self._ollama_endpoint: str | None = None
+        self._active_run_id: str | None = None
+        self._cancel_requested_for: str | None = None
+        self._dispatch_task: asyncio.Task | None = None
 
         self.SYSTEM_PROMPT = SYSTEM_PROMPT
         self.scan_all = False
+        self.batch_mode = False
         self.selected_domains: list[str] = []
         self.excluded_domains: list[str] = self._opt_list(CONF_EXCLUDED_DOMAINS)
         self.excluded_entities: list[str] = self._opt_list(CONF_EXCLUDED_ENTITIES)
@@ -219,6 +384,92 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         self.device_registry: dr.DeviceRegistry = dr.async_get(hass)
         self.entity_registry: er.EntityRegistry = er.async_get(hass)
         self.area_registry: ar.AreaRegistry = ar.async_get(hass)
+        self.entity_index = EntityIndex(hass)
+        self.entity_contexts = EntityContextIndex(
+            hass, self.entity_registry, self.device_registry, self.area_registry
+        )
+        self.prompt_block_cache: LRUCache[EntityPromptBlocks] = LRUCache(PROMPT_BLOCK_CACHE_SIZE)
+        self.yaml_blocks = YamlBlockCache()
+        self.response_cache = async_get_response_cache(hass)
+        self.batch_jobs = async_get_batch_job_store(hass)
+        self.circuit_breaker = async_get_circuit_breaker(
+            hass, self._opt(CONF_PROVIDER, "OpenAI"), self._rate_limit_credential()
+        )
+        self.rate_governor = async_get_rate_governor(
+            hass, self._opt(CONF_PROVIDER, "OpenAI"), self._rate_limit_credential()
+        )
+        self.rate_governor.configure(
+            entry.entry_id,
+            int(self._opt(CONF_RATE_LIMIT_RPM, DEFAULT_RATE_LIMIT_RPM)),
+            int(self._opt(CONF_RATE_LIMIT_TPM, DEFAULT_RATE_LIMIT_TPM)),
+        )
+        # The governor outlives the entry; its limits must not outlive a reload or removal.
+        entry.async_on_unload(partial(self.rate_governor.unconfigure, entry.entry_id))
+        self.token_counter = get_token_counter(self._opt(CONF_PROVIDER, "OpenAI"), self._current_model())
+        self._exclusion_key: tuple | None = None
+        self._exclusion_sets: tuple[frozenset[str], frozenset[str], frozenset[str]] = (
+            frozenset(),
+            frozenset(),
+            frozenset(),
+        )
+
+    @callback
+    def async_start_tracking(self):
+        """Keep entity and registry indexes current; return a stop callback."""
+
+        stop_entities = self.entity_index.async_start()
+        stop_contexts = self.entity_contexts.async_start()
+
+        @callback
+        def stop() -> None:
+            stop_entities()
+            stop_contexts()
+
+        return stop
+
+    def _request_state(self) -> RequestState:
+        state = _REQUEST_STATE.get()
+        return self._run_state if state is None else state
+
+    @property
+    def _last_error(self) -> str | None:
+        return self._request_state().last_error
+
+    @_last_error.setter
+    def _last_error(self, value: str | None) -> None:
+        self._request_state().last_error = value
+
+    @property
+    def _last_response_metadata(self) -> dict[str, Any]:
+        return self._request_state().response_metadata
+
+    @_last_response_metadata.setter
+    def _last_response_metadata(self, value: dict[str, Any]) -> None:
+        self._request_state().response_metadata = value
+
+    @property
+    def _stream_listener(self) -> Callable[[str], None] | None:
+        return self._request_state().stream_listener
+
+    @_stream_listener.setter
+    def _stream_listener(self, value: Callable[[str], None] | None) -> None:
+        self._request_state().stream_listener = value
+
+    @property
+    def _prompt_static_prefix(self) -> str:
+        return self._request_state().prompt_static_prefix
+
+    @_prompt_static_prefix.setter
+    def _prompt_static_prefix(self, value: str) -> None:
+        self._request_state().prompt_static_prefix = value
+
+    @property
+    def _prompt_tokens(self) -> int:
+        return self._request_state().prompt_tokens
+
+    @_prompt_tokens.setter
+    def _prompt_tokens(self, value: int) -> None:
+        self._request_state().prompt_tokens = value
 
     def _opt(self, key: str, default=None):
         """Return entry option, then setup data, then default."""
@@ -256,10 +507,111 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         )
         return int(in_budget), int(out_budget)
 
+    def _context_window(self) -> int | None:
+        """Return the known context window for the configured model."""
+
+        provider = self._opt(CONF_PROVIDER, "OpenAI")
+        return get_model_capabilities(provider, self._current_model(provider)).context_window
+
+    def _streaming_enabled(self) -> bool:
+        return bool(self._opt(CONF_STREAM_RESPONSES, DEFAULT_STREAM_RESPONSES))
+
     def _timeout(self) -> aiohttp.ClientTimeout:
         seconds = int(self._opt(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT))
         return aiohttp.ClientTimeout(total=max(10, seconds))
 
+    def _generation_deadline(self, waves: int = 1) -> float:
+        """Return the overall provider deadline for one run, in seconds.
+
+        Without a configured deadline, each of the run's ``waves`` of
+        concurrent requests gets the request timeout.
+        """
+
+        deadline = float(self._opt(CONF_GENERATION_DEADLINE, DEFAULT_GENERATION_DEADLINE) or 0)
+        if deadline <= 0:
+            deadline = max(10, int(self._opt(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT))) * max(1, waves)
+        return deadline
+
+    def _current_temperature(self, provider: str, model: str) -> float | None:
+        """Return the temperature sent to the provider, or None when it is omitted."""
+
+        temperature_key = {
+            "OpenAI": CONF_OPENAI_TEMPERATURE,
+            "Anthropic": CONF_ANTHROPIC_TEMPERATURE,
+            "Google": CONF_GOOGLE_TEMPERATURE,
+            "Groq": CONF_GROQ_TEMPERATURE,
+            "LocalAI": CONF_LOCALAI_TEMPERATURE,
+            "Ollama": CONF_OLLAMA_TEMPERATURE,
+            "Custom OpenAI": CONF_CUSTOM_OPENAI_TEMPERATURE,
+            "Mistral AI": CONF_MISTRAL_TEMPERATURE,
+            "Perplexity AI": CONF_PERPLEXITY_TEMPERATURE,
+            "OpenRouter": CONF_OPENROUTER_TEMPERATURE,
+            "Requesty": CONF_REQUESTY_TEMPERATURE,
+            "OpenAI Azure": CONF_OPENAI_AZURE_TEMPERATURE,
+            "Generic OpenAI": CONF_GENERIC_OPENAI_TEMPERATURE,
+            "LiteLLM": CONF_LITELLM_TEMPERATURE,
+        }.get(provider)
+        if temperature_key is None or not should_send_temperature(provider, model):
+            return None
+        return float(self._opt(temperature_key, DEFAULT_TEMPERATURE))
+
+    def _response_cache_key(self, provider: str, model: str, prompt: str) -> str | None:
+        """Return the response cache key, or None when this request must not be cached.
+
+        Sampling at a temperature above zero (or the provider default when no
+        temperature is sent) is meant to vary, so such requests bypass the
+        cache unless the user explicitly allows it. The key covers every
+        setting that shapes the reply, not just the prompt.
+        """
+
+        if not self._opt(CONF_RESPONSE_CACHE, DEFAULT_RESPONSE_CACHE):
+            return None
+        temperature = self._current_temperature(provider, model)
+        if (temperature is None or temperature > 0) and not self._opt(
+            CONF_RESPONSE_CACHE_ANY_TEMPERATURE, DEFAULT_RESPONSE_CACHE_ANY_TEMPERATURE
+        ):
+            self.response_cache.record_bypass()
+            return None
+        _, out_budget = self._budgets()
+        structured = model_uses_responses_api(provider, model) or supports_json_schema(provider, model)
+        reasoning_key, reasoning_default = {
+            "OpenAI": (CONF_OPENAI_REASONING_EFFORT, DEFAULT_OPENAI_REASONING_EFFORT),
+            "OpenRouter": (CONF_OPENROUTER_REASONING_MAX_TOKENS, 0),
+            "Requesty": (CONF_REQUESTY_REASONING_MAX_TOKENS, 0),
+        }.get(provider, (None, None))
+        parameters = {
+            "max_output_tokens": out_budget,
+            "response_format": "json_schema" if structured else "text",
+            "reasoning": self._opt(reasoning_key, reasoning_default) if reasoning_key else None,
+        }
+        return make_cache_key(provider, model, temperature, prompt, parameters)
+
+    def _rate_limit_credential(self) -> str:
+        """Return what identifies this entry's provider account for rate limits.
+
+        Entries with the same API key share limits and a circuit breaker; servers without keys
+        are told apart by their address.
+        """
+
+        provider = self._opt(CONF_PROVIDER, "OpenAI")
+        credential_keys = {
+            "OpenAI": (CONF_OPENAI_API_KEY,),
+            "Anthropic": (CONF_ANTHROPIC_API_KEY,),
+            "Google": (CONF_GOOGLE_API_KEY,),
+            "Groq": (CONF_GROQ_API_KEY,),
+            "LocalAI": (CONF_LOCALAI_IP_ADDRESS, CONF_LOCALAI_PORT),
+            "Ollama": (CONF_OLLAMA_BASE_URL, CONF_OLLAMA_IP_ADDRESS, CONF_OLLAMA_PORT, CONF_OLLAMA_API_KEY),
+            "Custom OpenAI": (CONF_CUSTOM_OPENAI_ENDPOINT, CONF_CUSTOM_OPENAI_API_KEY),
+            "Mistral AI": (CONF_MISTRAL_API_KEY,),
+            "Perplexity AI": (CONF_PERPLEXITY_API_KEY,),
+            "OpenRouter": (CONF_OPENROUTER_API_KEY,),
+            "Requesty": (CONF_REQUESTY_API_KEY,),
+            "OpenAI Azure": (CONF_OPENAI_AZURE_ENDPOINT, CONF_OPENAI_AZURE_DEPLOYMENT_ID, CONF_OPENAI_AZURE_API_KEY),
+            "Generic OpenAI": (CONF_GENERIC_OPENAI_ENDPOINT, CONF_GENERIC_OPENAI_API_KEY),
+            "LiteLLM": (CONF_LITELLM_API_BASE, CONF_LITELLM_API_KEY),
+        }
+        return "\n".join(str(self._opt(key, "") or "") for key in credential_keys.get(provider, ()))
+
     def _current_model(self, provider: str | None = None) -> str:
         provider = provider or self._opt(CONF_PROVIDER, "OpenAI")
         model_key_map = {
@@ -295,7 +647,76 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         automation_limit: int = 100,
         script_read_yaml: bool = False,
         script_limit: int = 100,
-    ) -> None:
+        batch: bool = False,
+        priority: int = PRIORITY_MANUAL,
+    ) -> dict[str, Any]:
+        """Queue one suggestion generation and return the resulting coordinator data.
+
+        Identical requests that are queued or running share one provider call
+        and its result. Automatic triggers pass ``PRIORITY_AUTOMATIC`` so
+        service calls run ahead of them. With ``batch``, the prompts are
+        submitted as a provider batch job whose results are stored later.
+        """
+
+        settings = {
+            "custom_prompt": (custom_prompt or "").strip() or None,
+            "all_entities": bool(all_entities),
+            "domains": self._normalize_list(domains),
+            "exclude_domains": self._normalize_list(exclude_domains),
+            "exclude_entities": self._normalize_list(exclude_entities),
+            "exclude_areas": self._normalize_list(exclude_areas),
+            "entity_limit": int(entity_limit),
+            "automation_read_yaml": bool(automation_read_yaml),
+            "automation_limit": int(automation_limit),
+            "script_read_yaml": bool(script_read_yaml),
+            "script_limit": int(script_limit),
+            "batch": bool(batch),
+        }
+        key = tuple(
+            (name, tuple(sorted(value)) if isinstance(value, list) else value) for name, value in settings.items()
+        )
+        return await self._generation_queue.async_submit(
+            key, partial(self._async_run_generation, **settings), priority
+        )
+
+    async def async_shutdown(self) -> None:
+        """Fail queued generations, then run Home Assistant's coordinator cleanup."""
+
+        self._generation_queue.async_cancel_pending()
+        await super().async_shutdown()
+
+    async def async_cancel_generation(self, *, clear_queue: bool = False) -> bool:
+        """Abort the running generation and optionally drop queued ones.
+
+        The in-flight provider request is cancelled at once, which closes its
+        connection and lets the run finish with ``cancelled`` recorded in the
+        response metadata. Returns whether anything was cancelled.
+        """
+
+        cancelled = bool(clear_queue and self._generation_queue.async_cancel_pending())
+        if self._active_run_id is not None:
+            self._cancel_requested_for = self._active_run_id
+            if self._dispatch_task is not None and not self._dispatch_task.done():
+                self._dispatch_task.cancel()
+            cancelled = True
+        return cancelled
+
+    async def _async_run_generation(
+        self,
+        *,
+        custom_prompt: str | None,
+        all_entities: bool,
+        domains: list[str],
+        exclude_domains: list[str],
+        exclude_entities: list[str],
+        exclude_areas: list[str],
+        entity_limit: int,
+        automation_read_yaml: bool,
+        automation_limit: int,
+        script_read_yaml: bool,
+        script_limit: int,
+        batch: bool,
+    ) -> dict[str, Any]:
         """Run one suggestion generation with isolated request settings."""
 
         async with self._generation_lock:
@@ -311,6 +732,7 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 "automation_limit": self.automation_limit,
                 "script_read_file": self.script_read_file,
                 "script_limit": self.script_limit,
+                "batch_mode": self.batch_mode,
             }
             try:
                 persistent_prompt = str(self._opt(CONF_CUSTOM_SYSTEM_PROMPT, "") or "").strip()
@@ -321,21 +743,23 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                     prompt_parts.append(f"Request-specific instructions:\n{custom_prompt}")
                 self.SYSTEM_PROMPT = "\n\n".join(prompt_parts)
                 self.scan_all = all_entities
-                self.selected_domains = self._normalize_list(domains)
-                self.excluded_domains = self._normalize_list(exclude_domains) or self._opt_list(CONF_EXCLUDED_DOMAINS)
-                self.excluded_entities = self._normalize_list(exclude_entities) or self._opt_list(CONF_EXCLUDED_ENTITIES)
-                self.excluded_areas = self._normalize_list(exclude_areas) or self._opt_list(CONF_EXCLUDED_AREAS)
-                self.entity_limit = int(entity_limit)
-                self.automation_read_file = bool(automation_read_yaml)
-                self.automation_limit = int(automation_limit)
-                self.script_read_file = bool(script_read_yaml)
-                self.script_limit = int(script_limit)
+                self.selected_domains = domains
+                self.excluded_domains = exclude_domains or self._opt_list(CONF_EXCLUDED_DOMAINS)
+                self.excluded_entities = exclude_entities or self._opt_list(CONF_EXCLUDED_ENTITIES)
+                self.excluded_areas = exclude_areas or self._opt_list(CONF_EXCLUDED_AREAS)
+                self.entity_limit = entity_limit
+                self.automation_read_file = automation_read_yaml
+                self.automation_limit = automation_limit
+                self.script_read_file = script_read_yaml
+                self.script_limit = script_limit
+                self.batch_mode = batch
                 # Request settings are temporary and protected by the
                 # generation lock, so run the refresh immediately. A debounced
                 # request could execute after these settings are restored.
                 await self.async_refresh()
                 if self.data.get("request_succeeded") is False:
                     raise ValueError(self.data.get("last_error") or "Suggestion generation failed")
+                return dict(self.data)
             finally:
                 self.SYSTEM_PROMPT = saved["SYSTEM_PROMPT"]
                 self.scan_all = saved["scan_all"]
@@ -348,8 +772,11 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 self.automation_limit = saved["automation_limit"]
                 self.script_read_file = saved["script_read_file"]
                 self.script_limit = saved["script_limit"]
+                self.batch_mode = saved["batch_mode"]
 
     async def _async_update_data(self) -> dict:
+        run_id: str | None = None
+        self._cancel_requested_for = None
         try:
             now = datetime.now()
             provider = self._opt(CONF_PROVIDER, "OpenAI")
@@ -359,8 +786,15 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             self._last_error = None
             self._last_response_metadata = {}
 
+            # The entity index already holds the eligible snapshot, so the
+            # "new entities only" path is a dictionary diff rather than a scan.
             current = self._collect_entities()
-            picked = current if self.scan_all else {k: v for k, v in current.items() if k not in self.previous_entities}
+            if self.scan_all:
+                picked = current
+            else:
+                # Entities in a submitted batch are pending until it is ingested.
+                pending = await self._async_batch_pending_entities()
+                picked = {k: v for k, v in current.items() if k not in self.previous_entities and k not in pending}
             if not picked:
                 self._prune_processed_entities(current)
                 history = await async_get_suggestion_store(self.hass).async_list()
@@ -378,72 +812,110 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 )
                 return self.data
 
+            run_id = self._active_run_id = str(uuid4())
+            self._publish(EVENT_GENERATION_STARTED, run_id, provider=provider, model=model, entities=len(picked))
+            if self.batch_mode:
+                await self._async_submit_batch(picked, run_id=run_id, provider=provider, model=model, now=now, warnings=warnings)
+                return self.data
+            if self._opt(CONF_SHARDED_GENERATION, DEFAULT_SHARDED_GENERATION):
+                await self._async_generate_sharded(
+                    current, picked, run_id=run_id, provider=provider, model=model, now=now, warnings=warnings
+                )
+                return self.data
             prompt_result = await self._build_prompt(picked)
+            self._prompt_static_prefix = prompt_result.static_prefix
+            self._prompt_tokens = prompt_result.token_count
             warnings.extend(prompt_result.warnings)
-            response = await self._dispatch(prompt_result.prompt)
+            self._publish(
+                EVENT_PROMPT_BUILT,
+                run_id,
+                entities=len(prompt_result.entity_ids),
+                tokens=prompt_result.token_count,
+                input_budget=prompt_result.input_budget,
+            )
             store = async_get_suggestion_store(self.hass)
-
-            if response:
-                parsed = parse_suggestion_response(
-                    response,
+            notification_id = f"ai_automation_suggestions_{now.timestamp()}"
+            cache_key = self._response_cache_key(provider, model, prompt_result.prompt)
+            cached = None
+            if cache_key is not None:
+                ttl = float(self._opt(CONF_RESPONSE_CACHE_TTL, DEFAULT_RESPONSE_CACHE_TTL))
+                cached = await self.response_cache.async_get(cache_key, ttl)
+            preview = None
+            if cached is None and self._streaming_enabled():
+                preview = self._start_stream_preview(
                     provider=provider,
                     model=model,
-                    created_at=now,
-                    entities_processed=list(prompt_result.entity_ids),
-                    inherited_warnings=warnings,
-                    response_metadata=self._last_response_metadata,
+                    now=now,
+                    prompt_result=prompt_result,
+                    warnings=warnings,
+                    history=await store.async_list(),
+                    notification_id=notification_id,
+                    run_id=run_id,
                 )
-                self._validate_generated_suggestions(parsed)
-                retention = int(self._opt(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION))
-                history = await store.async_add_suggestions(parsed, retention=retention)
-                latest = history[0] if history else parsed[0]
+            if cached is not None:
+                response = cached["response"]
+                self._last_response_metadata = {**cached["metadata"], "cache_hit": True}
+            else:
+                try:
+                    response = await self._async_dispatch_until_deadline(prompt_result.prompt)
+                finally:
+                    self._stream_listener = None
+                cached_tokens = cached_input_tokens(self._last_response_metadata.get("usage"))
+                if cached_tokens is not None:
+                    self._last_response_metadata["cached_input_tokens"] = cached_tokens
+            cancelled = bool(self._last_response_metadata.get("cancelled"))
+            hedge = self._last_response_metadata.get("hedge") or {}
+            if hedge.get("winner") == "secondary":
+                # Record the entry that answered; anything the losing request
+                # streamed is superseded by the winning response.
+                provider, model = hedge["provider"], hedge["model"]
+                cache_key = preview = None
+            # A reply cut off at the output limit must not be served again.
+            if (
+                response
+                and cache_key is not None
+                and cached is None
+                and not cancelled
+                and not is_truncated_response(self._last_response_metadata)
+            ):
+                await self.response_cache.async_set(cache_key, response, self._last_response_metadata)
+            if cancelled and preview is not None and preview.items:
+                # Keep the suggestions that finished streaming before the abort.
+                response = self.data.get("suggestions") or ""
 
-                persistent_notification.async_create(
-                    self.hass,
-                    message=format_suggestion_notification(latest),
-                    title=f"AI Automation Suggestions ({provider})",
-                    notification_id=f"ai_automation_suggestions_{now.timestamp()}",
+            if response:
+                # The stream was already parsed incrementally; finishing it
+                # yields the same records the buffered parser would, with the
+                # IDs already shown to listeners.
+                parsed = preview.close(self._last_response_metadata) if preview is not None else []
+                if not parsed:
+                    parsed = parse_suggestion_response(
+                        response,
+                        provider=provider,
+                        model=model,
+                        created_at=now,
+                        entities_processed=list(prompt_result.entity_ids),
+                        inherited_warnings=warnings,
+                        response_metadata=self._last_response_metadata,
+                        run_id=run_id,
+                    )
+                    for suggestion in parsed:
+                        self._publish(EVENT_SUGGESTION_PARSED, run_id, suggestion=suggestion)
+                await self._async_store_run(
+                    parsed,
+                    response=response,
+                    run_id=run_id,
+                    provider=provider,
+                    model=model,
+                    now=now,
+                    entity_ids=prompt_result.entity_ids,
+                    warnings=warnings,
+                    notification_id=notification_id,
                 )
-
-                self.data = {
-                    "suggestions": response,
-                    "suggestion": latest,
-                    "suggestion_history": history,
-                    "suggestion_count": len(history),
-                    "description": latest.get("description"),
-                    "yaml_block": latest.get("yamlCode"),
-                    "last_update": now,
-                    "entities_processed": list(prompt_result.entity_ids),
-                    "provider": provider,
-                    "model": model,
-                    "warnings": latest.get("warnings", warnings),
-                    "last_error": None,
-                    "response_metadata": self._last_response_metadata,
-                    "request_succeeded": True,
-                }
-                self._mark_entities_processed(current, prompt_result.entity_ids)
+                if not cancelled:
+                    self._mark_entities_processed(current, prompt_result.entity_ids)
             else:
-                if not self._last_error:
-                    self._last_error = "The provider returned no usable suggestion content."
-                history = await store.async_list()
-                self.data.update(
-                    {
-                        "suggestions": "No suggestions available",
-                        "suggestion": None,
-                        "suggestion_history": history,
-                        "suggestion_count": len(history),
-                        "description": None,
-                        "yaml_block": None,
-                        "last_update": now,
-                        "entities_processed": [],
-                        "provider": provider,
-                        "model": model,
-                        "warnings": warnings,
-                        "last_error": self._last_error,
-                        "response_metadata": self._last_response_metadata,
-                        "request_succeeded": False,
-                    }
-                )
+                await self._async_record_failure(run_id=run_id, provider=provider, model=model, now=now, warnings=warnings)
 
             return self.data
 
@@ -454,6 +926,8 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 type(err).__name__,
                 self._last_error,
             )
+            if run_id is not None:
+                self._publish(EVENT_GENERATION_FAILED, run_id, error=self._last_error)
             self.data.update(
                 {
                     "last_error": self._last_error,
@@ -462,6 +936,725 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 }
             )
             return self.data
+        finally:
+            self._active_run_id = None
+
+    async def _async_store_run(
+        self,
+        parsed: list[dict[str, Any]],
+        *,
+        response: str,
+        run_id: str,
+        provider: str,
+        model: str,
+        now: datetime,
+        entity_ids: tuple[str, ...] | list[str],
+        warnings: list[str],
+        notification_id: str,
+    ) -> None:
+        """Validate and store a run's suggestions, then publish them."""
+
+        self._validate_generated_suggestions(parsed)
+        store = async_get_suggestion_store(self.hass)
+        retention = int(self._opt(CONF_HISTORY_RETENTION, DEFAULT_HISTORY_RETENTION))
+        run = build_run_record(
+            run_id,
+            provider=provider,
+            model=model,
+            created_at=now,
+            entities_processed=list(entity_ids),
+            response_metadata=self._last_response_metadata,
+        )
+        history = await store.async_add_suggestions(parsed, retention=retention, run=run)
+        self._publish(
+            EVENT_GENERATION_FINISHED,
+            run_id,
+            suggestion_ids=[suggestion["id"] for suggestion in parsed],
+            revision=store.revision,
+        )
+        latest = history[0] if history else parsed[0]
+
+        persistent_notification.async_create(
+            self.hass,
+            message=format_suggestion_notification(latest),
+            title=f"AI Automation Suggestions ({provider})",
+            notification_id=notification_id,
+        )
+
+        self.data = {
+            "suggestions": response,
+            "suggestion": latest,
+            "suggestion_history": history,
+            "suggestion_count": len(history),
+            "description": latest.get("description"),
+            "yaml_block": latest.get("yamlCode"),
+            "last_update": now,
+            "entities_processed": list(entity_ids),
+            "provider": provider,
+            "model": model,
+            "warnings": latest.get("warnings", warnings),
+            "last_error": None,
+            "response_metadata": self._last_response_metadata,
+            "request_succeeded": True,
+        }
+
+    async def _async_record_failure(
+        self, *, run_id: str, provider: str, model: str, now: datetime, warnings: list[str]
+    ) -> None:
+        """Publish a run that produced no usable suggestions."""
+
+        if not self._last_error:
+            self._last_error = "The provider returned no usable suggestion content."
+        self._publish(EVENT_GENERATION_FAILED, run_id, error=self._last_error)
+        history = await async_get_suggestion_store(self.hass).async_list()
+        self.data.update(
+            {
+                "suggestions": "No suggestions available",
+                "suggestion": None,
+                "suggestion_history": history,
+                "suggestion_count": len(history),
+                "description": None,
+                "yaml_block": None,
+                "last_update": now,
+                "entities_processed": [],
+                "provider": provider,
+                "model": model,
+                "warnings": warnings,
+                "last_error": self._last_error,
+                "response_metadata": self._last_response_metadata,
+                "request_succeeded": False,
+            }
+        )
+
+    def _plan_shards(
+        self, entities: dict[str, dict], *, context_tokens: int = 0
+    ) -> tuple[list[dict[str, dict]], list[str]]:
+        """Split entities into shards whose entity blocks fit one prompt's budget.
+
+        ``context_tokens`` is reserved in the first shard, which carries the
+        automation and script context.
+        """
+
+        prefix, suffix, input_budget, _ = self._prompt_frame()
+        count = self.token_counter.count
+        capacity = input_budget - count(prefix) - count(suffix) - count("\n" + ENTITY_HEADING)
+        # Context too large to share the first shard keeps at most half of it;
+        # _build_prompt then reports what was left out.
+        first_capacity = max(capacity - context_tokens, capacity // 2)
+        grouping = self._opt(CONF_SHARD_GROUPING, DEFAULT_SHARD_GROUPING)
+        items = []
+        for entity_id, meta in entities.items():
+            rendered = self._entity_blocks(entity_id, meta, MAX_PROMPT_ATTRIBUTE_CHARS)
+            tokens = rendered.full_tokens if rendered.full_tokens <= capacity else rendered.compact_tokens
+            area = self.entity_contexts.async_resolve(entity_id).area_name
+            items.append(ShardItem(entity_id, shard_group(entity_id, area, grouping), tokens))
+        shard_ids, deferred = partition_entities(
+            items,
+            capacity=capacity,
+            max_entities=self.entity_limit,
+            max_shards=MAX_GENERATION_SHARDS,
+            first_capacity=first_capacity,
+        )
+        return [{entity_id: entities[entity_id] for entity_id in ids} for ids in shard_ids], deferred
+
+    async def _async_build_shard_prompts(
+        self, picked: dict[str, dict], *, run_id: str, warnings: list[str]
+    ) -> list[PromptBuildResult]:
+        """Plan shards for the picked entities and build one prompt per shard."""
+
+        context_tokens = self._context_tokens(await self._async_context_sections())
+        shards, deferred = self._plan_shards(picked, context_tokens=context_tokens)
+        if not shards:
+            raise ValueError(
+                "The max input token setting leaves no room for even one entity. "
+                "Increase max input tokens or shorten the custom prompt."
+            )
+        if deferred:
+            warnings.append(
+                f"Sharded generation covered {len(picked) - len(deferred)} of {len(picked)} entities; "
+                "the remaining entities are deferred to a later run."
+            )
+        prompts = [
+            await self._build_prompt(shard, include_context=index == 0) for index, shard in enumerate(shards)
+        ]
+        for prompt_result in prompts:
+            warnings.extend(warning for warning in prompt_result.warnings if warning not in warnings)
+        self._publish(
+            EVENT_PROMPT_BUILT,
+            run_id,
+            entities=sum(len(prompt_result.entity_ids) for prompt_result in prompts),
+            tokens=sum(prompt_result.token_count for prompt_result in prompts),
+            input_budget=prompts[0].input_budget,
+            shards=len(prompts),
+        )
+        return prompts
+
+    async def _async_generate_sharded(
+        self,
+        current: dict[str, dict],
+        picked: dict[str, dict],
+        *,
+        run_id: str,
+        provider: str,
+        model: str,
+        now: datetime,
+        warnings: list[str],
+    ) -> None:
+        """Cover every picked entity in one round of concurrent, prompt-sized shards.
+
+        Only the first shard carries the automation and script context. Each
+        response is parsed against the entities its shard was sent, then the
+        suggestions are deduplicated and ranked and stored in one write under
+        one run record. Entities in shards that completed are marked
+        processed even if the run is cancelled before the others finish.
+        """
+
+        prompts = await self._async_build_shard_prompts(picked, run_id=run_id, warnings=warnings)
+        results: list[ShardResult | None] = [None] * len(prompts)
+        concurrency = max(1, int(self._opt(CONF_SHARD_CONCURRENCY, DEFAULT_SHARD_CONCURRENCY)))
+        waves = -(-len(prompts) // concurrency)
+        await self._async_until_deadline(partial(self._async_dispatch_shards, prompts, results), waves=waves)
+
+        shard_summaries: list[dict[str, Any]] = []
+        failures = 0
+        for prompt_result, result in zip(prompts, results):
+            summary: dict[str, Any] = {"entities": len(prompt_result.entity_ids), "tokens": prompt_result.token_count}
+            if result is None:
+                summary["status"] = "cancelled"
+            elif result.text:
+                summary.update(status="completed", response_metadata=result.response_metadata)
+            else:
+                failures += 1
+                summary.update(status="failed", error=result.last_error)
+            shard_summaries.append(summary)
+        if failures:
+            warnings.append(f"{failures} of {len(prompts)} shards failed; their entities remain pending.")
+        cached_tokens = [
+            result.response_metadata["cached_input_tokens"]
+            for result in results
+            if result is not None and "cached_input_tokens" in result.response_metadata
+        ]
+        self._last_response_metadata = {**self._last_response_metadata, "shards": shard_summaries}
+        if cached_tokens:
+            self._last_response_metadata["cached_input_tokens"] = sum(cached_tokens)
+
+        batches: list[list[dict[str, Any]]] = []
+        responses: list[str] = []
+        processed: list[str] = []
+        for prompt_result, result in zip(prompts, results):
+            if result is None or not result.text:
+                continue
+            batches.append(
+                parse_suggestion_response(
+                    result.text,
+                    provider=provider,
+                    model=model,
+                    created_at=now,
+                    entities_processed=list(prompt_result.entity_ids),
+                    inherited_warnings=warnings,
+                    response_metadata=result.response_metadata,
+                    run_id=run_id,
+                )
+            )
+            responses.append(result.text)
+            processed.extend(prompt_result.entity_ids)
+        merged = merge_suggestions(batches)
+        if not merged:
+            if not self._last_error:
+                self._last_error = next(
+                    (result.last_error for result in results if result is not None and result.last_error), None
+                )
+            await self._async_record_failure(run_id=run_id, provider=provider, model=model, now=now, warnings=warnings)
+            return
+        for suggestion in merged:
+            self._publish(EVENT_SUGGESTION_PARSED, run_id, suggestion=suggestion)
+        await self._async_store_run(
+            merged,
+            response="\n\n".join(responses),
+            run_id=run_id,
+            provider=provider,
+            model=model,
+            now=now,
+            entity_ids=processed,
+            warnings=warnings,
+            notification_id=f"ai_automation_suggestions_{now.timestamp()}",
+        )
+        self._mark_entities_processed(current, tuple(processed))
+
+    def _batch_client(self, provider: str) -> OpenAIBatchClient | AnthropicBatchClient:
+        """Return a batch API client for the provider, which must support batches."""
+
+        if provider not in BATCH_PROVIDERS:
+            raise ValueError(f"Batch generation is not available for {provider}; use OpenAI or Anthropic.")
+        api_key = self._opt(CONF_OPENAI_API_KEY if provider == "OpenAI" else CONF_ANTHROPIC_API_KEY)
+        if not api_key:
+            raise ValueError(f"{provider} API key not configured")
+        if provider == "OpenAI":
+            return OpenAIBatchClient(self.session, api_key)
+        return AnthropicBatchClient(self.session, api_key)
+
+    def _batch_request(
+        self, provider: str, model: str, prompt_result: PromptBuildResult
+    ) -> tuple[str, dict[str, Any]]:
+        """Return the API path and body an interactive request for this prompt would use."""
+
+        prompt = self._trim_prompt(prompt_result.prompt)
+        if provider == "Anthropic":
+            return "/v1/messages", self._anthropic_body(prompt, model, prompt_result.static_prefix)
+        if model_uses_responses_api(provider, model):
+            return "/v1/responses", self._openai_responses_body(prompt, model)
+        return "/v1/chat/completions", self._openai_chat_body(prompt, model)
+
+    def _batch_response_text(self, provider: str, model: str, body: dict[str, Any]) -> str | None:
+        if provider == "Anthropic":
+            return _anthropic_text(body)
+        if model_uses_responses_api(provider, model):
+            return _responses_text(body)
+        return self._extract_chat_content(body, provider)
+
+    async def _async_submit_batch(
+        self,
+        picked: dict[str, dict],
+        *,
+        run_id: str,
+        provider: str,
+        model: str,
+        now: datetime,
+        warnings: list[str],
+    ) -> None:
+        """Submit one shard prompt per request as a provider batch job and persist it.
+
+        Nothing is stored as a suggestion yet; :meth:`async_poll_batch_jobs`
+        ingests the results under this run ID once the batch has finished.
+        """
+
+        client = self._batch_client(provider)
+        prompts = await self._async_build_shard_prompts(picked, run_id=run_id, warnings=warnings)
+        endpoint = ""
+        requests: list[tuple[str, dict[str, Any]]] = []
+        for index, prompt_result in enumerate(prompts):
+            endpoint, body = self._batch_request(provider, model, prompt_result)
+            requests.append((f"{run_id}-{index}", body))
+        batch_id = await client.async_submit(endpoint, requests)
+        await self.batch_jobs.async_add(
+            {
+                "id": run_id,
+                "entry_id": self.entry.entry_id,
+                "provider": provider,
+                "model": model,
+                "batch_id": batch_id,
+                "status": "submitted",
+                "submitted_at": now.isoformat(),
+                "warnings": list(warnings),
+                "shards": [
+                    {"custom_id": custom_id, "entity_ids": list(prompt_result.entity_ids)}
+                    for (custom_id, _), prompt_result in zip(requests, prompts)
+                ],
+            }
+        )
+        _LOGGER.info("Submitted %s batch %s with %d requests", provider, batch_id, len(requests))
+        self._last_response_metadata = {"batch": {"id": batch_id, "status": "submitted", "requests": len(requests)}}
+        # The interactive part of the run ends here; ingestion publishes its own events.
+        self._publish(EVENT_GENERATION_FINISHED, run_id, suggestion_ids=[], batch_id=batch_id, batch_status="submitted")
+        history = await async_get_suggestion_store(self.hass).async_list()
+        self.data.update(
+            {
+                "suggestion_history": history,
+                "suggestion_count": len(history),
+                "last_update": now,
+                "provider": provider,
+                "model": model,
+                "warnings": warnings,
+                "last_error": None,
+                "response_metadata": self._last_response_metadata,
+                "request_succeeded": True,
+            }
+        )
+
+    async def async_poll_batch_jobs(self) -> int:
+        """Check this entry's batch jobs and store the results of finished ones.
+
+        Jobs stay persisted until their results are ingested, so polling
+        resumes after a restart. A job is marked ingested before its results
+        are stored, so a restart part-way through never stores them twice.
+        A job whose results could not be stored is released for the next
+        poll, up to ``BATCH_INGEST_ATTEMPTS`` times, and then recorded as a
+        failed run. Returns the number of jobs ingested.
+        """
+
+        finished = 0
+        store = async_get_suggestion_store(self.hass)
+        for job in await self.batch_jobs.async_list(self.entry.entry_id):
+            if job.get("ingested_at"):
+                # Ingestion was interrupted after the job was claimed.
+                await self.batch_jobs.async_remove(job["id"])
+                continue
+            checked_at = datetime.now().isoformat()
+            try:
+                client = self._batch_client(job["provider"])
+                status = await client.async_status(job["batch_id"])
+                results = await client.async_results(status) if status.done else {}
+            except (aiohttp.ClientError, asyncio.TimeoutError, BatchError, ValueError) as err:
+                error = sanitize_provider_error(err)
+                _LOGGER.warning("Could not check batch %s: %s", job["batch_id"], error)
+                await self.batch_jobs.async_update(job["id"], checked_at=checked_at, last_error=error)
+                continue
+            if not status.done:
+                await self.batch_jobs.async_update(
+                    job["id"], status=status.status, request_counts=status.counts, checked_at=checked_at, last_error=None
+                )
+                continue
+            await self.batch_jobs.async_update(job["id"], status=status.status, ingested_at=checked_at)
+            try:
+                async with self._generation_lock:
+                    await self._async_ingest_batch(job, status.status, status.counts, results)
+            except Exception as err:  # noqa: BLE001
+                error = sanitize_provider_error(err)
+                attempts = int(job.get("ingest_attempts") or 0) + 1
+                _LOGGER.error("Could not store the results of batch %s: %s", job["batch_id"], error)
+                if await store.async_get_run(job["id"]) is None:
+                    if attempts < BATCH_INGEST_ATTEMPTS:
+                        # Nothing was stored, so the next poll may ingest the job again.
+                        await self.batch_jobs.async_update(
+                            job["id"], ingested_at=None, ingest_attempts=attempts, last_error=error
+                        )
+                        continue
+                    async with self._generation_lock:
+                        self._last_error = f"The results of batch {job['batch_id']} could not be stored: {error}"
+                        await self._async_record_failure(
+                            run_id=job["id"],
+                            provider=job["provider"],
+                            model=job["model"],
+                            now=datetime.now(),
+                            warnings=list(job.get("warnings") or []),
+                        )
+                        self.async_update_listeners()
+                    await self.batch_jobs.async_remove(job["id"])
+                    continue
+            await self.batch_jobs.async_remove(job["id"])
+            finished += 1
+        return finished
+
+    async def _async_batch_pending_entities(self) -> set[str]:
+        """Return the entities sent in this entry's batch jobs that are not ingested yet."""
+
+        return {
+            entity_id
+            for job in await self.batch_jobs.async_list(self.entry.entry_id)
+            for shard in job.get("shards") or ()
+            for entity_id in shard["entity_ids"]
+        }
+
+    async def _async_ingest_batch(
+        self, job: dict[str, Any], status: str, counts: dict[str, Any], results: dict[str, BatchResult]
+    ) -> None:
+        """Parse a finished batch's responses and store them as one run."""
+
+        now = datetime.now()
+        run_id, provider, model = job["id"], job["provider"], job["model"]
+        warnings = list(job.get("warnings") or [])
+        self._last_error = None
+        self._publish(EVENT_GENERATION_STARTED, run_id, provider=provider, model=model, batch_id=job["batch_id"])
+        answers: list[tuple[list[str], str, dict[str, Any]]] = []
+        shard_summaries: list[dict[str, Any]] = []
+        for shard in job["shards"]:
+            entity_ids = list(shard["entity_ids"])
+            result = results.get(shard["custom_id"])
+            text = None
+            metadata: dict[str, Any] = {}
+            if result is None:
+                error = "The batch returned no result for this request."
+            elif result.body is None:
+                error = sanitize_provider_error(result.error)
+            else:
+                metadata = {"usage": result.body.get("usage")}
+                error = "The batch response contained no text."
+                try:
+                    text = self._batch_response_text(provider, model, result.body)
+                except ValueError as err:
+                    error = str(err)
+            if text:
+                answers.append((entity_ids, text, metadata))
+                shard_summaries.append({"entities": len(entity_ids), "status": "completed", "response_metadata": metadata})
+            else:
+                shard_summaries.append({"entities": len(entity_ids), "status": "failed", "error": error})
+        failures = len(shard_summaries) - len(answers)
+        if failures:
+            warnings.append(f"{failures} of {len(shard_summaries)} batch requests failed; their entities remain pending.")
+        self._last_response_metadata = {
+            "batch": {"id": job["batch_id"], "status": status, "submitted_at": job["submitted_at"], "request_counts": counts},
+            "shards": shard_summaries,
+        }
+        batches = [
+            parse_suggestion_response(
+                text,
+                provider=provider,
+                model=model,
+                created_at=now,
+                entities_processed=entity_ids,
+                inherited_warnings=warnings,
+                response_metadata=metadata,
+                run_id=run_id,
+            )
+            for entity_ids, text, metadata in answers
+        ]
+        responses = [text for _, text, _ in answers]
+        processed = [entity_id for entity_ids, _, _ in answers for entity_id in entity_ids]
+        merged = merge_suggestions(batches)
+        if merged:
+            for suggestion in merged:
+                self._publish(EVENT_SUGGESTION_PARSED, run_id, suggestion=suggestion)
+            await self._async_store_run(
+                merged,
+                response="\n\n".join(responses),
+                run_id=run_id,
+                provider=provider,
+                model=model,
+                now=now,
+                entity_ids=processed,
+                warnings=warnings,
+                notification_id=f"ai_automation_suggestions_{now.timestamp()}",
+            )
+            # The job records what was sent; the filters in effect now may differ
+            # from those of the call that submitted it.
+            self.previous_entities.update(
+                {
+                    entity_id: entity_snapshot(state)
+                    for entity_id in processed
+                    if (state := self.hass.states.get(entity_id)) is not None
+                }
+            )
+        else:
+            self._last_error = next(
+                (summary["error"] for summary in shard_summaries if summary.get("error")),
+                f"Batch {job['batch_id']} ended with status {status} and no usable suggestions.",
+            )
+            await self._async_record_failure(run_id=run_id, provider=provider, model=model, now=now, warnings=warnings)
+        self.async_update_listeners()
+
+    async def _async_dispatch_shards(
+        self, prompts: list[PromptBuildResult], results: list[ShardResult | None]
+    ) -> None:
+        """Dispatch shard prompts with bounded concurrency, filling ``results`` as they finish.
+
+        Results are written in place so shards that finished before a
+        cancellation or the deadline are kept.
+        """
+
+        semaphore = asyncio.Semaphore(
+            max(1, int(self._opt(CONF_SHARD_CONCURRENCY, DEFAULT_SHARD_CONCURRENCY)))
+        )
+
+        async def run_shard(index: int, prompt_result: PromptBuildResult) -> None:
+            async with semaphore:
+                # gather() runs each shard in its own task and context copy.
+                state = RequestState(
+                    prompt_static_prefix=prompt_result.static_prefix, prompt_tokens=prompt_result.token_count
+                )
+                _REQUEST_STATE.set(state)
+                text = await self._dispatch(prompt_result.prompt)
+                cached_tokens = cached_input_tokens(state.response_metadata.get("usage"))
+                if cached_tokens is not None:
+                    state.response_metadata["cached_input_tokens"] = cached_tokens
+                results[index] = ShardResult(text, state.last_error, state.response_metadata)
+
+        await asyncio.gather(*(run_shard(index, prompt_result) for index, prompt_result in enumerate(prompts)))
+
+    async def _async_dispatch_until_deadline(self, prompt: str) -> str | None:
+        """Dispatch the prompt, giving up at the run deadline or on cancellation.
+
+        The deadline covers the whole provider call, including every Ollama
+        candidate endpoint, rather than each HTTP request.
+        """
+
+        return await self._async_until_deadline(partial(self._async_dispatch_hedged, prompt))
+
+    def _hedge_target(self) -> AIAutomationCoordinator | None:
+        """Return the coordinator of the configured hedge entry, if it is loaded."""
+
+        entry_id = self._opt(CONF_HEDGE_ENTRY, DEFAULT_HEDGE_ENTRY)
+        if not entry_id or entry_id == self.entry.entry_id:
+            return None
+        target = self.hass.data.get(DOMAIN, {}).get(entry_id)
+        return target if isinstance(target, AIAutomationCoordinator) else None
+
+    async def _async_dispatch_hedged(self, prompt: str) -> str | None:
+        """Dispatch the prompt, racing the hedge entry when this provider is slow.
+
+        If no output has arrived within the hedge delay (no streamed token,
+        or no complete response when streaming is off), the same prompt is
+        also sent to the hedge entry. The first usable response wins and the
+        other request is cancelled; the outcome is recorded under ``hedge``
+        in the response metadata.
+        """
+
+        secondary = self._hedge_target()
+        if secondary is None:
+            return await self._dispatch(prompt)
+        delay = float(self._opt(CONF_HEDGE_DELAY, DEFAULT_HEDGE_DELAY))
+        started = time.monotonic()
+        first_output = asyncio.Event()
+        listener = self._stream_listener
+
+        @callback
+        def on_delta(delta: str) -> None:
+            first_output.set()
+            if listener is not None:
+                listener(delta)
+
+        loop = asyncio.get_running_loop()
+        secondary_state = RequestState(
+            prompt_static_prefix=self._prompt_static_prefix, prompt_tokens=self._prompt_tokens
+        )
+        self._stream_listener = on_delta
+        primary = loop.create_task(self._dispatch(prompt))
+        hedge: asyncio.Task | None = None
+        winner: asyncio.Task | None = None
+        try:
+            output = loop.create_task(first_output.wait())
+            try:
+                await asyncio.wait({primary, output}, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                output.cancel()
+            if primary.done() or first_output.is_set():
+                return await primary
+            hedge = loop.create_task(_async_dispatch_in_state(secondary, prompt, secondary_state))
+            pending = {primary, hedge}
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # The primary wins a tie.
+                winner = next((task for task in (primary, hedge) if task in done and task.result()), None)
+        finally:
+            self._stream_listener = listener
+            outstanding = [task for task in (primary, hedge) if task is not None and not task.done()]
+            for task in outstanding:
+                task.cancel()
+            await asyncio.gather(*outstanding, return_exceptions=True)
+
+        if winner is hedge:
+            self._last_response_metadata = dict(secondary_state.response_metadata)
+            self._last_error = None
+        elif winner is None and not self._last_error:
+            self._last_error = secondary_state.last_error
+        self._last_response_metadata = {
+            **self._last_response_metadata,
+            "hedge": {
+                "entry": secondary.entry.title,
+                "provider": secondary._opt(CONF_PROVIDER, "OpenAI"),
+                "model": secondary._current_model(),
+                "delay_seconds": delay,
+                "winner": None if winner is None else "primary" if winner is primary else "secondary",
+                "elapsed_seconds": round(time.monotonic() - started, 3),
+            },
+        }
+        return winner.result() if winner is not None else None
+
+    async def _async_until_deadline(self, call: Callable[[], Coroutine[Any, Any, Any]], *, waves: int = 1) -> Any:
+        """Run ``call`` as the run's cancellable dispatch task, bounded by the deadline."""
+
+        deadline = self._generation_deadline(waves)
+        started = time.monotonic()
+        if self._cancel_requested_for is not None and self._cancel_requested_for == self._active_run_id:
+            self._record_cancellation("cancelled", started, deadline)
+            return None
+        task = asyncio.get_running_loop().create_task(call())
+        self._dispatch_task = task
+        try:
+            done, _ = await asyncio.wait({task}, timeout=deadline)
+        finally:
+            self._dispatch_task = None
+            if not task.done():
+                task.cancel()
+        if task in done and not task.cancelled():
+            return task.result()
+        with suppress(asyncio.CancelledError):
+            await task
+        self._record_cancellation("cancelled" if task in done else "deadline", started, deadline)
+        return None
+
+    def _record_cancellation(self, reason: str, started: float, deadline: float) -> None:
+        self._last_response_metadata = {
+            **self._last_response_metadata,
+            "cancelled": True,
+            "cancel_reason": reason,
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+        }
+        if reason == "deadline":
+            self._last_error = f"Suggestion generation exceeded its {deadline:g} second deadline."
+        else:
+            self._last_error = "Suggestion generation was cancelled."
+        _LOGGER.warning("%s", self._last_error)
+
+    def _start_stream_preview(
+        self,
+        *,
+        provider: str,
+        model: str,
+        now: datetime,
+        prompt_result: PromptBuildResult,
+        warnings: list[str],
+        history: list[dict[str, Any]],
+        notification_id: str,
+        run_id: str,
+    ) -> StreamingSuggestionParser:
+        """Publish suggestions to listeners as a streamed response completes them.
+
+        Previews are not persisted; the store is written once the full
+        response has been parsed, so the stored format is unchanged.
+        """
+
+        parser = StreamingSuggestionParser(
+            provider=provider,
+            model=model,
+            created_at=now,
+            entities_processed=list(prompt_result.entity_ids),
+            inherited_warnings=warnings,
+            run_id=run_id,
+        )
+        received: list[str] = []
+
+        @callback
+        def on_delta(delta: str) -> None:
+            if not received:
+                self._publish(EVENT_FIRST_TOKEN, run_id)
+            received.append(delta)
+            completed = parser.feed(delta)
+            if not completed:
+                return
+            for suggestion in completed:
+                self._publish(EVENT_SUGGESTION_PARSED, run_id, suggestion=suggestion)
+            first = parser.items[0]
+            if first is not self.data.get("suggestion"):
+                persistent_notification.async_create(
+                    self.hass,
+                    message=format_suggestion_notification(first),
+                    title=f"AI Automation Suggestions ({provider})",
+                    notification_id=notification_id,
+                )
+            self.data = {
+                **self.data,
+                "suggestions": "".join(received),
+                "suggestion": first,
+                "suggestion_history": [*parser.items, *history],
+                "suggestion_count": len(parser.items) + len(history),
+                "description": first.get("description"),
+                "yaml_block": first.get("yamlCode"),
+                "last_update": now,
+                "entities_processed": list(prompt_result.entity_ids),
+                "provider": provider,
+                "model": model,
+                "warnings": first.get("warnings", warnings),
+            }
+            self.async_update_listeners()
+
+        self._stream_listener = on_delta
+        return parser
+
+    @callback
+    def _publish(self, event_type: str, run_id: str, **data: Any) -> None:
+        """Publish a generation progress event for this entry."""
+
+        async_publish(self.hass, event_type, entry_id=self.entry.entry_id, run_id=run_id, **data)
 
     def _prune_processed_entities(self, current: dict[str, dict]) -> None:
         """Forget removed entities while retaining entities already processed."""
@@ -517,116 +1710,115 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             suggestion["warnings"] = list(dict.fromkeys(suggestion_warnings))
 
     def _collect_entities(self) -> dict[str, dict]:
-        current: dict[str, dict] = {}
-        selected_domains = set(self.selected_domains)
-        for entity_id in self.hass.states.async_entity_ids():
+        """Return eligible entity context from the live entity index."""
+
+        selected_domains = frozenset(self.selected_domains)
+        filter_key = (
+            selected_domains,
+            tuple(self.excluded_domains),
+            tuple(self.excluded_entities),
+            tuple(self.excluded_areas),
+        )
+
+        def is_eligible(entity_id: str) -> bool:
             domain = entity_id.split(".", 1)[0]
             if selected_domains and domain not in selected_domains:
-                continue
-            if self._is_entity_excluded(entity_id):
-                continue
-            state = self.hass.states.get(entity_id)
-            if state:
-                current[entity_id] = {
-                    "state": state.state,
-                    "attributes": state.attributes,
-                    "last_changed": state.last_changed,
-                    "last_updated": state.last_updated,
-                    "friendly_name": state.attributes.get("friendly_name", entity_id),
-                }
-        return current
+                return False
+            return not self._is_entity_excluded(entity_id)
+
+        return self.entity_index.async_eligible(filter_key, is_eligible)
+
+    def _current_exclusions(self) -> tuple[frozenset[str], frozenset[str], frozenset[str]]:
+        """Return excluded domain, entity, and lowercased area sets.
+
+        Request settings change only per generation, so the sets are rebuilt
+        when the settings change rather than on every entity check.
+        """
+
+        key = (tuple(self.excluded_domains), tuple(self.excluded_entities), tuple(self.excluded_areas))
+        if key != self._exclusion_key:
+            self._exclusion_sets = (
+                frozenset(self.excluded_domains),
+                frozenset(self.excluded_entities),
+                frozenset(area.lower() for area in self.excluded_areas),
+            )
+            self._exclusion_key = key
+        return self._exclusion_sets
 
     def _is_entity_excluded(self, entity_id: str) -> bool:
-        domain = entity_id.split(".", 1)[0]
-        if domain in set(self.excluded_domains):
-            return True
-        if entity_id in set(self.excluded_entities):
+        excluded_domains, excluded_entities, excluded_areas = self._current_exclusions()
+        if entity_id.split(".", 1)[0] in excluded_domains or entity_id in excluded_entities:
             return True
-        if not self.excluded_areas or not self.entity_registry:
+        if not excluded_areas:
             return False
+        return not excluded_areas.isdisjoint(self.entity_contexts.async_resolve(entity_id).area_keys)
 
-        entity_entry = self.entity_registry.async_get(entity_id)
-        device_entry = None
-        if entity_entry and entity_entry.device_id and self.device_registry:
-            device_entry = self.device_registry.async_get(entity_entry.device_id)
-        area_id = entity_entry.area_id if entity_entry and entity_entry.area_id else None
-        if not area_id and device_entry:
-            area_id = device_entry.area_id
-        area_names = {area_id.lower()} if area_id else set()
-        if area_id and self.area_registry:
-            area_entry = self.area_registry.async_get_area(area_id)
-            if area_entry:
-                area_names.add(area_entry.name.lower())
-        excluded = {area.lower() for area in self.excluded_areas}
-        return bool(area_names & excluded)
-
-    async def _build_prompt(self, entities: dict[str, dict]) -> PromptBuildResult:
-        """Build a prompt from complete context blocks within the configured budget."""
-
-        max_attr = 500
-        max_autom = self.automation_limit
-        max_script = self.script_limit
-        warnings: list[str] = []
-        attribute_truncations = 0
-        compact_entities = 0
-        sample_size = min(len(entities), self.entity_limit)
-        sampled_entities = random.sample(list(entities.items()), sample_size)
-        entity_blocks: list[tuple[str, str, str]] = []
+    def _entity_blocks(self, entity_id: str, meta: dict[str, Any], max_attr: int) -> EntityPromptBlocks:
+        """Render full and compact prompt blocks, reusing unchanged entities.
 
-        if sample_size < len(entities):
-            warnings.append(
-                f"The entity limit selected {sample_size} of {len(entities)} eligible entities; "
-                "the remaining new entities are deferred to a later run."
-            )
+        ``last_updated`` changes whenever the state or any attribute changes,
+        so together with the resolved registry context it fingerprints
+        everything the rendered text depends on without hashing attributes.
+        """
 
-        for entity_id, meta in sampled_entities:
-            domain = entity_id.split(".", 1)[0]
-            attr_str = str(meta["attributes"])
-            if len(attr_str) > max_attr:
-                attr_str = f"{attr_str[:max_attr]}...(truncated)"
-                attribute_truncations += 1
+        context = self.entity_contexts.async_resolve(entity_id)
+        key = (
+            entity_id,
+            meta["state"],
+            meta["last_updated"],
+            meta["last_changed"],
+            meta["friendly_name"],
+            context,
+            max_attr,
+        )
+        cached = self.prompt_block_cache.get(key)
+        if cached is not None:
+            return cached
 
-            entity_entry = self.entity_registry.async_get(entity_id)
-            device_entry = (
-                self.device_registry.async_get(entity_entry.device_id)
-                if entity_entry and entity_entry.device_id
-                else None
-            )
-            area_id = entity_entry.area_id if entity_entry and entity_entry.area_id else None
-            if not area_id and device_entry:
-                area_id = device_entry.area_id
-            area_name = "Unknown Area"
-            if area_id:
-                area_entry = self.area_registry.async_get_area(area_id)
-                if area_entry:
-                    area_name = area_entry.name
-
-            block = (
-                f"Entity: {entity_id}\n"
-                f"Friendly Name: {meta['friendly_name']}\n"
-                f"Domain: {domain}\n"
-                f"State: {meta['state']}\n"
-                f"Attributes: {attr_str}\n"
-                f"Area: {area_name}\n"
-            )
-            if device_entry:
-                block += (
-                    "Device Info:\n"
-                    f"  Manufacturer: {device_entry.manufacturer}\n"
-                    f"  Model: {device_entry.model}\n"
-                    f"  Device Name: {device_entry.name_by_user or device_entry.name}\n"
-                    f"  Device ID: {device_entry.id}\n"
-                )
-            block += f"Last Changed: {meta['last_changed']}\nLast Updated: {meta['last_updated']}\n---\n"
-            compact_block = (
-                f"Entity: {entity_id}\n"
-                f"Friendly Name: {meta['friendly_name']}\n"
-                f"Domain: {domain}\n"
-                f"State: {meta['state']}\n"
-                f"Area: {area_name}\n"
-                "---\n"
+        domain = entity_id.split(".", 1)[0]
+        attr_str = str(meta["attributes"])
+        attributes_truncated = len(attr_str) > max_attr
+        if attributes_truncated:
+            attr_str = f"{attr_str[:max_attr]}...(truncated)"
+        area_name = context.area_name or "Unknown Area"
+
+        block = (
+            f"Entity: {entity_id}\n"
+            f"Friendly Name: {meta['friendly_name']}\n"
+            f"Domain: {domain}\n"
+            f"State: {meta['state']}\n"
+            f"Attributes: {attr_str}\n"
+            f"Area: {area_name}\n"
+        )
+        if context.device_id:
+            block += (
+                "Device Info:\n"
+                f"  Manufacturer: {context.manufacturer}\n"
+                f"  Model: {context.model}\n"
+                f"  Device Name: {context.device_name}\n"
+                f"  Device ID: {context.device_id}\n"
             )
-            entity_blocks.append((entity_id, block, compact_block))
+        block += f"Last Changed: {meta['last_changed']}\nLast Updated: {meta['last_updated']}\n---\n"
+        compact_block = (
+            f"Entity: {entity_id}\n"
+            f"Friendly Name: {meta['friendly_name']}\n"
+            f"Domain: {domain}\n"
+            f"State: {meta['state']}\n"
+            f"Area: {area_name}\n"
+            "---\n"
+        )
+        rendered = EntityPromptBlocks(
+            block,
+            compact_block,
+            attributes_truncated,
+            self.token_counter.count(block),
+            self.token_counter.count(compact_block),
+        )
+        self.prompt_block_cache.set(key, rendered)
+        return rendered
+
+    def _prompt_frame(self) -> tuple[str, str, int, str | None]:
+        """Return the fixed prompt prefix and suffix, the input budget, and any budget warning."""
 
         language_instruction = suggestion_language_instruction(getattr(self.hass.config, "language", None))
         language_block = f"{language_instruction}\n\n" if language_instruction else ""
@@ -640,38 +1832,131 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             "Analyze the entities and existing automations and scripts. Propose useful new automations/scripts or improvements "
             "that reference only the entity_ids shown above."
         )
-        in_budget, _ = self._budgets()
-        character_budget = max(1, in_budget) * 4
-        remaining = character_budget - len(prefix) - len(suffix)
+        in_budget, out_budget = self._budgets()
+        input_budget = max(1, in_budget)
+        context_window = self._context_window()
+        warning = None
+        if context_window and input_budget + out_budget > context_window:
+            input_budget = max(1, context_window - out_budget)
+            warning = (
+                f"The input budget was reduced to {input_budget} tokens so the prompt and the {out_budget}-token "
+                f"output budget fit the model's {context_window}-token context window."
+            )
+        return prefix, suffix, input_budget, warning
+
+    async def _build_prompt(self, entities: dict[str, dict], *, include_context: bool = True) -> PromptBuildResult:
+        """Build a prompt from complete context blocks within the configured budget.
+
+        ``include_context=False`` leaves out the automation and script
+        sections, for shards after the first in a sharded run.
+        """
+
+        max_attr = MAX_PROMPT_ATTRIBUTE_CHARS
+        warnings: list[str] = []
+        attribute_truncations = 0
+        compact_entities = 0
+        stable_layout = bool(self._opt(CONF_STABLE_PROMPT_LAYOUT, DEFAULT_STABLE_PROMPT_LAYOUT))
+        sample_size = min(len(entities), self.entity_limit)
+        # Sampling keeps every entity reachable on repeated all-entity runs.
+        # The cached prefix ends before the entities, so the stable layout only
+        # needs the chosen sample in a fixed order.
+        sampled_entities = random.sample(list(entities.items()), sample_size)
+        if stable_layout:
+            sampled_entities.sort(key=lambda item: item[0])
+        entity_blocks: list[tuple[str, EntityPromptBlocks]] = []
+
+        if sample_size < len(entities):
+            warnings.append(
+                f"The entity limit selected {sample_size} of {len(entities)} eligible entities; "
+                "the remaining new entities are deferred to a later run."
+            )
+
+        for entity_id, meta in sampled_entities:
+            rendered = self._entity_blocks(entity_id, meta, max_attr)
+            if rendered.attributes_truncated:
+                attribute_truncations += 1
+            entity_blocks.append((entity_id, rendered))
+
+        prefix, suffix, input_budget, budget_warning = self._prompt_frame()
+        if budget_warning:
+            warnings.append(budget_warning)
+        count = self.token_counter.count
+        remaining = input_budget - count(prefix) - count(suffix)
         if remaining <= 0:
             raise ValueError(
                 "The max input token setting is too small for the required instructions. "
                 "Increase max input tokens and try again."
             )
 
-        prompt_parts = [prefix]
-        entity_heading = "Entities in your Home Assistant (sampled):\n"
-        if len(entity_heading) >= remaining:
+        entity_parts: list[str] = []
+        context_parts: list[str] = []
+        entity_heading = ("\n" if stable_layout else "") + ENTITY_HEADING
+        if count(entity_heading) >= remaining:
             raise ValueError(
                 "The max input token setting leaves no room for entity context. "
                 "Increase max input tokens and try again."
             )
-        prompt_parts.append(entity_heading)
-        remaining -= len(entity_heading)
+
+        def append_section(heading: str, blocks: list[str], empty_text: str) -> int:
+            """Append as many complete section blocks as fit and return the count."""
+
+            nonlocal remaining
+            section_heading = f"\n{heading}:\n"
+            if not blocks:
+                empty_section = f"{section_heading}{empty_text}\n"
+                empty_tokens = count(empty_section)
+                if empty_tokens <= remaining:
+                    context_parts.append(empty_section)
+                    remaining -= empty_tokens
+                return 0
+
+            heading_tokens = count(section_heading)
+            section_space = remaining - heading_tokens
+            if section_space <= 0:
+                return 0
+            included_blocks: list[str] = []
+            for section_block in blocks:
+                block_tokens = count(section_block)
+                if block_tokens <= section_space:
+                    included_blocks.append(section_block)
+                    section_space -= block_tokens
+            if included_blocks:
+                context_parts.append(section_heading)
+                context_parts.extend(included_blocks)
+                remaining = section_space
+            return len(included_blocks)
+
+        async def add_context() -> None:
+            for heading, blocks, empty_text, label in await self._async_context_sections():
+                included = append_section(heading, blocks, empty_text)
+                if included < len(blocks):
+                    warnings.append(f"The input budget included {included} of {len(blocks)} {label}.")
+
+        # The default layout budgets entities first. The stable layout budgets
+        # the context first so that the cached prefix does not depend on how
+        # many tokens the entities used, keeping room for one entity.
+        if stable_layout and include_context:
+            reserved = count(entity_heading) + (entity_blocks[0][1].compact_tokens if entity_blocks else 0)
+            remaining -= reserved
+            await add_context()
+            remaining += reserved
+
+        entity_parts.append(entity_heading)
+        remaining -= count(entity_heading)
         included_entity_ids: list[str] = []
-        for entity_id, full_block, compact_block in entity_blocks:
-            if len(full_block) <= remaining:
-                prompt_parts.append(full_block)
-                remaining -= len(full_block)
+        for entity_id, rendered in entity_blocks:
+            if rendered.full_tokens <= remaining:
+                entity_parts.append(rendered.full)
+                remaining -= rendered.full_tokens
                 included_entity_ids.append(entity_id)
-            elif len(compact_block) <= remaining:
-                prompt_parts.append(compact_block)
-                remaining -= len(compact_block)
+            elif rendered.compact_tokens <= remaining:
+                entity_parts.append(rendered.compact)
+                remaining -= rendered.compact_tokens
                 included_entity_ids.append(entity_id)
                 compact_entities += 1
             else:
-                # Preserve the randomized sample order. Skipping ahead would
-                # bias low-budget prompts toward entities with shorter names.
+                # Preserve the sample order. Skipping ahead would bias
+                # low-budget prompts toward entities with shorter names.
                 break
 
         if not included_entity_ids:
@@ -694,88 +1979,76 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 f"Long attribute text was shortened for {attribute_truncations} entities to stay within the input budget."
             )
 
-        def append_section(heading: str, blocks: list[str], empty_text: str) -> int:
-            """Append as many complete section blocks as fit and return the count."""
-
-            nonlocal remaining
-            section_heading = f"\n{heading}:\n"
-            if not blocks:
-                empty_section = f"{section_heading}{empty_text}\n"
-                if len(empty_section) <= remaining:
-                    prompt_parts.append(empty_section)
-                    remaining -= len(empty_section)
-                return 0
-
-            section_space = remaining - len(section_heading)
-            if section_space <= 0:
-                return 0
-            included_blocks: list[str] = []
-            for section_block in blocks:
-                if len(section_block) <= section_space:
-                    included_blocks.append(section_block)
-                    section_space -= len(section_block)
-            if included_blocks:
-                prompt_parts.append(section_heading)
-                prompt_parts.extend(included_blocks)
-                used = len(section_heading) + sum(len(item) for item in included_blocks)
-                remaining -= used
-            return len(included_blocks)
-
-        automation_sections = self._read_automations_default(max_autom, max_attr)
-        included_automations = append_section(
-            "Existing Automations Overview",
-            automation_sections,
-            "None found.",
-        )
-        if included_automations < len(automation_sections):
-            warnings.append(
-                f"The input budget included {included_automations} of {len(automation_sections)} automation summaries."
-            )
-
-        automation_codes = (
-            await self._read_automations_file_method(max_autom)
-            if self.automation_read_file
-            else []
-        )
-        included_automation_codes = append_section(
-            "Automations YAML Code (for analysis and improvement)",
-            automation_codes,
-            "No automations YAML code included.",
-        )
-        if included_automation_codes < len(automation_codes):
-            warnings.append(
-                f"The input budget included {included_automation_codes} of {len(automation_codes)} automation YAML blocks."
-            )
-
-        script_sections = self._read_scripts_default(max_script, max_attr)
-        included_scripts = append_section("Scripts Overview", script_sections, "None found.")
-        if included_scripts < len(script_sections):
-            warnings.append(
-                f"The input budget included {included_scripts} of {len(script_sections)} script summaries."
-            )
-
-        script_codes = (
-            await self._read_scripts_file_method(max_script)
-            if self.script_read_file
-            else []
-        )
-        included_script_codes = append_section(
-            "Scripts YAML Code (for analysis and improvement)",
-            script_codes,
-            "No scripts YAML code included.",
-        )
-        if included_script_codes < len(script_codes):
-            warnings.append(
-                f"The input budget included {included_script_codes} of {len(script_codes)} script YAML blocks."
-            )
-
-        prompt_parts.append(suffix)
+        if include_context and not stable_layout:
+            await add_context()
+
+        if stable_layout:
+            # Instructions and the automation and script context change far
+            # less often than entity states, so they form the cached prefix.
+            static_prefix = prefix + "".join(context_parts)
+            prompt = static_prefix + "".join(entity_parts) + suffix
+        else:
+            static_prefix = prefix
+            prompt = prefix + "".join(entity_parts) + "".join(context_parts) + suffix
         return PromptBuildResult(
-            prompt="".join(prompt_parts),
+            prompt=prompt,
             entity_ids=tuple(included_entity_ids),
             warnings=tuple(warnings),
+            token_count=input_budget - remaining,
+            input_budget=input_budget,
+            context_window=self._context_window(),
+            tokenizer=self.token_counter.name,
+            static_prefix=static_prefix,
         )
 
+    async def _async_context_sections(self) -> list[tuple[str, list[str], str, str]]:
+        """Return the automation and script context as (heading, blocks, empty text, label) sections."""
+
+        max_attr = MAX_PROMPT_ATTRIBUTE_CHARS
+        automation_codes = (
+            await self._read_automations_file_method(self.automation_limit) if self.automation_read_file else []
+        )
+        script_codes = await self._read_scripts_file_method(self.script_limit) if self.script_read_file else []
+        return [
+            (
+                "Existing Automations Overview",
+                self._read_automations_default(self.automation_limit, max_attr),
+                "None found.",
+                "automation summaries",
+            ),
+            (
+                "Automations YAML Code (for analysis and improvement)",
+                automation_codes,
+                "No automations YAML code included.",
+                "automation YAML blocks",
+            ),
+            (
+                "Scripts Overview",
+                self._read_scripts_default(self.script_limit, max_attr),
+                "None found.",
+                "script summaries",
+            ),
+            (
+                "Scripts YAML Code (for analysis and improvement)",
+                script_codes,
+                "No scripts YAML code included.",
+                "script YAML blocks",
+            ),
+        ]
+
+    def _context_tokens(self, sections: list[tuple[str, list[str], str, str]]) -> int:
+        """Return the tokens the context sections take when nothing is left out."""
+
+        count = self.token_counter.count
+        total = 0
+        for heading, blocks, empty_text, _ in sections:
+            section_heading = f"\n{heading}:\n"
+            if blocks:
+                total += count(section_heading) + sum(count(block) for block in blocks)
+            else:
+                total += count(f"{section_heading}{empty_text}\n")
+        return total
+
     def _read_automations_default(self, max_autom: int, max_attr: int) -> list[str]:
         autom_sections: list[str] = []
         for automation_id in self.hass.states.async_entity_ids("automation")[:max_autom]:
@@ -795,27 +2068,7 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
 
     async def _read_automations_file_method(self, max_autom: int) -> list[str]:
         automations_file = Path(self.hass.config.path()) / "automations.yaml"
-        autom_codes: list[str] = []
-        try:
-            async with await anyio.open_file(automations_file, "r", encoding="utf-8") as file:
-                content = await file.read()
-            automations = yaml.safe_load(content) or []
-            if not isinstance(automations, list):
-                _LOGGER.warning("automations.yaml did not parse as a list")
-                return autom_codes
-            for automation in automations[:max_autom]:
-                if not isinstance(automation, dict):
-                    continue
-                autom_codes.append(
-                    "Automation YAML:\n```yaml\n"
-                    f"{yaml.safe_dump([automation], sort_keys=False)}"
-                    "```\n---\n"
-                )
-        except FileNotFoundError:
-            _LOGGER.warning("automations.yaml file was not found")
-        except yaml.YAMLError as err:
-            _LOGGER.warning("Error parsing automations.yaml: %s", err)
-        return autom_codes
+        return await self.yaml_blocks.async_blocks(self.hass, KIND_AUTOMATIONS, automations_file, max_autom)
 
     def _read_scripts_default(self, max_script: int, max_attr: int) -> list[str]:
         script_sections: list[str] = []
@@ -836,27 +2089,7 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         
     async def _read_scripts_file_method(self, max_script: int) -> list[str]:
         scripts_file = Path(self.hass.config.path()) / "scripts.yaml"
-        script_codes: list[str] = []
-        try:
-            async with await anyio.open_file(scripts_file, "r", encoding="utf-8") as file:
-                content = await file.read()
-            scripts = yaml.safe_load(content) or {}
-            if not isinstance(scripts, dict):
-                _LOGGER.warning("scripts.yaml did not parse as a dict")
-                return script_codes
-            for script_id, script in list(scripts.items())[:max_script]:
-                if not isinstance(script, dict):
-                    continue
-                script_codes.append(
-                    "Script YAML:\n```yaml\n"
-                    f"{yaml.safe_dump({script_id: script}, sort_keys=False)}"
-                    "```\n---\n"
-                )
-        except FileNotFoundError:
-            _LOGGER.warning("scripts.yaml file was not found")
-        except yaml.YAMLError as err:
-            _LOGGER.warning("Error parsing scripts.yaml: %s", err)
-        return script_codes
+        return await self.yaml_blocks.async_blocks(self.hass, KIND_SCRIPTS, scripts_file, max_script)
 
     async def _dispatch(self, prompt: str) -> str | None:
         provider = self._opt(CONF_PROVIDER, "OpenAI")
@@ -882,8 +2115,28 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             _LOGGER.error(self._last_error)
             return None
         try:
+            probe = self.circuit_breaker.before_request()
+        except CircuitOpenError as err:
+            self._last_error = str(err)
+            _LOGGER.warning("%s", self._last_error)
+            return None
+        reserved = 0
+        metadata = self._last_response_metadata
+        try:
+            _, out_budget = self._budgets()
+            reserved = await self.rate_governor.async_acquire(
+                (self._prompt_tokens or self.token_counter.count(prompt)) + out_budget
+            )
             return await handler(prompt)
         except Exception as err:  # noqa: BLE001
+            # Client libraries such as LiteLLM raise instead of returning a response;
+            # their errors carry the HTTP status, so a RateLimitError arrives as a 429.
+            status = int(getattr(err, "status_code", 0) or 0)
+            if isinstance(err, (aiohttp.ClientConnectionError, asyncio.TimeoutError)) or is_transient_status(status):
+                self.circuit_breaker.record_failure(
+                    retry_after_seconds(getattr(getattr(err, "response", None), "headers", None)),
+                    rate_limited=status == 429,
+                )
             self._last_error = sanitize_provider_error(err)
             _LOGGER.error(
                 "Dispatch error for %s (%s): %s",
@@ -892,6 +2145,13 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 self._last_error,
             )
             return None
+        finally:
+            if reserved:
+                # Handlers replace the metadata dict when they get a response.
+                used = self._last_response_metadata if self._last_response_metadata is not metadata else {}
+                self.rate_governor.settle(reserved, usage_total_tokens(used.get("usage")))
+            if probe:
+                self.circuit_breaker.release_probe()
 
     def _trim_prompt(self, prompt: str) -> str:
         """Return a prompt assembled from complete blocks.
@@ -901,15 +2161,27 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         """
 
         in_budget, _ = self._budgets()
-        if len(prompt) // 4 > in_budget:
+        estimated_tokens = self.token_counter.count(prompt)
+        if estimated_tokens > in_budget:
             _LOGGER.warning(
                 "Prompt estimate exceeds the configured input budget (%s estimated tokens > %s); "
                 "sending complete context blocks rather than corrupting the prompt",
-                len(prompt) // 4,
+                estimated_tokens,
                 in_budget,
             )
         return prompt
 
+    def _record_response_status(self, response: aiohttp.ClientResponse) -> None:
+        """Feed an HTTP status and rate-limit headers to the circuit breaker and rate governor."""
+
+        self.rate_governor.learn(getattr(response, "headers", None))
+        if is_transient_status(response.status):
+            self.circuit_breaker.record_failure(
+                retry_after_seconds(getattr(response, "headers", None)), rate_limited=response.status == 429
+            )
+        else:
+            self.circuit_breaker.record_success()
+
     async def _post_json(
         self,
         endpoint: str,
@@ -924,6 +2196,7 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             json=body,
             timeout=self._timeout(),
         ) as response:
+            self._record_response_status(response)
             response_text = await response.text()
             if not 200 <= response.status < 300:
                 safe_response = sanitize_provider_error(response_text)
@@ -941,6 +2214,57 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 _LOGGER.error("%s", self._last_error)
                 return None
 
+    async def _post_stream(
+        self,
+        endpoint: str,
+        *,
+        headers: dict[str, str] | None = None,
+        body: dict[str, Any],
+        decoder: StreamDecoder,
+    ) -> str | None:
+        """POST a streaming request and forward text deltas as they arrive."""
+
+        async with self.session.post(
+            endpoint,
+            headers=headers,
+            json=body,
+            timeout=self._timeout(),
+        ) as response:
+            self._record_response_status(response)
+            if not 200 <= response.status < 300:
+                safe_response = sanitize_provider_error(await response.text())
+                self._last_error = f"{decoder.provider_label} error {response.status}: {safe_response}"
+                _LOGGER.error("%s", self._last_error)
+                return None
+            events = iter_ndjson(response) if decoder.ndjson else iter_sse_json(response)
+            async for payload in events:
+                delta = decoder.feed(payload)
+                if delta and self._stream_listener is not None:
+                    self._stream_listener(delta)
+        self._last_response_metadata = decoder.metadata
+        return decoder.text or None
+
+    async def _chat_completion(
+        self,
+        endpoint: str,
+        *,
+        headers: dict[str, str] | None = None,
+        body: dict[str, Any],
+        provider_label: str,
+        stream_usage: bool = False,
+    ) -> str | None:
+        """Send an OpenAI-compatible chat completion, streamed when enabled."""
+
+        if self._streaming_enabled():
+            body = {**body, "stream": True}
+            if stream_usage:
+                body["stream_options"] = {"include_usage": True}
+            return await self._post_stream(
+                endpoint, headers=headers, body=body, decoder=ChatCompletionStream(provider_label)
+            )
+        response = await self._post_json(endpoint, headers=headers, body=body, provider_label=provider_label)
+        return self._extract_chat_content(response, provider_label) if response else None
+
     def _openai_compatible_body(
         self,
         *,
@@ -1006,18 +2330,30 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
         if model_uses_responses_api("OpenAI", model):
             return await self._openai_responses(prompt, model, headers)
-        body = self._openai_compatible_body(
+        body = self._openai_chat_body(prompt, model)
+        return await self._chat_completion(
+            ENDPOINT_OPENAI, headers=headers, body=body, provider_label="OpenAI", stream_usage=True
+        )
+
+    def _openai_chat_body(self, prompt: str, model: str) -> dict[str, Any]:
+        return self._openai_compatible_body(
             provider="OpenAI",
             model=model,
             prompt=prompt,
             temperature=float(self._opt(CONF_OPENAI_TEMPERATURE, DEFAULT_TEMPERATURE)),
+            extra=self._openai_prompt_cache_params(),
         )
-        response = await self._post_json(ENDPOINT_OPENAI, headers=headers, body=body, provider_label="OpenAI")
-        return self._extract_chat_content(response, "OpenAI") if response else None
 
-    async def _openai_responses(self, prompt: str, model: str, headers: dict[str, str]) -> str | None:
+    def _openai_prompt_cache_params(self) -> dict[str, Any]:
+        """Route requests with the stable layout to the same OpenAI prompt cache."""
+
+        if not self._opt(CONF_STABLE_PROMPT_LAYOUT, DEFAULT_STABLE_PROMPT_LAYOUT):
+            return {}
+        return {"prompt_cache_key": f"{DOMAIN}-{self.entry.entry_id}"}
+
+    def _openai_responses_body(self, prompt: str, model: str) -> dict[str, Any]:
         _, out_budget = self._budgets()
-        body: dict[str, Any] = {
+        return {
             "model": model,
             "input": [{"role": "user", "content": prompt}],
             "max_output_tokens": out_budget,
@@ -1025,7 +2361,18 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
                 "effort": self._opt(CONF_OPENAI_REASONING_EFFORT, DEFAULT_OPENAI_REASONING_EFFORT)
             },
             "text": {"format": {"type": "json_schema", **json_schema_response_format()["json_schema"]}},
+            **self._openai_prompt_cache_params(),
         }
+
+    async def _openai_responses(self, prompt: str, model: str, headers: dict[str, str]) -> str | None:
+        body = self._openai_responses_body(prompt, model)
+        if self._streaming_enabled():
+            return await self._post_stream(
+                "https://api.openai.com/v1/responses",
+                headers=headers,
+                body={**body, "stream": True},
+                decoder=ResponsesStream("OpenAI Responses"),
+            )
         response = await self._post_json(
             "https://api.openai.com/v1/responses",
             headers=headers,
@@ -1039,15 +2386,7 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             "incomplete_details": response.get("incomplete_details"),
             "usage": response.get("usage"),
         }
-        if isinstance(response.get("output_text"), str):
-            return response["output_text"]
-        output = response.get("output") or []
-        text_parts: list[str] = []
-        for item in output:
-            for content in item.get("content", []) if isinstance(item, dict) else []:
-                if isinstance(content, dict) and content.get("type") in {"output_text", "text"}:
-                    text_parts.append(str(content.get("text", "")))
-        return "".join(text_parts) if text_parts else None
+        return _responses_text(response)
 
     async def _openai_azure(self, prompt: str) -> str | None:
         endpoint_base = self._opt(CONF_OPENAI_AZURE_ENDPOINT)
@@ -1068,13 +2407,12 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         }
         if should_send_temperature("OpenAI Azure", model):
             body["temperature"] = float(self._opt(CONF_OPENAI_AZURE_TEMPERATURE, DEFAULT_TEMPERATURE))
-        response = await self._post_json(
+        return await self._chat_completion(
             endpoint,
             headers={"api-key": api_key, "Content-Type": "application/json"},
             body=body,
             provider_label="Azure OpenAI",
         )
-        return self._extract_chat_content(response, "Azure OpenAI") if response else None
 
     async def _generic_openai(self, prompt: str) -> str | None:
         endpoint = str(self._opt(CONF_GENERIC_OPENAI_ENDPOINT) or "").rstrip("/")
@@ -1091,24 +2429,54 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             prompt=self._trim_prompt(prompt),
             temperature=float(self._opt(CONF_GENERIC_OPENAI_TEMPERATURE, DEFAULT_TEMPERATURE)),
         )
-        response = await self._post_json(endpoint, headers=headers, body=body, provider_label="Generic OpenAI")
-        return self._extract_chat_content(response, "Generic OpenAI") if response else None
+        return await self._chat_completion(endpoint, headers=headers, body=body, provider_label="Generic OpenAI")
 
-    async def _anthropic(self, prompt: str) -> str | None:
-        api_key = self._opt(CONF_ANTHROPIC_API_KEY)
-        if not api_key:
-            raise ValueError("Anthropic API key not configured")
+    def _anthropic_content(self, prompt: str, static_prefix: str | None = None) -> list[dict[str, Any]]:
+        """Return message content with a cache breakpoint after the static prefix.
+
+        Breakpoints are only added with the stable layout, where the prefix
+        repeats across runs; otherwise the cache write surcharge is wasted.
+        ``static_prefix`` defaults to the current request's prefix.
+        """
+
+        prefix = self._prompt_static_prefix if static_prefix is None else static_prefix
+        if (
+            not self._opt(CONF_STABLE_PROMPT_LAYOUT, DEFAULT_STABLE_PROMPT_LAYOUT)
+            or not prefix
+            or len(prefix) >= len(prompt)
+            or not prompt.startswith(prefix)
+        ):
+            return [{"type": "text", "text": prompt}]
+        return [
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt[len(prefix):]},
+        ]
+
+    def _anthropic_body(self, prompt: str, model: str, static_prefix: str | None = None) -> dict[str, Any]:
         _, out_budget = self._budgets()
-        model = self._current_model("Anthropic")
-        body: dict[str, Any] = {
+        return {
             "model": model,
-            "messages": [{"role": "user", "content": [{"type": "text", "text": self._trim_prompt(prompt)}]}],
+            "messages": [{"role": "user", "content": self._anthropic_content(prompt, static_prefix)}],
             "max_tokens": out_budget,
             "temperature": float(self._opt(CONF_ANTHROPIC_TEMPERATURE, DEFAULT_TEMPERATURE)),
         }
+
+    async def _anthropic(self, prompt: str) -> str | None:
+        api_key = self._opt(CONF_ANTHROPIC_API_KEY)
+        if not api_key:
+            raise ValueError("Anthropic API key not configured")
+        body = self._anthropic_body(self._trim_prompt(prompt), self._current_model("Anthropic"))
+        headers = {"x-api-key": api_key, "Content-Type": "application/json", "anthropic-version": VERSION_ANTHROPIC}
+        if self._streaming_enabled():
+            text = await self._post_stream(
+                ENDPOINT_ANTHROPIC, headers=headers, body={**body, "stream": True}, decoder=AnthropicStream("Anthropic")
+            )
+            if text is None and not self._last_error:
+                raise ValueError("Anthropic response is missing text content")
+            return text
         response = await self._post_json(
             ENDPOINT_ANTHROPIC,
-            headers={"x-api-key": api_key, "Content-Type": "application/json", "anthropic-version": VERSION_ANTHROPIC},
+            headers=headers,
             body=body,
             provider_label="Anthropic",
         )
@@ -1118,11 +2486,7 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             "stop_reason": response.get("stop_reason"),
             "usage": response.get("usage"),
         }
-        content = response.get("content") or []
-        text_parts = [part.get("text", "") for part in content if isinstance(part, dict) and part.get("type") == "text"]
-        if text_parts:
-            return "".join(text_parts)
-        raise ValueError("Anthropic response is missing text content")
+        return _anthropic_text(response)
 
     async def _google(self, prompt: str) -> str | None:
         api_key = self._opt(CONF_GOOGLE_API_KEY)
@@ -1138,6 +2502,12 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             generation_config["responseMimeType"] = "application/json"
             generation_config["responseSchema"] = google_json_schema_response_format()["json_schema"]["schema"]
         body = {"contents": [{"parts": [{"text": self._trim_prompt(prompt)}]}], "generationConfig": generation_config}
+        if self._streaming_enabled():
+            endpoint = (
+                f"https://generativelanguage.googleapis.com/v1beta/models/{model}"
+                f":streamGenerateContent?alt=sse&key={api_key}"
+            )
+            return await self._post_stream(endpoint, body=body, decoder=GoogleStream("Google"))
         endpoint = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
         response = await self._post_json(endpoint, body=body, provider_label="Google")
         if not response:
@@ -1164,13 +2534,12 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             prompt=self._trim_prompt(prompt),
             temperature=float(self._opt(CONF_GROQ_TEMPERATURE, DEFAULT_TEMPERATURE)),
         )
-        response = await self._post_json(
+        return await self._chat_completion(
             ENDPOINT_GROQ,
             headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
             body=body,
             provider_label="Groq",
         )
-        return self._extract_chat_content(response, "Groq") if response else None
 
     async def _localai(self, prompt: str) -> str | None:
         ip = self._opt(CONF_LOCALAI_IP_ADDRESS)
@@ -1186,20 +2555,82 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             prompt=self._trim_prompt(prompt),
             temperature=float(self._opt(CONF_LOCALAI_TEMPERATURE, DEFAULT_TEMPERATURE)),
         )
-        response = await self._post_json(endpoint, body=body, provider_label="LocalAI")
-        return self._extract_chat_content(response, "LocalAI") if response else None
+        return await self._chat_completion(endpoint, body=body, provider_label="LocalAI")
 
-    async def _ollama(self, prompt: str) -> str | None:
-        ip = self._opt(CONF_OLLAMA_IP_ADDRESS)
-        port = self._opt(CONF_OLLAMA_PORT)
+    def _ollama_base(self) -> str:
         base = ollama_base_url(
             base_url=self._opt(CONF_OLLAMA_BASE_URL),
-            ip_address=ip,
-            port=port,
+            ip_address=self._opt(CONF_OLLAMA_IP_ADDRESS),
+            port=self._opt(CONF_OLLAMA_PORT),
             https=self._opt(CONF_OLLAMA_HTTPS, False),
         )
         if not base:
             raise ValueError("Ollama host/port or base URL is not configured")
+        return base
+
+    def _ollama_endpoints(self, base: str) -> list[str]:
+        """Return the Ollama chat URLs to try, the last one that worked first."""
+
+        candidates = ollama_api_candidates(base, "api/chat")
+        if self._ollama_endpoint in candidates:
+            candidates.remove(self._ollama_endpoint)
+            candidates.insert(0, self._ollama_endpoint)
+        return candidates
+
+    def _ollama_keep_alive(self) -> int | str | None:
+        """Return the configured ``keep_alive``; plain numbers are seconds."""
+
+        value = str(self._opt(CONF_OLLAMA_KEEP_ALIVE, DEFAULT_OLLAMA_KEEP_ALIVE) or "").strip()
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return value
+
+    @property
+    def ollama_warmup_enabled(self) -> bool:
+        """Return whether the Ollama model should be preloaded before runs."""
+
+        return self._opt(CONF_PROVIDER) == "Ollama" and bool(self._opt(CONF_OLLAMA_WARMUP, DEFAULT_OLLAMA_WARMUP))
+
+    async def async_warmup(self) -> bool:
+        """Preload the Ollama model so the next generation does not wait for it.
+
+        An empty chat request makes Ollama load the model and keep it for
+        ``keep_alive``. The chat URL that answers is remembered for later
+        generations. Failures are only logged; generation probes again.
+        """
+
+        if not self.ollama_warmup_enabled:
+            return False
+        try:
+            base = self._ollama_base()
+        except ValueError as err:
+            _LOGGER.debug("Skipping Ollama warmup: %s", err)
+            return False
+        body: dict[str, Any] = {"model": self._current_model("Ollama"), "messages": [], "stream": False}
+        keep_alive = self._ollama_keep_alive()
+        if keep_alive is not None:
+            body["keep_alive"] = keep_alive
+        headers = bearer_auth_headers(self._opt(CONF_OLLAMA_API_KEY))
+        for endpoint in self._ollama_endpoints(base):
+            try:
+                async with self.session.post(
+                    endpoint, headers=headers, json=body, timeout=self._timeout()
+                ) as response:
+                    await response.read()
+                    if 200 <= response.status < 300:
+                        self._ollama_endpoint = endpoint
+                        _LOGGER.debug("Preloaded Ollama model %s via %s", body["model"], endpoint)
+                        return True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Ollama warmup via %s failed: %s", endpoint, err)
+        self._ollama_endpoint = None
+        return False
+
+    async def _ollama(self, prompt: str) -> str | None:
+        base = self._ollama_base()
         messages = []
         if self._opt(CONF_OLLAMA_DISABLE_THINK, False):
             messages.append({"role": "system", "content": "/no_think"})
@@ -1208,19 +2639,32 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         body = {
             "model": self._current_model("Ollama"),
             "messages": messages,
-            "stream": False,
+            "stream": self._streaming_enabled(),
             "options": {
                 "temperature": float(self._opt(CONF_OLLAMA_TEMPERATURE, DEFAULT_TEMPERATURE)),
                 "num_predict": out_budget,
             },
         }
+        keep_alive = self._ollama_keep_alive()
+        if keep_alive is not None:
+            body["keep_alive"] = keep_alive
         response = None
         headers = bearer_auth_headers(self._opt(CONF_OLLAMA_API_KEY))
-        for endpoint in ollama_api_candidates(base, "api/chat"):
+        if body["stream"]:
+            for endpoint in self._ollama_endpoints(base):
+                text = await self._post_stream(endpoint, headers=headers, body=body, decoder=OllamaStream("Ollama"))
+                if text:
+                    self._ollama_endpoint = endpoint
+                    return text
+            self._ollama_endpoint = None
+            return None
+        for endpoint in self._ollama_endpoints(base):
             response = await self._post_json(endpoint, headers=headers, body=body, provider_label="Ollama")
             if response:
+                self._ollama_endpoint = endpoint
                 break
         if not response:
+            self._ollama_endpoint = None
             return None
         self._last_response_metadata = {"done_reason": response.get("done_reason"), "usage": response.get("eval_count")}
         return response.get("message", {}).get("content")
@@ -1241,8 +2685,7 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             prompt=self._trim_prompt(prompt),
             temperature=float(self._opt(CONF_CUSTOM_OPENAI_TEMPERATURE, DEFAULT_TEMPERATURE)),
         )
-        response = await self._post_json(completions_endpoint, headers=headers, body=body, provider_label="Custom OpenAI")
-        return self._extract_chat_content(response, "Custom OpenAI") if response else None
+        return await self._chat_completion(completions_endpoint, headers=headers, body=body, provider_label="Custom OpenAI")
 
     async def _mistral(self, prompt: str) -> str | None:
         api_key = self._opt(CONF_MISTRAL_API_KEY)
@@ -1255,13 +2698,12 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             prompt=self._trim_prompt(prompt),
             temperature=float(self._opt(CONF_MISTRAL_TEMPERATURE, DEFAULT_TEMPERATURE)),
         )
-        response = await self._post_json(
+        return await self._chat_completion(
             ENDPOINT_MISTRAL,
             headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
             body=body,
             provider_label="Mistral",
         )
-        return self._extract_chat_content(response, "Mistral") if response else None
 
     async def _perplexity(self, prompt: str) -> str | None:
         api_key = self._opt(CONF_PERPLEXITY_API_KEY)
@@ -1274,13 +2716,12 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             prompt=self._trim_prompt(prompt),
             temperature=float(self._opt(CONF_PERPLEXITY_TEMPERATURE, DEFAULT_TEMPERATURE)),
         )
-        response = await self._post_json(
+        return await self._chat_completion(
             ENDPOINT_PERPLEXITY,
             headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json", "Accept": "application/json"},
             body=body,
             provider_label="Perplexity",
         )
-        return self._extract_chat_content(response, "Perplexity") if response else None
 
     async def _openrouter(self, prompt: str) -> str | None:
         api_key = self._opt(CONF_OPENROUTER_API_KEY)
@@ -1298,13 +2739,12 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             temperature=float(self._opt(CONF_OPENROUTER_TEMPERATURE, DEFAULT_TEMPERATURE)),
             extra=extra,
         )
-        response = await self._post_json(
+        return await self._chat_completion(
             ENDPOINT_OPENROUTER,
             headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
             body=body,
             provider_label="OpenRouter",
         )
-        return self._extract_chat_content(response, "OpenRouter") if response else None
 
     async def _requesty(self, prompt: str) -> str | None:
         api_key = self._opt(CONF_REQUESTY_API_KEY)
@@ -1322,16 +2762,15 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
             temperature=float(self._opt(CONF_REQUESTY_TEMPERATURE, DEFAULT_TEMPERATURE)),
             extra=extra,
         )
-        response = await self._post_json(
+        return await self._chat_completion(
             ENDPOINT_REQUESTY,
             headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
             body=body,
             provider_label="Requesty",
         )
-        return self._extract_chat_content(response, "Requesty") if response else None
 
     async def _litellm(self, prompt: str) -> str | None:
-        import litellm
+        litellm = await async_import_litellm(self.hass)
 
         model = self._current_model("LiteLLM")
         _, out_budget = self._budgets()
@@ -1352,6 +2791,8 @@ class AIAutomationCoordinator(DataUpdateCoordinator):
         kwargs["timeout"] = max(10, timeout_seconds)
 
         response = await litellm.acompletion(**kwargs)
+        # No HTTP response passes through _record_response_status on this path.
+        self.circuit_breaker.record_success()
         self._last_response_metadata = {
             "finish_reason": response.choices[0].finish_reason,
             "usage": {
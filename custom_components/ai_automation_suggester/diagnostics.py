@@ -0,0 +1,66 @@
+"""Diagnostics support for AI Automation Suggester."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_ANTHROPIC_API_KEY,
+    CONF_CUSTOM_OPENAI_API_KEY,
+    CONF_GENERIC_OPENAI_API_KEY,
+    CONF_GOOGLE_API_KEY,
+    CONF_GROQ_API_KEY,
+    CONF_LITELLM_API_KEY,
+    CONF_MISTRAL_API_KEY,
+    CONF_OLLAMA_API_KEY,
+    CONF_OPENAI_API_KEY,
+    CONF_OPENAI_AZURE_API_KEY,
+    CONF_OPENROUTER_API_KEY,
+    CONF_PERPLEXITY_API_KEY,
+    CONF_REQUESTY_API_KEY,
+    DOMAIN,
+)
+from .litellm_loader import litellm_import_stats
+
+TO_REDACT = {
+    CONF_ANTHROPIC_API_KEY,
+    CONF_CUSTOM_OPENAI_API_KEY,
+    CONF_GENERIC_OPENAI_API_KEY,
+    CONF_GOOGLE_API_KEY,
+    CONF_GROQ_API_KEY,
+    CONF_LITELLM_API_KEY,
+    CONF_MISTRAL_API_KEY,
+    CONF_OLLAMA_API_KEY,
+    CONF_OPENAI_API_KEY,
+    CONF_OPENAI_AZURE_API_KEY,
+    CONF_OPENROUTER_API_KEY,
+    CONF_PERPLEXITY_API_KEY,
+    CONF_REQUESTY_API_KEY,
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry with credentials redacted."""
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data or {}
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "last_update": data.get("last_update"),
+        "last_error": data.get("last_error"),
+        "response_metadata": data.get("response_metadata", {}),
+        "prompt_block_cache": coordinator.prompt_block_cache.stats(),
+        "response_cache": coordinator.response_cache.stats(),
+        "circuit_breaker": coordinator.circuit_breaker.snapshot(),
+        "rate_governor": coordinator.rate_governor.snapshot(),
+        "litellm": litellm_import_stats(hass),
+        "batch_jobs": await coordinator.batch_jobs.async_list(entry.entry_id),
+        "token_counter": coordinator.token_counter.stats(),
+    }
@@ -0,0 +1,277 @@
+"""Live entity and registry indexes maintained from Home Assistant bus events."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+)
+from homeassistant.helpers import (
+    device_registry as dr,
+)
+from homeassistant.helpers import (
+    entity_registry as er,
+)
+
+
+def entity_snapshot(state: Any) -> dict[str, Any]:
+    """Return the prompt-relevant fields of a Home Assistant state."""
+
+    return {
+        "state": state.state,
+        "attributes": state.attributes,
+        "last_changed": state.last_changed,
+        "last_updated": state.last_updated,
+        "friendly_name": state.attributes.get("friendly_name", state.entity_id),
+    }
+
+
+class EntityIndex:
+    """Incrementally maintained view of eligible entities.
+
+    ``state_changed`` and entity registry events only mark entity IDs dirty.
+    Each refresh re-evaluates the dirty IDs instead of walking every state.
+    Device and area registry changes can move many entities between areas at
+    once, so they invalidate the filtered view and the next refresh rescans.
+    Without active listeners (for example before setup completes) every
+    refresh falls back to a full scan, matching the original behavior.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._entities: dict[str, dict[str, Any]] = {}
+        self._eligible: dict[str, dict[str, Any]] = {}
+        self._filter_key: Hashable | None = None
+        self._dirty: set[str] = set()
+        self._needs_rescan = True
+        self._unsubscribers: list[Callable[[], None]] = []
+
+    @property
+    def listening(self) -> bool:
+        """Return True while bus listeners keep the index current."""
+
+        return bool(self._unsubscribers)
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Subscribe to state and registry events and return a stop callback."""
+
+        if not self._unsubscribers:
+            bus = self._hass.bus
+            self._unsubscribers = [
+                bus.async_listen(EVENT_STATE_CHANGED, self._async_handle_state_changed),
+                bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_entity_registry_updated),
+                bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_handle_bulk_change),
+                bus.async_listen(ar.EVENT_AREA_REGISTRY_UPDATED, self._async_handle_bulk_change),
+            ]
+            self._needs_rescan = True
+        return self.async_stop
+
+    @callback
+    def async_stop(self) -> None:
+        """Remove bus listeners; later refreshes rescan every state."""
+
+        while self._unsubscribers:
+            self._unsubscribers.pop()()
+        self._needs_rescan = True
+
+    @callback
+    def _async_handle_state_changed(self, event: Any) -> None:
+        self._dirty.add(event.data["entity_id"])
+
+    @callback
+    def _async_handle_entity_registry_updated(self, event: Any) -> None:
+        self._dirty.add(event.data["entity_id"])
+        old_entity_id = event.data.get("old_entity_id")
+        if old_entity_id:
+            self._dirty.add(old_entity_id)
+
+    @callback
+    def _async_handle_bulk_change(self, event: Any) -> None:
+        self._needs_rescan = True
+
+    @callback
+    def async_eligible(
+        self,
+        filter_key: Hashable,
+        is_eligible: Callable[[str], bool],
+    ) -> dict[str, dict[str, Any]]:
+        """Return eligible entity snapshots for the given filter settings.
+
+        ``filter_key`` must change whenever ``is_eligible`` would answer
+        differently for an unchanged entity, such as new domain or exclusion
+        settings for a service call.
+        """
+
+        changed: set[str] = set()
+        if self._needs_rescan or not self.listening:
+            self._rescan()
+        else:
+            changed = self._apply_dirty()
+
+        if filter_key != self._filter_key:
+            self._eligible = {
+                entity_id: snapshot
+                for entity_id, snapshot in self._entities.items()
+                if is_eligible(entity_id)
+            }
+            self._filter_key = filter_key
+        else:
+            for entity_id in changed:
+                snapshot = self._entities.get(entity_id)
+                if snapshot is not None and is_eligible(entity_id):
+                    self._eligible[entity_id] = snapshot
+                else:
+                    self._eligible.pop(entity_id, None)
+        return dict(self._eligible)
+
+    def _rescan(self) -> None:
+        states = self._hass.states
+        entities: dict[str, dict[str, Any]] = {}
+        for entity_id in states.async_entity_ids():
+            state = states.get(entity_id)
+            if state:
+                entities[entity_id] = entity_snapshot(state)
+        self._entities = entities
+        self._dirty.clear()
+        self._needs_rescan = False
+        # Force a full eligibility pass against the new snapshot.
+        self._filter_key = None
+
+    def _apply_dirty(self) -> set[str]:
+        """Refresh snapshots for dirty entity IDs and return those IDs."""
+
+        dirty, self._dirty = self._dirty, set()
+        states = self._hass.states
+        for entity_id in dirty:
+            state = states.get(entity_id)
+            if state:
+                self._entities[entity_id] = entity_snapshot(state)
+            else:
+                self._entities.pop(entity_id, None)
+        return dirty
+
+
+@dataclass(frozen=True)
+class EntityContext:
+    """Resolved area and device metadata for one entity."""
+
+    area_id: str | None = None
+    area_name: str | None = None
+    device_id: str | None = None
+    manufacturer: str | None = None
+    model: str | None = None
+    device_name: str | None = None
+
+    @property
+    def area_keys(self) -> frozenset[str]:
+        """Return lowercased area ID and name for exclusion matching."""
+
+        return frozenset(value.lower() for value in (self.area_id, self.area_name) if value)
+
+
+EMPTY_CONTEXT = EntityContext()
+
+
+class EntityContextIndex:
+    """Cache entity -> device -> area resolution until the registries change.
+
+    Entity registry updates drop only the affected entity. Device and area
+    registry updates can change many entities at once, so they clear the
+    whole cache. Without active listeners nothing is cached, because nothing
+    would invalidate stale entries.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_registry: er.EntityRegistry | None,
+        device_registry: dr.DeviceRegistry | None,
+        area_registry: ar.AreaRegistry | None,
+    ) -> None:
+        self._hass = hass
+        self._entity_registry = entity_registry
+        self._device_registry = device_registry
+        self._area_registry = area_registry
+        self._contexts: dict[str, EntityContext] = {}
+        self._unsubscribers: list[Callable[[], None]] = []
+
+    @property
+    def listening(self) -> bool:
+        """Return True while registry listeners keep the cache valid."""
+
+        return bool(self._unsubscribers)
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Subscribe to registry update events and return a stop callback."""
+
+        if not self._unsubscribers:
+            bus = self._hass.bus
+            self._unsubscribers = [
+                bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_entity_registry_updated),
+                bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_handle_bulk_change),
+                bus.async_listen(ar.EVENT_AREA_REGISTRY_UPDATED, self._async_handle_bulk_change),
+            ]
+        return self.async_stop
+
+    @callback
+    def async_stop(self) -> None:
+        """Remove registry listeners and drop cached contexts."""
+
+        while self._unsubscribers:
+            self._unsubscribers.pop()()
+        self._contexts.clear()
+
+    @callback
+    def _async_handle_entity_registry_updated(self, event: Any) -> None:
+        self._contexts.pop(event.data["entity_id"], None)
+        old_entity_id = event.data.get("old_entity_id")
+        if old_entity_id:
+            self._contexts.pop(old_entity_id, None)
+
+    @callback
+    def _async_handle_bulk_change(self, event: Any) -> None:
+        self._contexts.clear()
+
+    @callback
+    def async_resolve(self, entity_id: str) -> EntityContext:
+        """Return the area and device context for an entity."""
+
+        context = self._contexts.get(entity_id)
+        if context is None:
+            context = self._resolve(entity_id)
+            if self.listening:
+                self._contexts[entity_id] = context
+        return context
+
+    def _resolve(self, entity_id: str) -> EntityContext:
+        if not self._entity_registry:
+            return EMPTY_CONTEXT
+        entity_entry = self._entity_registry.async_get(entity_id)
+        if entity_entry is None:
+            return EMPTY_CONTEXT
+        device_entry = None
+        if entity_entry.device_id and self._device_registry:
+            device_entry = self._device_registry.async_get(entity_entry.device_id)
+        area_id = entity_entry.area_id or (device_entry.area_id if device_entry else None)
+        area_name = None
+        if area_id and self._area_registry:
+            area_entry = self._area_registry.async_get_area(area_id)
+            if area_entry:
+                area_name = area_entry.name
+        if device_entry is None:
+            return EntityContext(area_id=area_id, area_name=area_name)
+        return EntityContext(
+            area_id=area_id,
+            area_name=area_name,
+            device_id=device_entry.id,
+            manufacturer=device_entry.manufacturer,
+            model=device_entry.model,
+            device_name=device_entry.name_by_user or device_entry.name,
+        )
@@ -0,0 +1,37 @@
+"""Live history and generation-progress events.
+
+Events are small deltas published on one dispatcher signal. The WebSocket
+subscription forwards them to dashboards, so they never need to poll the
+suggestions API or read the full history from sensor attributes.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import DOMAIN
+
+SIGNAL_SUGGESTION_EVENT = f"{DOMAIN}_event"
+
+# Generation progress, published by a coordinator with its entry_id and run_id.
+EVENT_GENERATION_STARTED = "generation_started"
+EVENT_PROMPT_BUILT = "prompt_built"
+EVENT_FIRST_TOKEN = "first_token"
+EVENT_SUGGESTION_PARSED = "suggestion_parsed"
+EVENT_GENERATION_FINISHED = "generation_finished"
+EVENT_GENERATION_FAILED = "generation_failed"
+
+# History changes, published by the suggestion store with its new revision.
+EVENT_SUGGESTIONS_ADDED = "suggestions_added"
+EVENT_SUGGESTION_UPDATED = "suggestion_updated"
+EVENT_HISTORY_CLEARED = "history_cleared"
+
+
+@callback
+def async_publish(hass: HomeAssistant, event_type: str, **data: Any) -> None:
+    """Send one event to every subscriber."""
+
+    async_dispatcher_send(hass, SIGNAL_SUGGESTION_EVENT, {"type": event_type, **data})
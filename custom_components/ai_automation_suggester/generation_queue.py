@@ -0,0 +1,146 @@
+"""Single-flight, prioritised queue for suggestion generation runs."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Awaitable, Callable, Coroutine, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lower values run first.
+PRIORITY_MANUAL = 0
+PRIORITY_AUTOMATIC = 10
+
+DEFAULT_QUEUE_DEPTH = 4
+
+
+class GenerationQueueFullError(RuntimeError):
+    """Raised when a request cannot be queued or was displaced by a higher-priority one."""
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    sequence: int
+    key: Hashable = field(compare=False)
+    run: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    dropped: bool = field(default=False, compare=False)
+
+
+class GenerationQueue:
+    """Run generation jobs one at a time, coalescing identical requests.
+
+    A request whose key matches the running job or a pending job shares that
+    job's result instead of starting another provider call. Pending jobs run
+    by priority, then arrival order; joining a pending job raises it to the
+    better of the two priorities. At most ``depth`` jobs wait; when full, a
+    more urgent request displaces the newest least urgent pending job.
+    """
+
+    def __init__(
+        self,
+        create_task: Callable[[Coroutine[Any, Any, None]], asyncio.Task],
+        depth: int = DEFAULT_QUEUE_DEPTH,
+    ) -> None:
+        self._create_task = create_task
+        self.depth = max(1, int(depth))
+        self._heap: list[_Job] = []
+        self._pending: dict[Hashable, _Job] = {}
+        self._current: _Job | None = None
+        self._worker: asyncio.Task | None = None
+        self._sequence = itertools.count()
+        self.coalesced = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        """Return the number of jobs waiting to run."""
+
+        return len(self._pending)
+
+    async def async_submit(
+        self, key: Hashable, run: Callable[[], Awaitable[Any]], priority: int = PRIORITY_MANUAL
+    ) -> Any:
+        """Queue ``run`` under ``key`` and return the shared result."""
+
+        job = self._pending.get(key)
+        if job is None and self._current is not None and self._current.key == key:
+            job = self._current
+        if job is not None:
+            self.coalesced += 1
+            if priority < job.priority and job is not self._current:
+                self._requeue(job, priority)
+        else:
+            job = self._enqueue(key, run, priority)
+        # Cancelling one waiter must not cancel the run other waiters share.
+        return await asyncio.shield(job.future)
+
+    def _enqueue(self, key: Hashable, run: Callable[[], Awaitable[Any]], priority: int) -> _Job:
+        if len(self._pending) >= self.depth:
+            victim = max(self._pending.values())
+            if victim.priority <= priority:
+                raise GenerationQueueFullError("Too many suggestion generations are already queued")
+            self._drop(victim, "Displaced by a higher-priority suggestion generation request")
+        job = _Job(priority, next(self._sequence), key, run, asyncio.get_running_loop().create_future())
+        # Mark the outcome retrieved even if every waiter was cancelled.
+        job.future.add_done_callback(lambda future: future.cancelled() or future.exception())
+        self._pending[key] = job
+        heapq.heappush(self._heap, job)
+        if self._worker is None or self._worker.done():
+            self._worker = self._create_task(self._async_drain())
+        return job
+
+    def _requeue(self, job: _Job, priority: int) -> None:
+        job.dropped = True
+        upgraded = _Job(priority, job.sequence, job.key, job.run, job.future)
+        self._pending[job.key] = upgraded
+        heapq.heappush(self._heap, upgraded)
+
+    def _drop(self, job: _Job, reason: str) -> None:
+        job.dropped = True
+        del self._pending[job.key]
+        self.dropped += 1
+        _LOGGER.debug("Dropping queued suggestion generation: %s", reason)
+        if not job.future.done():
+            job.future.set_exception(GenerationQueueFullError(reason))
+
+    def _pop(self) -> _Job | None:
+        while self._heap:
+            job = heapq.heappop(self._heap)
+            if not job.dropped:
+                del self._pending[job.key]
+                return job
+        return None
+
+    async def _async_drain(self) -> None:
+        while (job := self._pop()) is not None:
+            self._current = job
+            try:
+                result = await job.run()
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as err:  # noqa: BLE001 - delivered to every waiter
+                if not job.future.done():
+                    job.future.set_exception(err)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._current = None
+
+    def async_cancel_pending(self) -> int:
+        """Fail every job that has not started and return how many there were."""
+
+        jobs = list(self._pending.values())
+        for job in jobs:
+            self._drop(job, "Suggestion generation was cancelled before it started")
+        self._heap.clear()
+        return len(jobs)
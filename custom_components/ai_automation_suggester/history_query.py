@@ -0,0 +1,159 @@
+"""Filtering, paging, and conditional-request helpers for the suggestions API."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+MAX_PAGE_SIZE = 250
+# Bodies smaller than this are cheaper to send than to compress.
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+class QueryError(ValueError):
+    """Raised for query parameters the API cannot honour."""
+
+
+def _csv(value: str | None) -> frozenset[str]:
+    return frozenset(part.strip().casefold() for part in (value or "").split(",") if part.strip())
+
+
+def _parse_datetime(value: Any) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    # Suggestions store naive local timestamps.
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+@dataclass(frozen=True)
+class HistoryQuery:
+    """Parsed ``GET /api/ai_automation_suggester/suggestions`` parameters."""
+
+    limit: int | None = None
+    cursor: str | None = None
+    statuses: frozenset[str] = frozenset()
+    providers: frozenset[str] = frozenset()
+    since: datetime | None = None
+
+    @classmethod
+    def from_params(cls, params: Mapping[str, str]) -> HistoryQuery:
+        """Validate query parameters, raising :class:`QueryError` when invalid."""
+
+        limit = None
+        if params.get("limit"):
+            try:
+                limit = int(params["limit"])
+            except ValueError as err:
+                raise QueryError("limit must be an integer") from err
+            if not 1 <= limit <= MAX_PAGE_SIZE:
+                raise QueryError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        since = None
+        if params.get("since"):
+            since = _parse_datetime(params["since"])
+            if since is None:
+                raise QueryError("since must be an ISO 8601 timestamp")
+        return cls(
+            limit=limit,
+            cursor=params.get("cursor") or None,
+            statuses=_csv(params.get("status")),
+            providers=_csv(params.get("provider")),
+            since=since,
+        )
+
+    @property
+    def paginated(self) -> bool:
+        """Return whether the response uses the paged envelope."""
+
+        return self.limit is not None or self.cursor is not None
+
+    @property
+    def key(self) -> tuple[Any, ...]:
+        """Return a hashable, order-independent form of the query."""
+
+        return (
+            self.limit,
+            self.cursor,
+            tuple(sorted(self.statuses)),
+            tuple(sorted(self.providers)),
+            self.since.isoformat() if self.since else None,
+        )
+
+    def matches(self, record: dict[str, Any]) -> bool:
+        """Return whether a stored suggestion passes the filters."""
+
+        if self.statuses and str(record.get("status", "")).casefold() not in self.statuses:
+            return False
+        if self.providers and str(record.get("provider", "")).casefold() not in self.providers:
+            return False
+        if self.since is not None:
+            created_at = _parse_datetime(record.get("created_at"))
+            if created_at is None or created_at < self.since:
+                return False
+        return True
+
+
+def select_records(
+    records: Iterable[dict[str, Any]], query: HistoryQuery
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Return the requested page of newest-first records and the next cursor.
+
+    The cursor is the ID of the last record on the previous page, so pages
+    stay stable when new suggestions are added in front of them.
+    """
+
+    iterator = iter(records)
+    if query.cursor is not None:
+        for record in iterator:
+            if record.get("id") == query.cursor:
+                break
+        else:
+            raise QueryError("cursor is unknown or has expired")
+    page: list[dict[str, Any]] = []
+    for record in iterator:
+        if not query.matches(record):
+            continue
+        if query.limit is not None and len(page) == query.limit:
+            return page, page[-1].get("id")
+        page.append(record)
+    return page, None
+
+
+def make_etag(revision: str, query: HistoryQuery, *, gzipped: bool = False) -> str:
+    """Return a strong ETag for one representation of a history query."""
+
+    digest = hashlib.blake2s(repr(query.key).encode(), digest_size=6).hexdigest()
+    return f'"{revision}-{digest}{"-gzip" if gzipped else ""}"'
+
+
+def etag_matches(if_none_match: str | None, *etags: str) -> bool:
+    """Return whether an ``If-None-Match`` header matches any given ETag."""
+
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or any(etag in candidates for etag in etags)
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Return whether the client accepts a gzip response body."""
+
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in {"q=0", "q=0.0", "q=0.00", "q=0.000"}
+    return False
+
+
+def encode_body(body: bytes, *, allow_gzip: bool) -> tuple[bytes, bool]:
+    """Gzip a response body when allowed and large enough to benefit."""
+
+    if allow_gzip and len(body) >= GZIP_MIN_BYTES:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), True
+    return body, False
@@ -0,0 +1,53 @@
+"""Import LiteLLM off the event loop and keep the module handle."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import time
+from types import ModuleType
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+HASS_LITELLM_KEY = "_litellm"
+
+
+def _import_litellm() -> tuple[ModuleType, float]:
+    started = time.perf_counter()
+    module = importlib.import_module("litellm")
+    return module, time.perf_counter() - started
+
+
+async def async_import_litellm(hass: HomeAssistant) -> ModuleType:
+    """Return the LiteLLM module, importing it in an executor the first time.
+
+    LiteLLM imports hundreds of modules, which would block the event loop
+    for seconds. Concurrent callers share one import; a failed import is
+    forgotten so a later call can try again.
+    """
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    future = domain_data.get(HASS_LITELLM_KEY)
+    if future is None:
+        future = hass.async_add_executor_job(_import_litellm)
+        domain_data[HASS_LITELLM_KEY] = future
+    try:
+        module, _ = await asyncio.shield(future)
+    except Exception:
+        if domain_data.get(HASS_LITELLM_KEY) is future:
+            del domain_data[HASS_LITELLM_KEY]
+        raise
+    return module
+
+
+def litellm_import_stats(hass: HomeAssistant) -> dict[str, Any]:
+    """Return whether LiteLLM was imported and how long the import took."""
+
+    future = hass.data.get(DOMAIN, {}).get(HASS_LITELLM_KEY)
+    if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+        return {"imported": False, "import_seconds": None}
+    _, seconds = future.result()
+    return {"imported": True, "import_seconds": round(seconds, 3)}
@@ -117,6 +117,7 @@ OPENAI_MODELS = (
     ModelCapabilities(
         "gpt-4o-mini",
         "GPT-4o Mini",
+        context_window=128000,
         token_parameter="max_completion_tokens",
         supports_structured_output=True,
         supports_json_schema=True,
@@ -124,6 +125,7 @@ OPENAI_MODELS = (
     ModelCapabilities(
         "gpt-4.1-mini",
         "GPT-4.1 Mini",
+        context_window=1047576,
         token_parameter="max_completion_tokens",
         supports_structured_output=True,
         supports_json_schema=True,
@@ -131,6 +133,7 @@ OPENAI_MODELS = (
     ModelCapabilities(
         "o3",
         "o3",
+        context_window=200000,
         token_parameter="max_completion_tokens",
         supports_reasoning=True,
         omit_temperature=True,
@@ -138,6 +141,7 @@ OPENAI_MODELS = (
     ModelCapabilities(
         "o4-mini",
         "o4 Mini",
+        context_window=200000,
         token_parameter="max_completion_tokens",
         supports_reasoning=True,
         omit_temperature=True,
@@ -165,6 +169,7 @@ PROVIDER_CATALOGS: dict[str, ProviderCatalog] = {
             ModelCapabilities(
                 "claude-opus-4-7",
                 "Claude Opus 4.7",
+                context_window=200000,
                 token_parameter="max_tokens",
                 supports_reasoning=True,
                 notes=("Use adaptive thinking; manual budget_tokens is not accepted.",),
@@ -172,11 +177,12 @@ PROVIDER_CATALOGS: dict[str, ProviderCatalog] = {
             ModelCapabilities(
                 "claude-sonnet-4-6",
                 "Claude Sonnet 4.6",
+                context_window=200000,
                 token_parameter="max_tokens",
                 supports_reasoning=True,
                 notes=("Adaptive thinking is recommended for reasoning-heavy requests.",),
             ),
-            ModelCapabilities("claude-haiku-4-5", "Claude Haiku 4.5"),
+            ModelCapabilities("claude-haiku-4-5", "Claude Haiku 4.5", context_window=200000),
             ModelCapabilities(
                 "claude-3-7-sonnet-latest",
                 "Claude 3.7 Sonnet Latest",
@@ -194,12 +200,14 @@ PROVIDER_CATALOGS: dict[str, ProviderCatalog] = {
             ModelCapabilities(
                 "gemini-2.5-flash",
                 "Gemini 2.5 Flash",
+                context_window=1048576,
                 supports_structured_output=True,
                 supports_json_schema=True,
             ),
             ModelCapabilities(
                 "gemini-2.5-pro",
                 "Gemini 2.5 Pro",
+                context_window=1048576,
                 supports_structured_output=True,
                 supports_json_schema=True,
             ),
@@ -233,10 +241,10 @@ PROVIDER_CATALOGS: dict[str, ProviderCatalog] = {
         "Groq",
         "llama-3.3-70b-versatile",
         (
-            ModelCapabilities("llama-3.3-70b-versatile", "Llama 3.3 70B Versatile"),
-            ModelCapabilities("llama-3.1-8b-instant", "Llama 3.1 8B Instant"),
-            ModelCapabilities("openai/gpt-oss-120b", "GPT OSS 120B"),
-            ModelCapabilities("openai/gpt-oss-20b", "GPT OSS 20B"),
+            ModelCapabilities("llama-3.3-70b-versatile", "Llama 3.3 70B Versatile", context_window=131072),
+            ModelCapabilities("llama-3.1-8b-instant", "Llama 3.1 8B Instant", context_window=131072),
+            ModelCapabilities("openai/gpt-oss-120b", "GPT OSS 120B", context_window=131072),
+            ModelCapabilities("openai/gpt-oss-20b", "GPT OSS 20B", context_window=131072),
             ModelCapabilities(
                 "llama3-8b-8192",
                 "Llama 3 8B 8192",
@@ -0,0 +1,242 @@
+"""Client-side request and token rate limits shared by config entries."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+HASS_RATE_GOVERNORS_KEY = "_rate_governors"
+
+RATE_WINDOW = 60.0  # limits are per minute
+
+# Groq reports requests per day, not per minute, in x-ratelimit-limit-requests.
+DAILY_REQUEST_LIMIT_PROVIDERS = frozenset({"Groq"})
+
+
+def _parse_int(value: str | None) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Bucket refilled continuously up to ``capacity`` units per minute.
+
+    The level may drop below zero when a request used more than it reserved;
+    later requests then wait until that overdraft has refilled.
+    """
+
+    def __init__(self, capacity: float, now: float) -> None:
+        self.capacity = float(capacity)
+        self.level = float(capacity)
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self.level = min(self.capacity, self.level + elapsed * self.capacity / RATE_WINDOW)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Return seconds until ``amount`` is available; oversized amounts wait for a full bucket."""
+
+        self._refill(now)
+        shortfall = min(amount, self.capacity) - self.level
+        return 0.0 if shortfall <= 0 else shortfall * RATE_WINDOW / self.capacity
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.level
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= amount
+
+    def give(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def resize(self, capacity: float, now: float) -> None:
+        """Change the limit while keeping what was already used this minute."""
+
+        self._refill(now)
+        used = self.capacity - self.level
+        self.capacity = float(capacity)
+        self.level = min(self.capacity, self.capacity - used)
+
+    def sync(self, remaining: float, now: float) -> None:
+        """Lower the level to what the provider says is left, e.g. after use elsewhere."""
+
+        self._refill(now)
+        self.level = min(self.level, float(remaining))
+
+
+class RateGovernor:
+    """Requests-per-minute and tokens-per-minute buckets for one credential.
+
+    Each config entry may configure its own limits; the lowest configured
+    limit applies, further lowered by limits the provider reports in its
+    response headers. Dispatches wait in arrival order until both buckets
+    have room, and token reservations are corrected with the usage the
+    provider reports afterwards.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self.provider = provider
+        self._clock = clock
+        self._sleep = sleep
+        self._configured: dict[str, tuple[int, int]] = {}
+        self._learned_rpm: int | None = None
+        self._learned_tpm: int | None = None
+        self._requests: TokenBucket | None = None
+        self._tokens: TokenBucket | None = None
+        self._lock = asyncio.Lock()
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def configure(self, owner: str, rpm: int, tpm: int) -> None:
+        """Set the limits configured by one config entry; 0 means no limit."""
+
+        self._configured[owner] = (max(0, int(rpm)), max(0, int(tpm)))
+        self._apply_limits()
+
+    def unconfigure(self, owner: str) -> None:
+        """Drop the limits of a config entry that was unloaded or removed."""
+
+        if self._configured.pop(owner, None) is not None:
+            self._apply_limits()
+
+    def _limit(self, index: int, learned: int | None) -> int | None:
+        limits = [limits[index] for limits in self._configured.values() if limits[index] > 0]
+        if learned:
+            limits.append(learned)
+        return min(limits) if limits else None
+
+    def _resized(self, bucket: TokenBucket | None, limit: int | None, now: float) -> TokenBucket | None:
+        if limit is None:
+            return None
+        if bucket is None:
+            return TokenBucket(limit, now)
+        if bucket.capacity != limit:
+            bucket.resize(limit, now)
+        return bucket
+
+    def _apply_limits(self) -> None:
+        now = self._clock()
+        self._requests = self._resized(self._requests, self._limit(0, self._learned_rpm), now)
+        self._tokens = self._resized(self._tokens, self._limit(1, self._learned_tpm), now)
+
+    def learn(self, headers: Mapping[str, str] | None) -> None:
+        """Adopt the per-minute limits and remaining allowance a provider reported.
+
+        Reads the OpenAI-style ``x-ratelimit-limit-*``/``x-ratelimit-remaining-*``
+        headers and Anthropic's ``anthropic-ratelimit-requests-*`` and
+        ``anthropic-ratelimit-tokens-*`` headers.
+        """
+
+        if not headers:
+            return
+        lowered = {str(key).lower(): str(value) for key, value in headers.items()}
+        requests_per_minute = self.provider not in DAILY_REQUEST_LIMIT_PROVIDERS
+        rpm = _parse_int(lowered.get("anthropic-ratelimit-requests-limit"))
+        remaining_requests = _parse_int(lowered.get("anthropic-ratelimit-requests-remaining"))
+        if rpm is None and requests_per_minute:
+            rpm = _parse_int(lowered.get("x-ratelimit-limit-requests"))
+            remaining_requests = _parse_int(lowered.get("x-ratelimit-remaining-requests"))
+        tpm = _parse_int(lowered.get("anthropic-ratelimit-tokens-limit") or lowered.get("x-ratelimit-limit-tokens"))
+        remaining_tokens = _parse_int(
+            lowered.get("anthropic-ratelimit-tokens-remaining") or lowered.get("x-ratelimit-remaining-tokens")
+        )
+
+        if rpm and rpm > 0:
+            self._learned_rpm = rpm
+        if tpm and tpm > 0:
+            self._learned_tpm = tpm
+        self._apply_limits()
+        now = self._clock()
+        if self._requests is not None and remaining_requests is not None:
+            self._requests.sync(remaining_requests, now)
+        if self._tokens is not None and remaining_tokens is not None:
+            self._tokens.sync(remaining_tokens, now)
+
+    async def async_acquire(self, tokens: int) -> int:
+        """Wait until one request of about ``tokens`` tokens fits, then reserve it."""
+
+        async with self._lock:
+            waited = 0.0
+            while True:
+                now = self._clock()
+                wait = max(
+                    self._requests.wait_time(1, now) if self._requests else 0.0,
+                    self._tokens.wait_time(tokens, now) if self._tokens else 0.0,
+                )
+                if wait <= 0:
+                    break
+                waited += wait
+                await self._sleep(wait)
+            if waited:
+                self.throttled += 1
+                self.throttled_seconds += waited
+            now = self._clock()
+            if self._requests is not None:
+                self._requests.take(1, now)
+            if self._tokens is not None:
+                self._tokens.take(tokens, now)
+        return tokens
+
+    def settle(self, reserved: int, used: int | None) -> None:
+        """Correct a token reservation with the usage the provider reported."""
+
+        if self._tokens is None or used is None:
+            return
+        now = self._clock()
+        if used < reserved:
+            self._tokens.give(reserved - used, now)
+        elif used > reserved:
+            self._tokens.take(used - reserved, now)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return limits and current bucket levels for diagnostics."""
+
+        now = self._clock()
+        buckets: dict[str, Any] = {}
+        for name, bucket in (("requests", self._requests), ("tokens", self._tokens)):
+            buckets[name] = (
+                {"limit_per_minute": int(bucket.capacity), "available": round(bucket.available(now), 1)}
+                if bucket
+                else None
+            )
+        return {
+            "provider": self.provider,
+            "shared_by_entries": len(self._configured),
+            **buckets,
+            "throttled_requests": self.throttled,
+            "throttled_seconds": round(self.throttled_seconds, 1),
+        }
+
+
+def async_get_rate_governor(hass: HomeAssistant, provider: str, credential: str) -> RateGovernor:
+    """Return the governor shared by every entry using this provider credential."""
+
+    digest = hashlib.sha256(credential.encode("utf-8")).hexdigest()[:16]
+    governors = hass.data.setdefault(DOMAIN, {}).setdefault(HASS_RATE_GOVERNORS_KEY, {})
+    governor = governors.get((provider, digest))
+    if governor is None:
+        governor = RateGovernor(provider)
+        governors[(provider, digest)] = governor
+    return governor
@@ -0,0 +1,158 @@
+"""Persistent cache of provider responses keyed by a normalized prompt hash."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+CACHE_STORE_VERSION = 1
+CACHE_STORE_KEY = f"{DOMAIN}.response_cache"
+HASS_RESPONSE_CACHE_KEY = "_response_cache"
+
+# Responses can be tens of kilobytes, so keep the persisted cache small.
+RESPONSE_CACHE_MAX_ENTRIES = 32
+# Coalesce writes from bursts of cache updates into one storage write.
+RESPONSE_CACHE_SAVE_DELAY = 10
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+# OpenAI-compatible "length", Anthropic "max_tokens", Google "MAX_TOKENS".
+_TRUNCATED_REASONS = frozenset({"length", "max_tokens"})
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Remove whitespace differences that do not change what the model sees."""
+
+    return _TRAILING_SPACE_RE.sub("", prompt.replace("\r\n", "\n")).strip()
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    temperature: float | None,
+    prompt: str,
+    parameters: Mapping[str, Any] | None = None,
+) -> str:
+    """Return the cache key for one provider request.
+
+    ``parameters`` holds every other request setting that shapes the
+    output, such as the output token limit or reasoning effort.
+    """
+
+    digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+    settings = dict(sorted((parameters or {}).items()))
+    return json.dumps([provider, model, temperature, settings, digest], separators=(",", ":"))
+
+
+def is_truncated_response(metadata: Mapping[str, Any]) -> bool:
+    """Return whether the provider stopped because the output token limit was reached."""
+
+    reasons = (metadata.get("finish_reason"), metadata.get("native_finish_reason"), metadata.get("stop_reason"))
+    return metadata.get("status") == "incomplete" or any(
+        str(reason).lower() in _TRUNCATED_REASONS for reason in reasons if reason
+    )
+
+
+class ResponseCache:
+    """Size-bounded LRU of provider responses with per-lookup TTL.
+
+    Entries live in memory and are written to Home Assistant storage with a
+    delayed save, so they survive restarts without a write per request.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, CACHE_STORE_VERSION, CACHE_STORE_KEY)
+        self.max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.bypassed = 0
+
+    async def _async_load(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load() or {}
+            for entry in data.get("entries") or []:
+                if isinstance(entry, dict) and entry.get("key") and isinstance(entry.get("response"), str):
+                    self._entries[entry["key"]] = entry
+            self._loaded = True
+
+    def _data(self) -> dict[str, Any]:
+        return {"entries": list(self._entries.values())}
+
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(self._data, RESPONSE_CACHE_SAVE_DELAY)
+
+    async def async_get(self, key: str, ttl: float) -> dict[str, Any] | None:
+        """Return a fresh cached entry and mark it recently used, or None."""
+
+        await self._async_load()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if ttl > 0 and time.time() - float(entry.get("stored_at", 0)) > ttl:
+            del self._entries[key]
+            self._schedule_save()
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    async def async_set(self, key: str, response: str, metadata: dict[str, Any]) -> None:
+        """Store a response, evicting the least recently used entries when full."""
+
+        await self._async_load()
+        self._entries[key] = {"key": key, "response": response, "metadata": dict(metadata), "stored_at": time.time()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._schedule_save()
+
+    def record_bypass(self) -> None:
+        """Count a request that was not cacheable, e.g. because of temperature."""
+
+        self.bypassed += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters suitable for diagnostics."""
+
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+def async_get_response_cache(hass: HomeAssistant) -> ResponseCache:
+    """Return the shared response cache for this Home Assistant instance."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cache = domain_data.get(HASS_RESPONSE_CACHE_KEY)
+    if cache is None:
+        cache = ResponseCache(hass)
+        domain_data[HASS_RESPONSE_CACHE_KEY] = cache
+    return cache
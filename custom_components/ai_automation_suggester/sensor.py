@@ -4,7 +4,7 @@
 from __future__ import annotations
 
 import logging
-from typing import cast
+from typing import Any, cast
 
 from homeassistant.components.sensor import (
     SensorEntity,
@@ -15,14 +15,17 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_UNKNOWN, EntityCategory
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
 )
 
+from .circuit_breaker import CIRCUIT_OPEN
 from .const import (
     CONF_ANTHROPIC_MODEL,
+    CONF_COMPACT_ATTRIBUTES,
     CONF_CUSTOM_OPENAI_MODEL,
     CONF_GENERIC_OPENAI_MODEL,
     CONF_GOOGLE_MODEL,
@@ -39,11 +42,13 @@ from .const import (
     CONF_PERPLEXITY_MODEL,
     CONF_PROVIDER,
     CONF_REQUESTY_MODEL,
+    DEFAULT_COMPACT_ATTRIBUTES,
     DEFAULT_MAX_INPUT_TOKENS,
     DEFAULT_MAX_OUTPUT_TOKENS,
     DEFAULT_MODELS,
     DOMAIN,
     INTEGRATION_NAME,
+    PROVIDER_STATUS_CIRCUIT_OPEN,
     PROVIDER_STATUS_CONNECTED,
     PROVIDER_STATUS_ERROR,
     PROVIDER_STATUS_INITIALIZING,
@@ -56,6 +61,13 @@ from .const import (
     # Sensor Keys from const.py
     SENSOR_KEY_SUGGESTIONS,
 )
+from .events import (
+    EVENT_HISTORY_CLEARED,
+    EVENT_SUGGESTION_UPDATED,
+    EVENT_SUGGESTIONS_ADDED,
+    SIGNAL_SUGGESTION_EVENT,
+)
+from .store import async_get_suggestion_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -237,7 +249,7 @@ class AISuggestionsSensor(AIBaseSensor):
     # These fields are still exposed on the live state and via the HTTP API/
     # store, they just aren't written to the history database.
     _unrecorded_attributes = frozenset(
-        {"suggestions", "yaml_block", "description", "entities_processed", "suggestion"}
+        {"suggestions", "yaml_block", "description", "entities_processed", "suggestion", "suggestion_ids", "warnings"}
     )
 
     def __init__(
@@ -248,6 +260,8 @@ class AISuggestionsSensor(AIBaseSensor):
     ) -> None:
         super().__init__(coordinator, entry, description)
         self._previous_suggestions_timestamp: float | None = None
+        # Fresher history from store events, used until the next coordinator update.
+        self._history: list[dict[str, Any]] | None = None
 
         # Initialize state with default values
         self._attr_native_value = "No Suggestions"
@@ -270,6 +284,31 @@ class AISuggestionsSensor(AIBaseSensor):
         # Update initial state from coordinator if data exists
         if self.coordinator.data:
             self._update_state_and_attributes()
+        if self._compact:
+            self.async_on_remove(
+                async_dispatcher_connect(self.hass, SIGNAL_SUGGESTION_EVENT, self._handle_suggestion_event)
+            )
+
+    @property
+    def _compact(self) -> bool:
+        return bool(self._entry.options.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES))
+
+    @callback
+    def _handle_suggestion_event(self, event: dict[str, Any]) -> None:
+        """Refresh compact attributes when the shared history changes."""
+
+        if event["type"] in (EVENT_SUGGESTIONS_ADDED, EVENT_SUGGESTION_UPDATED, EVENT_HISTORY_CLEARED):
+            self.hass.async_create_task(self._async_refresh_history())
+
+    async def _async_refresh_history(self) -> None:
+        self._history = await async_get_suggestion_store(self.hass).async_list()
+        self._update_state_and_attributes()
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._history = None
+        super()._handle_coordinator_update()
 
 
     def _update_state_and_attributes(self) -> None:
@@ -287,6 +326,10 @@ class AISuggestionsSensor(AIBaseSensor):
         else:
             self._attr_native_value = "No Suggestions"
 
+        if self._compact:
+            self._attr_extra_state_attributes = self._compact_attributes(data)
+            return
+
         self._attr_extra_state_attributes = {
             "suggestions": suggestions,
             "description": data.get("description"),
@@ -301,12 +344,36 @@ class AISuggestionsSensor(AIBaseSensor):
             "warnings": data.get("warnings", []),
         }
 
+    def _compact_attributes(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Return IDs, counts, and the latest title instead of full content.
+
+        Dashboards fetch full records from the suggestions API or the
+        WebSocket subscription; ``revision`` tells them when to refetch.
+        """
+
+        history = self._history if self._history is not None else data.get("suggestion_history") or []
+        latest = data.get("suggestion") or {}
+        return {
+            "suggestion_id": latest.get("id"),
+            "suggestion_title": latest.get("title"),
+            "suggestion_ids": [item.get("id") for item in history],
+            "suggestion_count": len(history),
+            "new_suggestion_count": sum(1 for item in history if item.get("status") == "new"),
+            "entities_processed_count": len(data.get("entities_processed", [])),
+            "warning_count": len(data.get("warnings", [])),
+            "revision": async_get_suggestion_store(self.hass).revision if self.hass else None,
+            "last_update": data.get("last_update"),
+            "provider": self._entry.data.get(CONF_PROVIDER, "unknown"),
+            "model": data.get("model"),
+        }
+
 # ─────────────────────────────────────────────────────────────
 # Provider‑status sensor
 # ─────────────────────────────────────────────────────────────
 class AIProviderStatusSensor(AIBaseSensor):
     """Indicates whether the configured provider is reachable."""
     _attr_should_poll = False
+    _unrecorded_attributes = frozenset({"warnings", "response_metadata"})
 
     def __init__(
         self,
@@ -331,6 +398,12 @@ class AIProviderStatusSensor(AIBaseSensor):
         else:
             self._attr_native_value = PROVIDER_STATUS_INITIALIZING
 
+        # Requests fail locally while the provider's circuit is open.
+        breaker = getattr(self.coordinator, "circuit_breaker", None)
+        circuit = breaker.snapshot() if breaker is not None else {}
+        if circuit.get("circuit_state") == CIRCUIT_OPEN:
+            self._attr_native_value = PROVIDER_STATUS_CIRCUIT_OPEN
+
         self._attr_extra_state_attributes = {
             "last_error_message": data.get("last_error", None),
             "last_attempted_update": data.get("last_update"),
@@ -338,6 +411,7 @@ class AIProviderStatusSensor(AIBaseSensor):
             "model": data.get("model"),
             "warnings": data.get("warnings", []),
             "response_metadata": data.get("response_metadata", {}),
+            **circuit,
         }
 
 # ─────────────────────────────────────────────────────────────
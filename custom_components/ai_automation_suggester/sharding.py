@@ -0,0 +1,132 @@
+"""Partition large entity sets into prompt-sized shards and merge their results."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+SHARD_BY_AREA = "area"
+SHARD_BY_DOMAIN = "domain"
+SHARD_BY_SIZE = "size"
+SHARD_GROUPINGS = (SHARD_BY_AREA, SHARD_BY_DOMAIN, SHARD_BY_SIZE)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class ShardItem:
+    """One entity to place in a shard with its estimated prompt cost."""
+
+    entity_id: str
+    group: str
+    tokens: int
+
+
+def shard_group(entity_id: str, area: str | None, grouping: str) -> str:
+    """Return the grouping key that should keep an entity with its neighbours."""
+
+    if grouping == SHARD_BY_AREA:
+        return (area or "").casefold()
+    if grouping == SHARD_BY_DOMAIN:
+        return entity_id.split(".", 1)[0]
+    return ""
+
+
+def partition_entities(
+    items: Iterable[ShardItem],
+    *,
+    capacity: int,
+    max_entities: int,
+    max_shards: int,
+    first_capacity: int | None = None,
+) -> tuple[list[list[str]], list[str]]:
+    """Pack entities into shards and return them with the entities left over.
+
+    Entities are ordered by group and ID, and a group starts a new shard
+    when it fits in an empty shard but not in the current one, so related
+    entities reach the model together. Groups larger than one shard are
+    split. Entities that would need more than ``max_shards`` shards, or
+    that are too large for any shard, are returned as deferred.
+    ``first_capacity`` lowers the capacity of the first shard, which also
+    carries the automation and script context.
+    """
+
+    capacity = max(1, capacity)
+    first_capacity = capacity if first_capacity is None else max(1, min(capacity, first_capacity))
+    max_entities = max(1, max_entities)
+    groups: dict[str, list[ShardItem]] = {}
+    for item in sorted(items, key=lambda item: (item.group, item.entity_id)):
+        groups.setdefault(item.group, []).append(item)
+
+    shards: list[list[str]] = []
+    deferred: list[str] = []
+    current: list[str] = []
+    used = 0
+
+    def close_current() -> None:
+        nonlocal current, used
+        if current:
+            shards.append(current)
+        current, used = [], 0
+
+    def limit() -> int:
+        return capacity if shards else first_capacity
+
+    for members in groups.values():
+        group_tokens = sum(item.tokens for item in members)
+        if current and (used + group_tokens > limit() or len(current) + len(members) > max_entities):
+            if group_tokens <= capacity and len(members) <= max_entities:
+                close_current()
+        for item in members:
+            if item.tokens > capacity or len(shards) >= max_shards:
+                deferred.append(item.entity_id)
+                continue
+            if current and (used + item.tokens > limit() or len(current) >= max_entities):
+                close_current()
+                if len(shards) >= max_shards:
+                    deferred.append(item.entity_id)
+                    continue
+            current.append(item.entity_id)
+            used += item.tokens
+    close_current()
+    return shards, deferred
+
+
+def _suggestion_key(suggestion: dict[str, Any]) -> str:
+    yaml_code = suggestion.get("yamlCode")
+    if yaml_code:
+        return "yaml:" + _WHITESPACE_RE.sub(" ", str(yaml_code)).strip().casefold()
+    return "title:" + _WHITESPACE_RE.sub(" ", str(suggestion.get("title") or "")).strip().casefold()
+
+
+def merge_suggestions(batches: Iterable[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Deduplicate suggestions from several shards and rank the survivors.
+
+    Suggestions with the same YAML (or, without YAML, the same title) are
+    merged into the first one seen. Suggestions proposed by more shards rank
+    first, then higher confidence, then fewer warnings; ties keep shard order.
+    """
+
+    merged: dict[str, dict[str, Any]] = {}
+    votes: dict[str, int] = {}
+    for batch in batches:
+        for suggestion in batch:
+            key = _suggestion_key(suggestion)
+            if key in merged:
+                votes[key] += 1
+                continue
+            merged[key] = suggestion
+            votes[key] = 1
+
+    def rank(key: str) -> tuple[int, float, int]:
+        suggestion = merged[key]
+        confidence = suggestion.get("confidence")
+        return (
+            -votes[key],
+            -(confidence if isinstance(confidence, (int, float)) else 0.5),
+            len(suggestion.get("warnings") or []),
+        )
+
+    return [merged[key] for key in sorted(merged, key=rank)]
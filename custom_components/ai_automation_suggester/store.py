@@ -3,78 +3,269 @@
 from __future__ import annotations
 
 import asyncio
-from copy import deepcopy
 from typing import Any
+from uuid import uuid4
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.storage import Store
 
-from .const import DEFAULT_HISTORY_RETENTION, DOMAIN
+from .const import DEFAULT_HISTORY_RETENTION, DEFAULT_HISTORY_SAVE_DELAY, DOMAIN
+from .events import (
+    EVENT_HISTORY_CLEARED,
+    EVENT_SUGGESTION_UPDATED,
+    EVENT_SUGGESTIONS_ADDED,
+    async_publish,
+)
 
-STORE_VERSION = 1
+STORE_VERSION = 2
 STORE_KEY = f"{DOMAIN}.suggestions"
 STORE_DATA_KEY = "suggestions"
+STORE_RUNS_KEY = "runs"
 HASS_STORE_KEY = "_suggestion_store"
 
+# Version 1 copied these generation-wide fields into every suggestion.
+_RUN_FIELDS = ("entities_processed", "response_metadata")
+
+
+def migrate_v1_history(data: dict[str, Any]) -> dict[str, Any]:
+    """Move per-generation context out of version 1 suggestion records.
+
+    Suggestions created by the same run share provider, model, and
+    timestamp, so each such group gets one run record.
+    """
+
+    suggestions: list[dict[str, Any]] = []
+    runs: dict[str, dict[str, Any]] = {}
+    run_ids: dict[tuple[Any, ...], str] = {}
+    for record in data.get(STORE_DATA_KEY) or []:
+        if not isinstance(record, dict):
+            continue
+        record = dict(record)
+        context = {field: record.pop(field, None) for field in _RUN_FIELDS}
+        if any(value is not None for value in context.values()) and "run_id" not in record:
+            group = (record.get("provider"), record.get("model"), record.get("created_at"))
+            run_id = run_ids.get(group)
+            if run_id is None:
+                run_id = run_ids[group] = str(uuid4())
+                runs[run_id] = {
+                    "id": run_id,
+                    "provider": record.get("provider"),
+                    "model": record.get("model"),
+                    "created_at": record.get("created_at"),
+                    "entities_processed": list(context["entities_processed"] or []),
+                    "response_metadata": dict(context["response_metadata"] or {}),
+                }
+            record["run_id"] = run_id
+        suggestions.append(record)
+    return {STORE_DATA_KEY: suggestions, STORE_RUNS_KEY: runs}
+
+
+class _HistoryStore(Store):
+    """Storage helper that upgrades older history layouts on load."""
+
+    async def _async_migrate_func(self, old_major_version, old_minor_version, old_data):
+        if old_major_version < 2:
+            return migrate_v1_history(old_data)
+        return old_data
+
 
 class SuggestionStore:
-    """Small wrapper around Home Assistant storage helper."""
+    """Small wrapper around Home Assistant storage helper.
+
+    Records are kept in an id index plus an ordering list. Context shared
+    by one generation (entities sent, response metadata) is kept once per
+    run and referenced from suggestions by ``run_id``. Stored records are
+    never mutated in place: a status change replaces the one affected record
+    with an updated copy. Readers therefore share records instead of
+    receiving deep copies and must treat them as read-only.
+
+    With a positive ``save_delay`` writes are deferred through
+    ``Store.async_delay_save`` so a burst of mutations becomes one write of
+    the latest state. Changes are visible in memory immediately; pending
+    writes are flushed by :meth:`async_flush` and by Home Assistant's final
+    write on shutdown.
+    """
 
     def __init__(self, hass: HomeAssistant) -> None:
-        self._store: Store[dict[str, Any]] = Store(hass, STORE_VERSION, STORE_KEY)
-        self._data: dict[str, Any] | None = None
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = _HistoryStore(hass, STORE_VERSION, STORE_KEY)
+        self._loaded = False
+        self._order: list[str] = []
+        self._by_id: dict[str, dict[str, Any]] = {}
+        self._runs: dict[str, dict[str, Any]] = {}
+        self._snapshot: tuple[dict[str, Any], ...] | None = None
+        # Bumped on every in-memory change; the instance prefix keeps
+        # revisions from a previous Home Assistant run from colliding.
+        self._instance = uuid4().hex[:8]
+        self._revision = 0
+        self.save_delay: float = DEFAULT_HISTORY_SAVE_DELAY
+        self._save_delays: dict[str, float] = {}
+        self._save_pending = False
         self._load_lock = asyncio.Lock()
         self._write_lock = asyncio.Lock()
 
-    async def _async_load(self) -> dict[str, Any]:
-        if self._data is None:
-            async with self._load_lock:
-                if self._data is None:
-                    self._data = await self._store.async_load() or {STORE_DATA_KEY: []}
-                    self._data.setdefault(STORE_DATA_KEY, [])
-        return self._data
+    async def _async_load(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load() or {}
+            self._runs = dict(data.get(STORE_RUNS_KEY) or {})
+            self._set_records(data.get(STORE_DATA_KEY) or [])
+            self._loaded = True
+
+    def _set_records(self, records: list[dict[str, Any]]) -> None:
+        order: list[str] = []
+        by_id: dict[str, dict[str, Any]] = {}
+        for record in records:
+            suggestion_id = record.get("id")
+            if not suggestion_id:
+                # Early releases could store records without an ID.
+                suggestion_id = str(uuid4())
+                record = {**record, "id": suggestion_id}
+            if suggestion_id in by_id:
+                continue
+            order.append(suggestion_id)
+            by_id[suggestion_id] = record
+        self._order = order
+        self._by_id = by_id
+        self._snapshot = None
+        self._revision += 1
+        referenced = {record.get("run_id") for record in by_id.values()}
+        if self._runs.keys() - referenced:
+            self._runs = {run_id: run for run_id, run in self._runs.items() if run_id in referenced}
+
+    def _records(self) -> tuple[dict[str, Any], ...]:
+        if self._snapshot is None:
+            self._snapshot = tuple(self._by_id[suggestion_id] for suggestion_id in self._order)
+        return self._snapshot
+
+    @property
+    def revision(self) -> str:
+        """Opaque token that changes whenever the stored history changes."""
+
+        return f"{self._instance}-{self._revision}"
+
+    def _data(self) -> dict[str, Any]:
+        return {STORE_DATA_KEY: list(self._records()), STORE_RUNS_KEY: dict(self._runs)}
+
+    def _delayed_data(self) -> dict[str, Any]:
+        self._save_pending = False
+        return self._data()
+
+    def configure_save_delay(self, owner: str, save_delay: float) -> None:
+        """Set the write-behind window one config entry asks for.
+
+        History is shared by all entries, so the shortest window applies.
+        """
+
+        self._save_delays[owner] = max(0.0, float(save_delay))
+        self._apply_save_delay()
+
+    def unconfigure_save_delay(self, owner: str) -> None:
+        """Drop the window of a config entry that was unloaded or removed."""
+
+        if self._save_delays.pop(owner, None) is not None:
+            self._apply_save_delay()
+
+    def _apply_save_delay(self) -> None:
+        self.save_delay = min(self._save_delays.values(), default=DEFAULT_HISTORY_SAVE_DELAY)
+
+    async def _async_save(self) -> None:
+        if self.save_delay > 0:
+            self._save_pending = True
+            self._store.async_delay_save(self._delayed_data, self.save_delay)
+            return
+        # An immediate save also cancels any pending delayed write.
+        self._save_pending = False
+        await self._store.async_save(self._data())
+
+    async def async_flush(self) -> None:
+        """Write any delayed changes now."""
+
+        async with self._write_lock:
+            if not self._save_pending:
+                return
+            self._save_pending = False
+            await self._store.async_save(self._data())
 
     async def async_list(self) -> list[dict[str, Any]]:
-        """Return stored suggestions, newest first."""
+        """Return stored suggestions, newest first, sharing read-only records."""
+
+        await self._async_load()
+        return list(self._records())
+
+    async def async_get(self, suggestion_id: str) -> dict[str, Any] | None:
+        """Return one read-only stored suggestion by ID."""
 
-        data = await self._async_load()
-        return deepcopy(data.get(STORE_DATA_KEY, []))
+        await self._async_load()
+        return self._by_id.get(suggestion_id)
+
+    async def async_get_run(self, run_id: str) -> dict[str, Any] | None:
+        """Return the read-only generation context a suggestion points to."""
+
+        await self._async_load()
+        return self._runs.get(run_id)
 
     async def async_add_suggestions(
         self,
         suggestions: list[dict[str, Any]],
         retention: int = DEFAULT_HISTORY_RETENTION,
+        run: dict[str, Any] | None = None,
     ) -> list[dict[str, Any]]:
-        """Persist suggestions and return the new stored list."""
+        """Persist suggestions and their run record and return the new stored list.
+
+        The store takes ownership of the given records; callers must not
+        modify them afterwards. Run records no longer referenced after the
+        retention trim are dropped.
+        """
 
         async with self._write_lock:
-            data = await self._async_load()
-            current = list(data.get(STORE_DATA_KEY, []))
-            data[STORE_DATA_KEY] = suggestions + current
+            await self._async_load()
+            if run is not None:
+                self._runs[run["id"]] = run
+            previous = self._records()
+            previous_ids = set(self._by_id)
+            records = [*suggestions, *previous]
             if retention > 0:
-                data[STORE_DATA_KEY] = data[STORE_DATA_KEY][:retention]
-            await self._store.async_save(data)
-            return deepcopy(data[STORE_DATA_KEY])
+                records = records[:retention]
+            self._set_records(records)
+            await self._async_save()
+            async_publish(
+                self._hass,
+                EVENT_SUGGESTIONS_ADDED,
+                suggestions=[record for record in self._records() if record["id"] not in previous_ids],
+                removed_ids=[record["id"] for record in previous if record["id"] not in self._by_id],
+                revision=self.revision,
+            )
+            return list(self._records())
 
     async def async_update_status(self, suggestion_id: str, status: str) -> dict[str, Any] | None:
         """Update a suggestion status such as accepted, declined, or dismissed."""
 
         async with self._write_lock:
-            data = await self._async_load()
-            for suggestion in data.get(STORE_DATA_KEY, []):
-                if suggestion.get("id") == suggestion_id:
-                    suggestion["status"] = status
-                    await self._store.async_save(data)
-                    return deepcopy(suggestion)
-        return None
+            await self._async_load()
+            current = self._by_id.get(suggestion_id)
+            if current is None:
+                return None
+            updated = {**current, "status": status}
+            self._by_id[suggestion_id] = updated
+            self._snapshot = None
+            self._revision += 1
+            await self._async_save()
+            async_publish(self._hass, EVENT_SUGGESTION_UPDATED, suggestion=updated, revision=self.revision)
+            return updated
 
     async def async_clear(self) -> None:
         """Clear all stored suggestions."""
 
         async with self._write_lock:
-            data = await self._async_load()
-            data[STORE_DATA_KEY] = []
-            await self._store.async_save(data)
+            await self._async_load()
+            self._runs = {}
+            self._set_records([])
+            await self._async_save()
+            async_publish(self._hass, EVENT_HISTORY_CLEARED, revision=self.revision)
 
 
 def async_get_suggestion_store(hass: HomeAssistant) -> SuggestionStore:
@@ -0,0 +1,220 @@
+"""Incremental decoding of streamed provider responses.
+
+Providers stream either server-sent events (OpenAI-compatible chat
+completions, the OpenAI Responses API, Anthropic, Google) or newline-delimited
+JSON (Ollama). Each decoder turns one decoded event payload into a text delta
+and collects the same response metadata the buffered handlers record.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+SSE_DONE = "[DONE]"
+
+
+async def iter_lines(response: Any) -> AsyncIterator[str]:
+    """Yield decoded lines from an aiohttp response body as they arrive."""
+
+    async for raw_line in response.content:
+        yield raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+
+async def iter_sse_json(response: Any) -> AsyncIterator[dict[str, Any]]:
+    """Yield the JSON ``data`` payload of each server-sent event."""
+
+    data_lines: list[str] = []
+
+    def decode(data: str) -> dict[str, Any] | None:
+        if data == SSE_DONE:
+            return None
+        try:
+            payload = json.loads(data)
+        except json.JSONDecodeError:
+            _LOGGER.debug("Skipping undecodable stream event: %.200s", data)
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    async for line in iter_lines(response):
+        if not line:
+            if data_lines:
+                payload = decode("\n".join(data_lines))
+                data_lines = []
+                if payload is not None:
+                    yield payload
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        payload = decode("\n".join(data_lines))
+        if payload is not None:
+            yield payload
+
+
+async def iter_ndjson(response: Any) -> AsyncIterator[dict[str, Any]]:
+    """Yield one JSON object per non-empty line."""
+
+    async for line in iter_lines(response):
+        if not line.strip():
+            continue
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError:
+            _LOGGER.debug("Skipping undecodable stream line: %.200s", line)
+            continue
+        if isinstance(payload, dict):
+            yield payload
+
+
+class StreamDecoder(ABC):
+    """Accumulate streamed text and response metadata for one request."""
+
+    ndjson = False
+
+    def __init__(self, provider_label: str) -> None:
+        self.provider_label = provider_label
+        self.metadata: dict[str, Any] = {}
+        self._parts: list[str] = []
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, payload: dict[str, Any]) -> str:
+        """Consume one event payload and return its text delta."""
+
+        error = payload.get("error")
+        if error:
+            message = error.get("message") if isinstance(error, dict) else error
+            raise ValueError(f"{self.provider_label} stream error: {message}")
+        delta = self._delta(payload)
+        if delta:
+            self._parts.append(delta)
+        return delta
+
+    @abstractmethod
+    def _delta(self, payload: dict[str, Any]) -> str:
+        """Return the text in one event payload and record its metadata."""
+
+
+class ChatCompletionStream(StreamDecoder):
+    """OpenAI-compatible ``chat.completion.chunk`` events."""
+
+    def __init__(self, provider_label: str) -> None:
+        super().__init__(provider_label)
+        self.metadata = {"finish_reason": None, "native_finish_reason": None, "usage": None}
+        self._reasoning: list[str] = []
+
+    @property
+    def text(self) -> str:
+        # Mirror the buffered path's reasoning_content fallback (issue #127).
+        return "".join(self._parts) or "".join(self._reasoning)
+
+    def _delta(self, payload: dict[str, Any]) -> str:
+        if payload.get("usage"):
+            self.metadata["usage"] = payload["usage"]
+        choices = payload.get("choices")
+        if not isinstance(choices, list) or not choices:
+            return ""
+        choice = choices[0]
+        if choice.get("finish_reason"):
+            self.metadata["finish_reason"] = choice["finish_reason"]
+        if choice.get("native_finish_reason"):
+            self.metadata["native_finish_reason"] = choice["native_finish_reason"]
+        delta = choice.get("delta") or {}
+        content = delta.get("content")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        reasoning = delta.get("reasoning_content") or delta.get("reasoning")
+        if isinstance(reasoning, str) and reasoning:
+            self._reasoning.append(reasoning)
+        return content if isinstance(content, str) else ""
+
+
+class ResponsesStream(StreamDecoder):
+    """OpenAI Responses API ``response.*`` events."""
+
+    def __init__(self, provider_label: str) -> None:
+        super().__init__(provider_label)
+        self.metadata = {"status": None, "incomplete_details": None, "usage": None}
+
+    def _delta(self, payload: dict[str, Any]) -> str:
+        event_type = payload.get("type")
+        if event_type == "response.output_text.delta":
+            return str(payload.get("delta") or "")
+        if event_type in {"response.completed", "response.incomplete", "response.failed"}:
+            response = payload.get("response") or {}
+            self.metadata = {
+                "status": response.get("status"),
+                "incomplete_details": response.get("incomplete_details"),
+                "usage": response.get("usage"),
+            }
+            if event_type == "response.failed":
+                error = response.get("error") or {}
+                raise ValueError(f"{self.provider_label} stream error: {error.get('message') or 'response failed'}")
+        return ""
+
+
+class AnthropicStream(StreamDecoder):
+    """Anthropic Messages API stream events."""
+
+    def __init__(self, provider_label: str) -> None:
+        super().__init__(provider_label)
+        self.metadata = {"stop_reason": None, "usage": None}
+
+    def _delta(self, payload: dict[str, Any]) -> str:
+        event_type = payload.get("type")
+        if event_type == "message_start":
+            self.metadata["usage"] = dict((payload.get("message") or {}).get("usage") or {})
+        elif event_type == "content_block_delta":
+            delta = payload.get("delta") or {}
+            if delta.get("type") == "text_delta":
+                return str(delta.get("text") or "")
+        elif event_type == "message_delta":
+            self.metadata["stop_reason"] = (payload.get("delta") or {}).get("stop_reason")
+            usage = payload.get("usage") or {}
+            self.metadata["usage"] = {**(self.metadata["usage"] or {}), **usage}
+        return ""
+
+
+class GoogleStream(StreamDecoder):
+    """Gemini ``streamGenerateContent?alt=sse`` chunks."""
+
+    def __init__(self, provider_label: str) -> None:
+        super().__init__(provider_label)
+        self.metadata = {"finish_reason": None, "usage": None}
+
+    def _delta(self, payload: dict[str, Any]) -> str:
+        if payload.get("usageMetadata"):
+            self.metadata["usage"] = payload["usageMetadata"]
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            return ""
+        if candidates[0].get("finishReason"):
+            self.metadata["finish_reason"] = candidates[0]["finishReason"]
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        return "".join(str(part.get("text", "")) for part in parts if isinstance(part, dict))
+
+
+class OllamaStream(StreamDecoder):
+    """Ollama ``/api/chat`` NDJSON chunks."""
+
+    ndjson = True
+
+    def __init__(self, provider_label: str) -> None:
+        super().__init__(provider_label)
+        self.metadata = {"done_reason": None, "usage": None}
+
+    def _delta(self, payload: dict[str, Any]) -> str:
+        if payload.get("done"):
+            self.metadata = {"done_reason": payload.get("done_reason"), "usage": payload.get("eval_count")}
+        return str((payload.get("message") or {}).get("content") or "")
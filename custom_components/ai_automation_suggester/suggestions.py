@@ -20,6 +20,15 @@ ENTITY_ID_RE = re.compile(r"(?<![a-z0-9_])([a-z0-9_]+\.[a-z0-9_]+)(?![a-z0-9_])"
 SERVICE_RE = re.compile(r"^[a-z0-9_]+\.[a-z0-9_]+$", re.IGNORECASE)
 ENTITY_REFERENCE_KEYS = {"entity_id", "entity_ids"}
 SERVICE_REFERENCE_KEYS = {"service", "action"}
+_STRUCTURE_RE = re.compile(r'["{}\[\]]')
+_STRING_SPECIAL_RE = re.compile(r'["\\\x00-\x1f]')
+_LINE_END_RE = re.compile(r"[ \t]*(?:\r?\n|\Z)")
+_RAW_BLOCK_END_RE = re.compile(r'\n[ \t]*""')
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+# Characters that may follow an opening bracket in JSON; anything else is prose.
+_ARRAY_START_RE = re.compile(r'\s*[\[\]{"\-0-9tfn]')
+_OBJECT_START_RE = re.compile(r'\s*["}]')
+_CONTENT_KEYS = ("title", "description", "shortDescription", "yaml", "yaml_block", "yamlCode")
 
 
 STRUCTURED_OUTPUT_INSTRUCTIONS = """
@@ -118,45 +127,65 @@ def _try_json_loads(raw_response: str) -> dict | list | None:
 def _decode_jsonish_string(value: str) -> str:
     """Decode a JSON string fragment when possible."""
 
+    if "\\" not in value:
+        # Nothing to unescape; callers strip surrounding whitespace.
+        return value
     try:
         return str(json.loads(f'"{value}"'))
     except json.JSONDecodeError:
         return value.replace('\\"', '"').replace("\\n", "\n").strip()
 
 
-def _extract_string_field(segment: str, field: str) -> str | None:
-    match = re.search(rf'"{re.escape(field)}"\s*:\s*"((?:\\.|[^"\\])*)"', segment)
-    return _decode_jsonish_string(match.group(1)).strip() if match else None
-
-
-def _extract_array_field(segment: str, field: str) -> list:
-    match = re.search(rf'"{re.escape(field)}"\s*:\s*(\[[\s\S]*?\])', segment)
-    if not match:
-        return []
-    try:
-        value = json.loads(match.group(1))
-    except json.JSONDecodeError:
-        return []
-    return value if isinstance(value, list) else []
-
+_LOOSE_ARRAY_FIELDS = ("entities_used", "automation_ids_used", "script_ids_used", "warnings")
+_LOOSE_FIELD_KEY_RE = re.compile(
+    r'"(title|description|yaml|confidence|' + "|".join(_LOOSE_ARRAY_FIELDS) + r')"\s*:\s*'
+)
+_LOOSE_STRING_VALUE_RE = re.compile(r'"((?:\\.|[^"\\])*)"')
+_LOOSE_NUMBER_VALUE_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_MALFORMED_YAML_FIELD_RE = re.compile(
+    rf'"yaml"\s*:\s*""\s*\r?\n(?P<yaml>[\s\S]*?)\r?\n\s*""\s*,?\s*(?=\r?\n\s*"(?:{STRING_FIELDS_AFTER_YAML})"|\r?\n\s*\}})'
+)
+_TITLE_KEY_RE = re.compile(r'"title"\s*:')
+_JSON_DECODER = json.JSONDecoder()
 
-def _extract_number_field(segment: str, field: str) -> float | None:
-    match = re.search(rf'"{re.escape(field)}"\s*:\s*(-?\d+(?:\.\d+)?)', segment)
-    return float(match.group(1)) if match else None
 
+def _scan_loose_fields(text: str, start: int, end: int) -> dict[str, Any]:
+    """Extract known suggestion fields from ``text[start:end]`` in one scan.
 
-def _extract_yaml_field(segment: str) -> str | None:
-    malformed = re.search(
-        rf'"yaml"\s*:\s*""\s*\r?\n(?P<yaml>[\s\S]*?)\r?\n\s*""\s*,?\s*(?=\r?\n\s*"(?:{STRING_FIELDS_AFTER_YAML})"|\r?\n\s*\}})',
-        segment,
-    )
-    if malformed:
-        return textwrap.dedent(malformed.group("yaml")).strip() or None
+    Each key is located once with a precompiled pattern and its value is read
+    in place, so segments are never sliced or searched once per field. The
+    first occurrence of a field with a readable value wins.
+    """
 
-    valid = re.search(r'"yaml"\s*:\s*"((?:\\.|[^"\\])*)"', segment)
-    if valid:
-        return _decode_jsonish_string(valid.group(1)).strip() or None
-    return None
+    fields: dict[str, Any] = {}
+    for key in _LOOSE_FIELD_KEY_RE.finditer(text, start, end):
+        field = key.group(1)
+        if field in fields:
+            continue
+        value_start = key.end()
+        if field in _LOOSE_ARRAY_FIELDS:
+            if not text.startswith("[", value_start):
+                continue
+            try:
+                value, value_end = _JSON_DECODER.raw_decode(text, value_start)
+            except json.JSONDecodeError:
+                continue
+            if value_end <= end and isinstance(value, list):
+                fields[field] = value
+        elif field == "confidence":
+            number = _LOOSE_NUMBER_VALUE_RE.match(text, value_start, end)
+            if number:
+                fields[field] = float(number.group(0))
+        else:
+            if field == "yaml":
+                malformed = _MALFORMED_YAML_FIELD_RE.match(text, key.start(), end)
+                if malformed:
+                    fields[field] = textwrap.dedent(malformed.group("yaml")).strip() or None
+                    continue
+            string = _LOOSE_STRING_VALUE_RE.match(text, value_start, end)
+            if string:
+                fields[field] = _decode_jsonish_string(string.group(1)).strip() or None
+    return fields
 
 
 def _try_loose_structured_items(raw_response: str) -> list[dict[str, Any]]:
@@ -165,18 +194,18 @@ def _try_loose_structured_items(raw_response: str) -> list[dict[str, Any]]:
     if '"suggestions"' not in raw_response and '"title"' not in raw_response:
         return []
 
-    title_matches = list(re.finditer(r'"title"\s*:', raw_response))
+    title_starts = [match.start() for match in _TITLE_KEY_RE.finditer(raw_response)]
     items: list[dict[str, Any]] = []
-    for index, match in enumerate(title_matches):
-        start = raw_response.rfind("{", 0, match.start())
+    for index, title_start in enumerate(title_starts):
+        start = raw_response.rfind("{", 0, title_start)
         if start == -1:
-            start = match.start()
-        end = title_matches[index + 1].start() if index + 1 < len(title_matches) else len(raw_response)
-        segment = raw_response[start:end]
+            start = title_start
+        end = title_starts[index + 1] if index + 1 < len(title_starts) else len(raw_response)
 
-        title = _extract_string_field(segment, "title")
-        description = _extract_string_field(segment, "description")
-        yaml_code = _extract_yaml_field(segment)
+        fields = _scan_loose_fields(raw_response, start, end)
+        title = fields.get("title")
+        description = fields.get("description")
+        yaml_code = fields.get("yaml")
         if not any((title, description, yaml_code)):
             continue
 
@@ -184,14 +213,10 @@ def _try_loose_structured_items(raw_response: str) -> list[dict[str, Any]]:
             "title": title,
             "description": description,
             "yaml": yaml_code,
-            "entities_used": _extract_array_field(segment, "entities_used"),
-            "automation_ids_used": _extract_array_field(segment, "automation_ids_used"),
-            "script_ids_used": _extract_array_field(segment, "script_ids_used"),
-            "warnings": _extract_array_field(segment, "warnings"),
+            **{field: fields.get(field, []) for field in _LOOSE_ARRAY_FIELDS},
         }
-        confidence = _extract_number_field(segment, "confidence")
-        if confidence is not None:
-            item["confidence"] = confidence
+        if "confidence" in fields:
+            item["confidence"] = fields["confidence"]
         items.append(item)
 
     return items
@@ -231,6 +256,7 @@ def _normalise_suggestion(
     model: str,
     created_at: datetime,
     entities_processed: list[str],
+    run_id: str,
     inherited_warnings: list[str],
     response_metadata: dict[str, Any],
 ) -> dict[str, Any]:
@@ -270,6 +296,8 @@ def _normalise_suggestion(
         warnings.append("The provider reported a length finish reason; the suggestion may be truncated.")
     if response_metadata.get("status") == "incomplete":
         warnings.append("The provider returned an incomplete response.")
+    if response_metadata.get("cancelled"):
+        warnings.append("The generation was cancelled; this suggestion was received before it stopped.")
 
     return {
         # IDs and workflow status belong to Home Assistant, not the model.
@@ -289,13 +317,295 @@ def _normalise_suggestion(
         "services_used": services_used,
         "automation_ids_used": _unique_strings(_as_list(item.get("automation_ids_used"))),
         "script_ids_used": _unique_strings(_as_list(item.get("script_ids_used"))),
-        "entities_processed": entities_processed,
+        # Generation context lives once in the run record (see build_run_record).
+        "run_id": run_id,
         "confidence": confidence,
         "warnings": list(dict.fromkeys(warnings)),
-        "response_metadata": dict(response_metadata),
     }
 
 
+def build_run_record(
+    run_id: str,
+    *,
+    provider: str,
+    model: str,
+    created_at: datetime,
+    entities_processed: list[str],
+    response_metadata: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Return the context shared by all suggestions from one generation."""
+
+    return {
+        "id": run_id,
+        "provider": provider,
+        "model": model,
+        "created_at": created_at.isoformat(),
+        "entities_processed": list(entities_processed),
+        "response_metadata": dict(response_metadata or {}),
+    }
+
+
+class StreamingSuggestionParser:
+    """Incrementally extract suggestion objects from a JSON envelope.
+
+    Chunks are scanned once. Each object directly in the top-level
+    ``suggestions`` array (or a bare top-level array) is decoded as soon as
+    its closing brace arrives; brackets in prose before the JSON are
+    skipped. Raw control characters inside strings, trailing commas, and
+    the ``"yaml": ""`` ... ``""`` block some models emit are repaired while
+    scanning, so no second pass over the response is needed.
+    """
+
+    def __init__(
+        self,
+        *,
+        provider: str,
+        model: str,
+        created_at: datetime,
+        entities_processed: list[str],
+        inherited_warnings: list[str] | None = None,
+        run_id: str | None = None,
+    ) -> None:
+        self.run_id = run_id or str(uuid4())
+        self._context: dict[str, Any] = {
+            "provider": provider,
+            "model": model,
+            "created_at": created_at,
+            "entities_processed": entities_processed,
+            "run_id": self.run_id,
+        }
+        self._inherited = list(inherited_warnings or [])
+        self._buffer = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._items_open = False
+        self._key_from: int | None = None
+        self._key_parts: list[str] = []
+        self._last_key: str | None = None
+        self._item_start: int | None = None
+        self._copied = 0
+        self._parts: list[str] = []
+        self._repaired = False
+        self._raw_items: list[tuple[dict[str, Any], bool]] = []
+        self.items: list[dict[str, Any]] = []
+        self.failed = 0
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """Consume a text delta and return suggestions completed by it."""
+
+        self._buffer += chunk
+        completed: list[dict[str, Any]] = []
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer):
+            if self._in_string:
+                match = _STRING_SPECIAL_RE.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                index = match.start()
+                char = buffer[index]
+                if char == "\\":
+                    if index + 1 >= len(buffer):
+                        pos = index
+                        break
+                    pos = index + 2
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_from is not None:
+                        self._last_key = "".join(self._key_parts) + buffer[self._key_from : index]
+                        self._key_from = None
+                        self._key_parts = []
+                    pos = index + 1
+                else:
+                    if self._item_start is not None:
+                        self._parts.append(buffer[self._copied : index])
+                        self._parts.append(_CONTROL_ESCAPES.get(char, f"\\u{ord(char):04x}"))
+                        self._copied = index + 1
+                        self._repaired = True
+                    pos = index + 1
+                continue
+
+            match = _STRUCTURE_RE.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            index = match.start()
+            char = buffer[index]
+            if char == '"':
+                if self._item_start is not None:
+                    block = self._raw_yaml_block(buffer, index)
+                    if block is None:
+                        pos = index
+                        break
+                    if block:
+                        pos = self._copied
+                        continue
+                self._in_string = bool(self._stack)
+                if self._stack == ["{"]:
+                    # Remember top-level keys to find the ``suggestions`` array.
+                    self._key_from = index + 1
+            elif char in "{[":
+                if not self._stack:
+                    start = _ARRAY_START_RE if char == "[" else _OBJECT_START_RE
+                    if start.match(buffer, index + 1) is None:
+                        if not buffer[index + 1 :].strip():
+                            pos = index
+                            break
+                        pos = index + 1
+                        continue
+                if char == "{" and self._item_start is None and self._is_item_container():
+                    self._item_start = self._copied = index
+                    self._parts = []
+                    self._repaired = False
+                elif char == "[" and self._stack == ["{"]:
+                    self._items_open = self._last_key == "suggestions"
+                self._stack.append(char)
+            elif self._stack:
+                if self._item_start is not None:
+                    self._drop_trailing_comma(buffer, index)
+                self._stack.pop()
+                if self._stack == ["{"]:
+                    self._items_open = False
+                if char == "}" and self._item_start is not None and self._is_item_container():
+                    self._parts.append(buffer[self._copied : index + 1])
+                    item = self._finish_item()
+                    if item is not None:
+                        completed.append(item)
+                    buffer = buffer[index + 1 :]
+                    pos = 0
+                    continue
+            pos = index + 1
+
+        # Keep only text still needed: the unscanned tail and any open item.
+        if self._key_from is not None:
+            self._key_parts.append(buffer[self._key_from : pos])
+            self._key_from = 0
+        if self._item_start is None:
+            buffer, pos = buffer[pos:], 0
+        else:
+            self._parts.append(buffer[self._copied : pos])
+            buffer, pos = buffer[pos:], 0
+            self._item_start = self._copied = 0
+        self._buffer = buffer
+        self._pos = pos
+        self.items.extend(completed)
+        return completed
+
+    def close(self, response_metadata: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        """Finish parsing and return final records with response metadata.
+
+        A final object cut off by the output limit is closed and kept when it
+        decodes. Returns an empty list when nothing was found or an object
+        could not be decoded, so callers can fall back to looser parsing.
+        """
+
+        if self._item_start is not None:
+            self._parts.append(self._buffer[self._copied :])
+            if self._in_string:
+                self._parts.append('"')
+            else:
+                self._parts = ["".join(self._parts).rstrip().removesuffix(",")]
+            while self._stack and not self._is_item_container():
+                self._parts.append("}" if self._stack.pop() == "{" else "]")
+            self._repaired = True
+            self._finish_item()
+        if self.failed or not self._raw_items:
+            return []
+        records = []
+        for index, (item, repaired) in enumerate(self._raw_items):
+            record = self._normalise(item, repaired, response_metadata or {})
+            if index < len(self.items):
+                # Keep IDs already published from the stream.
+                record["id"] = self.items[index]["id"]
+            records.append(record)
+        return records
+
+    def _is_item_container(self) -> bool:
+        """Return whether the innermost open container holds suggestions."""
+
+        return self._stack == ["["] or (self._stack == ["{", "["] and self._items_open)
+
+    def _copied_tail(self, buffer: str, index: int) -> str:
+        """Return the text before ``index`` with trailing whitespace removed."""
+
+        tail = buffer[self._copied : index].rstrip()
+        if tail:
+            return tail
+        # The preceding token may already have been moved into ``_parts``.
+        return "".join(self._parts).rstrip()
+
+    def _drop_trailing_comma(self, buffer: str, index: int) -> None:
+        segment = buffer[self._copied : index]
+        stripped = segment.rstrip()
+        if stripped:
+            if stripped.endswith(","):
+                self._parts.append(stripped[:-1])
+                self._parts.append(segment[len(stripped) :])
+                self._copied = index
+                self._repaired = True
+            return
+        for position in range(len(self._parts) - 1, -1, -1):
+            part = self._parts[position].rstrip()
+            if part:
+                if part.endswith(","):
+                    self._parts[position] = part[:-1] + self._parts[position][len(part) :]
+                    self._repaired = True
+                return
+
+    def _raw_yaml_block(self, buffer: str, index: int) -> bool | None:
+        """Replace a ``""``-delimited multi-line value with a JSON string.
+
+        Returns None when more input is needed to decide, True when a block
+        was consumed, and False for an ordinary string.
+        """
+
+        if index + 1 >= len(buffer):
+            return None
+        if not buffer.startswith('""', index) or not self._copied_tail(buffer, index).endswith(":"):
+            return False
+        line_end = _LINE_END_RE.match(buffer, index + 2)
+        if line_end is None:
+            return False
+        if not line_end.group(0).endswith("\n"):
+            return None
+        closing = _RAW_BLOCK_END_RE.search(buffer, line_end.end() - 1)
+        if closing is None:
+            return None
+        block = textwrap.dedent(buffer[line_end.end() : closing.start()]).strip()
+        self._parts.append(buffer[self._copied : index])
+        self._parts.append(json.dumps(block))
+        self._copied = closing.end()
+        self._repaired = True
+        return True
+
+    def _finish_item(self) -> dict[str, Any] | None:
+        raw_item = "".join(self._parts)
+        repaired = self._repaired
+        self._item_start = None
+        self._parts = []
+        self._repaired = False
+        try:
+            item = json.loads(raw_item)
+        except json.JSONDecodeError:
+            self.failed += 1
+            return None
+        if not isinstance(item, dict) or not any(item.get(key) for key in _CONTENT_KEYS):
+            # Objects without a title, description, or YAML are not suggestions;
+            # let the buffered parsers look at the whole response instead.
+            self.failed += 1
+            return None
+        self._raw_items.append((item, repaired))
+        return self._normalise(item, repaired, {})
+
+    def _normalise(self, item: dict[str, Any], repaired: bool, metadata: dict[str, Any]) -> dict[str, Any]:
+        inherited = [*self._inherited, PARSE_REPAIR_WARNING] if repaired else self._inherited
+        return _normalise_suggestion(
+            item, **self._context, inherited_warnings=inherited, response_metadata=metadata
+        )
+
+
 def parse_suggestion_response(
     raw_response: str,
     *,
@@ -305,11 +615,32 @@ def parse_suggestion_response(
     entities_processed: list[str],
     inherited_warnings: list[str] | None = None,
     response_metadata: dict[str, Any] | None = None,
+    run_id: str | None = None,
 ) -> list[dict[str, Any]]:
-    """Parse a provider response into stored suggestion dictionaries."""
+    """Parse a provider response into stored suggestion dictionaries.
+
+    Every record carries ``run_id``; pass the same ID to
+    :func:`build_run_record` to keep the generation context.
+    """
 
     inherited = inherited_warnings or []
     metadata = response_metadata or {}
+    run_id = run_id or str(uuid4())
+    # The common envelope shape is handled in one incremental pass; other
+    # shapes and unrecoverable objects fall through to the slower parsers.
+    parser = StreamingSuggestionParser(
+        provider=provider,
+        model=model,
+        created_at=created_at,
+        entities_processed=entities_processed,
+        inherited_warnings=inherited,
+        run_id=run_id,
+    )
+    parser.feed(raw_response)
+    suggestions = parser.close(metadata)
+    if suggestions:
+        return suggestions
+
     structured = _try_json_loads(raw_response)
     if isinstance(structured, dict):
         raw_items = structured.get("suggestions")
@@ -326,6 +657,7 @@ def parse_suggestion_response(
                 model=model,
                 created_at=created_at,
                 entities_processed=entities_processed,
+                run_id=run_id,
                 inherited_warnings=inherited,
                 response_metadata=metadata,
             )
@@ -341,6 +673,7 @@ def parse_suggestion_response(
                 model=model,
                 created_at=created_at,
                 entities_processed=entities_processed,
+                run_id=run_id,
                 inherited_warnings=inherited,
                 response_metadata=metadata,
             )
@@ -359,6 +692,7 @@ def parse_suggestion_response(
                 model=model,
                 created_at=created_at,
                 entities_processed=entities_processed,
+                run_id=run_id,
                 inherited_warnings=loose_warnings,
                 response_metadata=metadata,
             )
@@ -384,6 +718,7 @@ def parse_suggestion_response(
             model=model,
             created_at=created_at,
             entities_processed=entities_processed,
+            run_id=run_id,
             inherited_warnings=inherited,
             response_metadata=metadata,
         )
@@ -0,0 +1,213 @@
+"""Offline prompt token estimation for input budgeting.
+
+Real provider vocabularies are multi-megabyte data files, so the integration
+does not ship them. Instead, text is split with the same pre-tokenization
+rules OpenAI's BPE encodings apply before merging (words with one leading
+symbol, digit groups of up to three, punctuation runs, whitespace runs), and
+each piece is costed by how BPE vocabularies typically merge it. A per-family
+calibration factor accounts for providers whose vocabularies produce more
+tokens for the same text, and Gemini and Mistral vocabularies spend one token
+per digit. This tracks identifiers, YAML, and non-English names far more
+closely than a flat four-characters-per-token ratio.
+
+The profiles are checked in ``tests/test_token_utils.py`` against counts from
+the real tokenizers. Each estimate must be at least the real count and at
+most 25% above it, so an input budget can overshoot but never overflow.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from .cache_utils import LRUCache
+
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+# Python ``re`` lacks \p{L}; ``[^\W\d_]`` matches the same Unicode letters.
+_PRETOKENIZE_RE = re.compile(
+    r"'(?:s|t|re|ve|m|ll|d)"
+    r"|(?:[^\r\n\w]|_)?[^\W\d_]+"
+    r"|\d{1,3}"
+    r"| ?(?:[^\s\w]|_)+[\r\n]*"
+    r"|\s*[\r\n]+"
+    r"|\s+(?!\S)"
+    r"|\s+",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class TokenizerProfile:
+    """Calibration for one provider tokenizer family."""
+
+    name: str
+    ascii_chars_per_token: float = 6.0
+    non_ascii_chars_per_token: float = 2.0
+    cjk_chars_per_token: float = 1.0
+    digits_per_token: int = 3
+    scale: float = 1.0
+
+
+TOKENIZER_PROFILES: dict[str, TokenizerProfile] = {
+    "openai": TokenizerProfile(
+        "openai", ascii_chars_per_token=6.5, non_ascii_chars_per_token=2.5, cjk_chars_per_token=1.2
+    ),
+    "anthropic": TokenizerProfile("anthropic", scale=1.15),
+    "google": TokenizerProfile(
+        "google",
+        ascii_chars_per_token=5.5,
+        non_ascii_chars_per_token=3.0,
+        cjk_chars_per_token=1.3,
+        digits_per_token=1,
+        scale=1.05,
+    ),
+    "llama": TokenizerProfile("llama", ascii_chars_per_token=6.5, scale=1.05),
+    "mistral": TokenizerProfile("mistral", non_ascii_chars_per_token=3.0, digits_per_token=1, scale=1.1),
+    "default": TokenizerProfile("default", scale=1.1),
+}
+
+PROVIDER_TOKENIZER_FAMILIES: dict[str, str] = {
+    "OpenAI": "openai",
+    "OpenAI Azure": "openai",
+    "Anthropic": "anthropic",
+    "Google": "google",
+    "Groq": "llama",
+    "Mistral AI": "mistral",
+    "Perplexity AI": "llama",
+}
+
+
+def tokenizer_family(provider: str | None, model: str | None) -> str:
+    """Return the tokenizer family for a provider and model name."""
+
+    family = PROVIDER_TOKENIZER_FAMILIES.get(str(provider or ""))
+    if family:
+        return family
+    # Routers and local servers expose many vendors; use the model name.
+    name = str(model or "").lower()
+    if "claude" in name:
+        return "anthropic"
+    if "gemini" in name or "gemma" in name:
+        return "google"
+    if any(marker in name for marker in ("mistral", "mixtral", "ministral", "codestral")):
+        return "mistral"
+    if "llama" in name or "qwen" in name:
+        return "llama"
+    if any(marker in name for marker in ("gpt", "o1", "o3", "o4")):
+        return "openai"
+    return "default"
+
+
+class TokenCounter:
+    """Estimate prompt tokens for one tokenizer family with cached counts."""
+
+    def __init__(self, profile: TokenizerProfile, cache_size: int = TOKEN_COUNT_CACHE_SIZE) -> None:
+        self.profile = profile
+        self._cache: LRUCache[int] = LRUCache(cache_size)
+
+    @property
+    def name(self) -> str:
+        return self.profile.name
+
+    def count(self, text: str) -> int:
+        """Return the estimated token count for text, cached by content."""
+
+        if not text:
+            return 0
+        cached = self._cache.get(text)
+        if cached is None:
+            cached = self._estimate(text)
+            self._cache.set(text, cached)
+        return cached
+
+    def stats(self) -> dict:
+        """Return tokenizer and cache counters for diagnostics."""
+
+        return {"tokenizer": self.name, **self._cache.stats()}
+
+    def _estimate(self, text: str) -> int:
+        profile = self.profile
+        total = 0.0
+        for piece in _PRETOKENIZE_RE.findall(text):
+            core = piece.lstrip()
+            if not core:
+                total += 1
+            elif core[0].isdigit():
+                total += math.ceil(len(core) / profile.digits_per_token)
+            elif piece.isascii():
+                letters = sum(1 for char in core if char.isalpha())
+                if letters:
+                    total += max(1, math.ceil(letters / profile.ascii_chars_per_token)) + (len(core) - letters > 1)
+                else:
+                    total += max(1, math.ceil(len(core.strip("\r\n")) / 2)) if core.strip("\r\n") else 1
+            else:
+                cjk = sum(1 for char in core if ord(char) >= 0x2E80)
+                other = sum(1 for char in core if 0x7F < ord(char) < 0x2E80)
+                ascii_chars = len(core) - cjk - other
+                total += max(
+                    1,
+                    math.ceil(
+                        cjk / profile.cjk_chars_per_token
+                        + other / profile.non_ascii_chars_per_token
+                        + ascii_chars / profile.ascii_chars_per_token
+                    ),
+                )
+        return max(1, math.ceil(total * profile.scale))
+
+
+def get_token_counter(provider: str | None, model: str | None) -> TokenCounter:
+    """Return a token counter calibrated for the provider's tokenizer family."""
+
+    return TokenCounter(TOKENIZER_PROFILES[tokenizer_family(provider, model)])
+
+
+def cached_input_tokens(usage: Any) -> int | None:
+    """Return the prompt tokens a provider served from its prefix cache.
+
+    OpenAI-compatible APIs report ``prompt_tokens_details.cached_tokens``
+    (``input_tokens_details`` for the Responses API), Anthropic reports
+    ``cache_read_input_tokens``, Google ``cachedContentTokenCount``, and
+    DeepSeek ``prompt_cache_hit_tokens``. Returns None when not reported.
+    """
+
+    if not isinstance(usage, dict):
+        return None
+    for details_key in ("prompt_tokens_details", "input_tokens_details"):
+        details = usage.get(details_key)
+        if isinstance(details, dict) and isinstance(details.get("cached_tokens"), int):
+            return details["cached_tokens"]
+    for key in ("cache_read_input_tokens", "cachedContentTokenCount", "prompt_cache_hit_tokens"):
+        if isinstance(usage.get(key), int):
+            return usage[key]
+    return None
+
+
+def usage_total_tokens(usage: Any) -> int | None:
+    """Return the input plus output tokens a provider reported, if it did.
+
+    Uses ``total_tokens`` (OpenAI-compatible) or ``totalTokenCount``
+    (Google) when present, and otherwise adds up the input, output, and
+    Anthropic cache token counts.
+    """
+
+    if not isinstance(usage, dict):
+        return None
+    for key in ("total_tokens", "totalTokenCount"):
+        if isinstance(usage.get(key), int):
+            return usage[key]
+    parts = [
+        usage[key]
+        for key in (
+            "prompt_tokens",
+            "completion_tokens",
+            "input_tokens",
+            "output_tokens",
+            "cache_creation_input_tokens",
+            "cache_read_input_tokens",
+        )
+        if isinstance(usage.get(key), int)
+    ]
+    return sum(parts) if parts else None
@@ -0,0 +1,55 @@
+"""WebSocket commands for live suggestion updates."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN
+from .events import SIGNAL_SUGGESTION_EVENT
+from .store import async_get_suggestion_store
+
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_SUBSCRIBE,
+        vol.Optional("entry_id"): str,
+    }
+)
+@websocket_api.async_response
+async def ws_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Stream history changes and generation progress to the caller.
+
+    The result carries the current store revision, matching the
+    ``revision`` returned by the suggestions API, so a client can load the
+    history once and apply the following deltas. Progress events can be
+    limited to one config entry; history events are always sent because
+    the history is shared.
+    """
+
+    store = async_get_suggestion_store(hass)
+    await store.async_list()
+    entry_id = msg.get("entry_id")
+
+    @callback
+    def forward(event: dict[str, Any]) -> None:
+        if entry_id is not None and event.get("entry_id", entry_id) != entry_id:
+            return
+        connection.send_message(websocket_api.event_message(msg["id"], event))
+
+    # Subscribe and reply without awaiting in between so no event is lost.
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(hass, SIGNAL_SUGGESTION_EVENT, forward)
+    connection.send_result(msg["id"], {"revision": store.revision})
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register WebSocket commands."""
+
+    websocket_api.async_register_command(hass, ws_subscribe)
@@ -0,0 +1,224 @@
+"""Micro-benchmark for the loose JSON repair path.
+
+Run with ``python tests/benchmarks/bench_loose_parser.py``. The corpus has two
+parts. ``RECORDED_RESPONSES`` are the malformed Mistral responses kept as
+parser regression fixtures in ``tests/test_suggestions.py``, copied verbatim.
+They are short, so most of the timing comes from the synthetic responses
+built by ``build_corpus``. These repeat the same defects at the size of a
+large run: ``"yaml": ""`` blocks with raw multi-line YAML, unescaped quotes,
+and missing commas between objects. The repository keeps no archive of real
+provider output, and real responses name users' entities, so long responses
+are generated rather than recorded. Timings are reported for each part. The
+previous per-field implementation is kept here as the baseline.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import re
+import sys
+import textwrap
+import timeit
+from pathlib import Path
+
+MODULE_PATH = Path(__file__).resolve().parents[2] / "custom_components" / "ai_automation_suggester" / "suggestions.py"
+spec = importlib.util.spec_from_file_location("suggestions", MODULE_PATH)
+suggestions = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = suggestions
+spec.loader.exec_module(suggestions)
+
+RAW_YAML_ITEM = '''        {{
+            "title": "Laundry drying alert {index}",
+            "description": "Notify when the laundry drying index for zone {index} is favorable.",
+            "yaml": ""
+                alias: "Laundry drying {index}"
+                trigger:
+                    - platform: numeric_state
+                      entity_id: sensor.laundry_drying_index_{index}
+                      above: 70
+                action:
+                    - service: notify.notify
+                      data:
+                          message: "Optimal drying conditions in zone {index}!"
+            "",
+            "entities_used": ["sensor.laundry_drying_index_{index}", "sun.sun"],
+            "automation_ids_used": [],
+            "script_ids_used": ["script.laundry_{index}"],
+            "confidence": 0.6,
+            "warnings": ["Adjust the threshold for zone {index}."]
+        }}'''
+
+UNESCAPED_ITEM = '''        {{
+            "title": "Hallway "night" light {index}",
+            "description": "Dim the hallway light {index} at night.",
+            "yaml": "alias: Hallway night {index}\\ntriggers: []\\nactions: []",
+            "entities_used": ["light.hallway_{index}"],
+            "confidence": 0.8,
+            "warnings": []
+        }}'''
+
+
+RECORDED_RESPONSES = [
+    '''
+{
+    "suggestions": [
+        {
+            "title": "Laundry Drying Alerts Based on Weather",
+            "description": "Notify when the laundry drying index is favorable.",
+            "yaml": ""
+                alias: "Notify when laundry drying conditions are optimal"
+                trigger:
+                    - platform: numeric_state
+                        entity_id: sensor.laundry_drying_index
+                        above: 70
+                action:
+                    - service: notify.notify
+                        data:
+                            message: "Optimal laundry drying conditions now!"
+            "",
+            "entities_used": [
+                "sensor.laundry_drying_index",
+                "sun.sun"
+            ],
+            "automation_ids_used": [],
+            "confidence": 0.6,
+            "warnings": [
+                "Adjust the threshold based on your local climate."
+            ]
+        }
+    ]
+}
+''',
+    '''
+{
+    "suggestions": [
+        {
+            "title": "Weather script automation",
+            "description": "Check weather and run script.",
+            "yaml": ""
+                alias: "Weather check"
+                trigger: []
+                action: []
+            "",
+            "entities_used": ["sensor.temperature"],
+            "automation_ids_used": ["automation.weather_alert"],
+            "script_ids_used": ["script.weather_check"],
+            "confidence": 0.8,
+            "warnings": []
+        }
+    ]
+}
+''',
+]
+
+
+def build_corpus(count: int = 40) -> list[str]:
+    raw_yaml = ",\n".join(RAW_YAML_ITEM.format(index=index) for index in range(count))
+    unescaped = "\n".join(UNESCAPED_ITEM.format(index=index) for index in range(count))
+    mixed = ",\n".join(
+        (RAW_YAML_ITEM if index % 2 else UNESCAPED_ITEM).format(index=index) for index in range(count)
+    )
+    return [f'{{\n    "suggestions": [\n{body}\n    ]\n}}' for body in (raw_yaml, unescaped, mixed)]
+
+
+STRING_FIELDS_AFTER_YAML = suggestions.STRING_FIELDS_AFTER_YAML
+
+
+def baseline_decode_string(value):
+    try:
+        return str(json.loads(f'"{value}"'))
+    except json.JSONDecodeError:
+        return value.replace('\\"', '"').replace("\\n", "\n").strip()
+
+
+def baseline_string_field(segment, field):
+    match = re.search(rf'"{re.escape(field)}"\s*:\s*"((?:\\.|[^"\\])*)"', segment)
+    return baseline_decode_string(match.group(1)).strip() if match else None
+
+
+def baseline_array_field(segment, field):
+    match = re.search(rf'"{re.escape(field)}"\s*:\s*(\[[\s\S]*?\])', segment)
+    if not match:
+        return []
+    try:
+        value = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return []
+    return value if isinstance(value, list) else []
+
+
+def baseline_number_field(segment, field):
+    match = re.search(rf'"{re.escape(field)}"\s*:\s*(-?\d+(?:\.\d+)?)', segment)
+    return float(match.group(1)) if match else None
+
+
+def baseline_yaml_field(segment):
+    malformed = re.search(
+        rf'"yaml"\s*:\s*""\s*\r?\n(?P<yaml>[\s\S]*?)\r?\n\s*""\s*,?\s*(?=\r?\n\s*"(?:{STRING_FIELDS_AFTER_YAML})"|\r?\n\s*\}})',
+        segment,
+    )
+    if malformed:
+        return textwrap.dedent(malformed.group("yaml")).strip() or None
+    valid = re.search(r'"yaml"\s*:\s*"((?:\\.|[^"\\])*)"', segment)
+    if valid:
+        return baseline_decode_string(valid.group(1)).strip() or None
+    return None
+
+
+def baseline_loose_items(raw_response):
+    if '"suggestions"' not in raw_response and '"title"' not in raw_response:
+        return []
+    title_matches = list(re.finditer(r'"title"\s*:', raw_response))
+    items = []
+    for index, match in enumerate(title_matches):
+        start = raw_response.rfind("{", 0, match.start())
+        if start == -1:
+            start = match.start()
+        end = title_matches[index + 1].start() if index + 1 < len(title_matches) else len(raw_response)
+        segment = raw_response[start:end]
+        title = baseline_string_field(segment, "title")
+        description = baseline_string_field(segment, "description")
+        yaml_code = baseline_yaml_field(segment)
+        if not any((title, description, yaml_code)):
+            continue
+        item = {
+            "title": title,
+            "description": description,
+            "yaml": yaml_code,
+            "entities_used": baseline_array_field(segment, "entities_used"),
+            "automation_ids_used": baseline_array_field(segment, "automation_ids_used"),
+            "script_ids_used": baseline_array_field(segment, "script_ids_used"),
+            "warnings": baseline_array_field(segment, "warnings"),
+        }
+        confidence = baseline_number_field(segment, "confidence")
+        if confidence is not None:
+            item["confidence"] = confidence
+        items.append(item)
+    return items
+
+
+def compare(label: str, corpus: list[str], repeat: int, number: int) -> None:
+    for raw in corpus:
+        assert suggestions._try_loose_structured_items(raw) == baseline_loose_items(raw)
+
+    def run(parser):
+        for raw in corpus:
+            parser(raw)
+
+    baseline = min(timeit.repeat(lambda: run(baseline_loose_items), repeat=repeat, number=number))
+    current = min(timeit.repeat(lambda: run(suggestions._try_loose_structured_items), repeat=repeat, number=number))
+    per_run = 1000 / (number * len(corpus))
+    print(f"{label}: {len(corpus)} responses")
+    print(f"  baseline: {baseline * per_run:.3f} ms/response")
+    print(f"  current:  {current * per_run:.3f} ms/response")
+    print(f"  speedup:  {baseline / current:.2f}x")
+
+
+def main(repeat: int = 5, number: int = 50) -> None:
+    compare("recorded", RECORDED_RESPONSES, repeat, number * 20)
+    compare("synthetic, 40 suggestions each", build_corpus(), repeat, number)
+
+
+if __name__ == "__main__":
+    main()
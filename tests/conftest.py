@@ -1,9 +1,11 @@
-"""Lightweight stubs for coordinator unit tests without a Home Assistant runtime."""
+"""Lightweight stubs for unit tests without a Home Assistant runtime."""
 
 from __future__ import annotations
 
 import sys
 import types
+from dataclasses import dataclass
+from enum import Enum
 from pathlib import Path
 
 
@@ -11,12 +13,17 @@ def _install_homeassistant_stubs() -> None:
     homeassistant = types.ModuleType("homeassistant")
     components = types.ModuleType("homeassistant.components")
     persistent_notification = types.ModuleType("homeassistant.components.persistent_notification")
+    config_entries = types.ModuleType("homeassistant.config_entries")
+    const = types.ModuleType("homeassistant.const")
     core = types.ModuleType("homeassistant.core")
     helpers = types.ModuleType("homeassistant.helpers")
     area_registry = types.ModuleType("homeassistant.helpers.area_registry")
     device_registry = types.ModuleType("homeassistant.helpers.device_registry")
     entity_registry = types.ModuleType("homeassistant.helpers.entity_registry")
     aiohttp_client = types.ModuleType("homeassistant.helpers.aiohttp_client")
+    dispatcher = types.ModuleType("homeassistant.helpers.dispatcher")
+    entity_platform = types.ModuleType("homeassistant.helpers.entity_platform")
+    sensor = types.ModuleType("homeassistant.components.sensor")
     storage = types.ModuleType("homeassistant.helpers.storage")
     update_coordinator = types.ModuleType("homeassistant.helpers.update_coordinator")
 
@@ -39,6 +46,9 @@ def _install_homeassistant_stubs() -> None:
         async def async_refresh(self):
             self.data = await self._async_update_data()
 
+        def async_update_listeners(self):
+            pass
+
     class Store:
         def __class_getitem__(cls, item):
             return cls
@@ -52,22 +62,110 @@ def _install_homeassistant_stubs() -> None:
         async def async_save(self, data):
             self.data = data
 
+        def async_delay_save(self, data_func, delay=0):
+            self.data = data_func()
+
+    class CoordinatorEntity:
+        def __class_getitem__(cls, item):
+            return cls
+
+        def __init__(self, coordinator):
+            self.coordinator = coordinator
+            self.hass = None
+            self.written_states = 0
+            self._on_remove = []
+
+        @property
+        def available(self):
+            return True
+
+        async def async_added_to_hass(self):
+            pass
+
+        def async_on_remove(self, func):
+            self._on_remove.append(func)
+
+        def async_write_ha_state(self):
+            self.written_states += 1
+
+        def _handle_coordinator_update(self):
+            self.async_write_ha_state()
+
+    class SensorEntity:
+        _attr_native_value = None
+        _attr_extra_state_attributes = None
+
+        @property
+        def native_value(self):
+            return self._attr_native_value
+
+        @property
+        def extra_state_attributes(self):
+            return self._attr_extra_state_attributes
+
+    @dataclass(frozen=True)
+    class SensorEntityDescription:
+        key: str
+        name: str | None = None
+        icon: str | None = None
+        entity_category: str | None = None
+        native_unit_of_measurement: str | None = None
+        state_class: str | None = None
+        device_class: str | None = None
+
+    class SensorStateClass(str, Enum):
+        MEASUREMENT = "measurement"
+
+    class EntityCategory(str, Enum):
+        DIAGNOSTIC = "diagnostic"
+
+    sensor.SensorEntity = SensorEntity
+    sensor.SensorEntityDescription = SensorEntityDescription
+    sensor.SensorStateClass = SensorStateClass
+    entity_platform.AddEntitiesCallback = object
+    update_coordinator.CoordinatorEntity = CoordinatorEntity
+    device_registry.DeviceInfo = dict
+    config_entries.ConfigEntry = object
+    const.EntityCategory = EntityCategory
+    const.STATE_UNKNOWN = "unknown"
+    const.EVENT_STATE_CHANGED = "state_changed"
     core.HomeAssistant = HomeAssistant
+    core.callback = lambda func: func
     aiohttp_client.async_get_clientsession = lambda hass: hass.session
     update_coordinator.DataUpdateCoordinator = DataUpdateCoordinator
     storage.Store = Store
+
+    signal_targets: dict[str, list] = {}
+
+    def async_dispatcher_connect(hass, signal, target):
+        signal_targets.setdefault(signal, []).append(target)
+        return lambda: signal_targets[signal].remove(target)
+
+    def async_dispatcher_send(hass, signal, *args):
+        for target in list(signal_targets.get(signal, [])):
+            target(*args)
+
+    dispatcher.async_dispatcher_connect = async_dispatcher_connect
+    dispatcher.async_dispatcher_send = async_dispatcher_send
     area_registry.AreaRegistry = object
     area_registry.async_get = lambda hass: None
+    area_registry.EVENT_AREA_REGISTRY_UPDATED = "area_registry_updated"
     device_registry.DeviceRegistry = object
     device_registry.async_get = lambda hass: None
+    device_registry.EVENT_DEVICE_REGISTRY_UPDATED = "device_registry_updated"
     entity_registry.EntityRegistry = object
     entity_registry.async_get = lambda hass: None
+    entity_registry.EVENT_ENTITY_REGISTRY_UPDATED = "entity_registry_updated"
 
     components.persistent_notification = persistent_notification
+    components.sensor = sensor
     helpers.area_registry = area_registry
     helpers.device_registry = device_registry
+    helpers.entity_platform = entity_platform
     helpers.entity_registry = entity_registry
     homeassistant.components = components
+    homeassistant.config_entries = config_entries
+    homeassistant.const = const
     homeassistant.core = core
     homeassistant.helpers = helpers
 
@@ -75,12 +173,17 @@ def _install_homeassistant_stubs() -> None:
         "homeassistant": homeassistant,
         "homeassistant.components": components,
         "homeassistant.components.persistent_notification": persistent_notification,
+        "homeassistant.components.sensor": sensor,
+        "homeassistant.config_entries": config_entries,
+        "homeassistant.const": const,
         "homeassistant.core": core,
         "homeassistant.helpers": helpers,
         "homeassistant.helpers.area_registry": area_registry,
         "homeassistant.helpers.device_registry": device_registry,
+        "homeassistant.helpers.entity_platform": entity_platform,
         "homeassistant.helpers.entity_registry": entity_registry,
         "homeassistant.helpers.aiohttp_client": aiohttp_client,
+        "homeassistant.helpers.dispatcher": dispatcher,
         "homeassistant.helpers.storage": storage,
         "homeassistant.helpers.update_coordinator": update_coordinator,
     }
@@ -0,0 +1,186 @@
+"""Batch API client and job store tests against a local stand-in server."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.ai_automation_suggester import batch
+
+
+class BatchServer:
+    """Minimal OpenAI files/batches and Anthropic message batches endpoints."""
+
+    def __init__(self):
+        self.files: dict[str, str] = {}
+        self.batches: dict[str, dict] = {}
+        self.headers: list[dict] = []
+        self.app = web.Application()
+        self.app.router.add_post("/v1/files", self.upload)
+        self.app.router.add_get("/v1/files/{file_id}/content", self.download)
+        self.app.router.add_post("/v1/batches", self.create_openai)
+        self.app.router.add_get("/v1/batches/{batch_id}", self.get_openai)
+        self.app.router.add_post("/v1/messages/batches", self.create_anthropic)
+        self.app.router.add_get("/v1/messages/batches/{batch_id}", self.get_anthropic)
+        self.app.router.add_get("/v1/messages/batches/{batch_id}/results", self.anthropic_results)
+
+    async def upload(self, request):
+        self.headers.append(dict(request.headers))
+        form = await request.post()
+        assert form["purpose"] == "batch"
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = form["file"].file.read().decode()
+        return web.json_response({"id": file_id})
+
+    async def download(self, request):
+        return web.Response(text=self.files[request.match_info["file_id"]])
+
+    async def create_openai(self, request):
+        body = await request.json()
+        batch_id = f"batch_{len(self.batches)}"
+        lines = [json.loads(line) for line in self.files[body["input_file_id"]].splitlines()]
+        self.batches[batch_id] = {"id": batch_id, "status": "in_progress", "endpoint": body["endpoint"], "lines": lines}
+        return web.json_response({"id": batch_id})
+
+    async def get_openai(self, request):
+        job = self.batches[request.match_info["batch_id"]]
+        return web.json_response(
+            {
+                "id": job["id"],
+                "status": job["status"],
+                "output_file_id": job.get("output_file_id"),
+                "request_counts": {"total": len(job["lines"])},
+            }
+        )
+
+    def finish_openai(self, batch_id, failed=()):
+        job = self.batches[batch_id]
+        output = []
+        for line in job["lines"]:
+            if line["custom_id"] in failed:
+                response = {"status_code": 400, "body": {"error": {"message": "bad request"}}}
+            else:
+                response = {"status_code": 200, "body": {"output_text": f"answer to {line['custom_id']}"}}
+            output.append(json.dumps({"custom_id": line["custom_id"], "response": response}))
+        job["output_file_id"] = f"file-{len(self.files)}"
+        self.files[job["output_file_id"]] = "\n".join(output)
+        job["status"] = "completed"
+
+    async def create_anthropic(self, request):
+        self.headers.append(dict(request.headers))
+        body = await request.json()
+        batch_id = f"msgbatch_{len(self.batches)}"
+        self.batches[batch_id] = {"id": batch_id, "status": "in_progress", "requests": body["requests"]}
+        return web.json_response({"id": batch_id, "processing_status": "in_progress"})
+
+    async def get_anthropic(self, request):
+        job = self.batches[request.match_info["batch_id"]]
+        ended = job["status"] == "ended"
+        return web.json_response(
+            {
+                "id": job["id"],
+                "processing_status": job["status"],
+                "results_url": str(request.url.with_path(request.path + "/results")) if ended else None,
+            }
+        )
+
+    async def anthropic_results(self, request):
+        job = self.batches[request.match_info["batch_id"]]
+        lines = [
+            {
+                "custom_id": item["custom_id"],
+                "result": {"type": "succeeded", "message": {"content": [{"type": "text", "text": item["custom_id"]}]}}
+                if index == 0
+                else {"type": "errored", "error": {"type": "overloaded_error"}},
+            }
+            for index, item in enumerate(job["requests"])
+        ]
+        return web.Response(text="\n".join(json.dumps(line) for line in lines))
+
+
+async def _with_server(test):
+    server = BatchServer()
+    async with TestServer(server.app) as test_server, aiohttp.ClientSession() as session:
+        await test(server, session, str(test_server.make_url("/v1")))
+
+
+def test_openai_batch_round_trip_maps_results_by_custom_id():
+    async def run(server, session, base_url):
+        client = batch.OpenAIBatchClient(session, "sk-test", base_url)
+        requests = [("run-0", {"model": "gpt-5.4-mini", "input": "a"}), ("run-1", {"model": "gpt-5.4-mini"})]
+
+        batch_id = await client.async_submit("/v1/responses", requests)
+        uploaded = [json.loads(line) for line in server.files["file-0"].splitlines()]
+        pending = await client.async_status(batch_id)
+        server.finish_openai(batch_id, failed={"run-1"})
+        finished = await client.async_status(batch_id)
+        results = await client.async_results(finished)
+
+        assert server.headers[0]["Authorization"] == "Bearer sk-test"
+        assert [line["url"] for line in uploaded] == ["/v1/responses", "/v1/responses"]
+        assert uploaded[0]["body"] == requests[0][1]
+        assert server.batches[batch_id]["endpoint"] == "/v1/responses"
+        assert (pending.done, pending.results) == (False, ())
+        assert finished.done and finished.counts == {"total": 2}
+        assert results["run-0"].body == {"output_text": "answer to run-0"}
+        assert results["run-1"].body is None and "bad request" in results["run-1"].error
+
+    asyncio.run(_with_server(run))
+
+
+def test_anthropic_batch_round_trip_reports_errored_requests():
+    async def run(server, session, base_url):
+        client = batch.AnthropicBatchClient(session, "sk-ant", base_url)
+
+        batch_id = await client.async_submit("/v1/messages", [("run-0", {"max_tokens": 10}), ("run-1", {})])
+        pending = await client.async_status(batch_id)
+        server.batches[batch_id]["status"] = "ended"
+        finished = await client.async_status(batch_id)
+        results = await client.async_results(finished)
+
+        assert server.headers[0]["x-api-key"] == "sk-ant"
+        assert server.batches[batch_id]["requests"][0] == {"custom_id": "run-0", "params": {"max_tokens": 10}}
+        assert not pending.done
+        assert finished.done
+        assert results["run-0"].body == {"content": [{"type": "text", "text": "run-0"}]}
+        assert "overloaded_error" in results["run-1"].error
+
+    asyncio.run(_with_server(run))
+
+
+def test_batch_api_errors_raise_batch_error():
+    async def run(server, session, base_url):
+        client = batch.OpenAIBatchClient(session, "sk-test", base_url)
+        try:
+            await client.async_status("batch_missing")
+        except batch.BatchError as err:
+            assert "500" in str(err)
+        else:
+            raise AssertionError("expected BatchError")
+
+    asyncio.run(_with_server(run))
+
+
+def test_job_store_keeps_jobs_across_restarts():
+    hass = type("Hass", (), {"data": {}})()
+    store = batch.async_get_batch_job_store(hass)
+
+    async def run():
+        await store.async_add({"id": "run", "entry_id": "a", "batch_id": "batch_0", "status": "submitted"})
+        await store.async_add({"id": "other", "entry_id": "b", "batch_id": "batch_1", "status": "submitted"})
+        await store.async_update("run", status="in_progress")
+        await store.async_remove("other")
+
+        restarted = batch.BatchJobStore(hass)
+        restarted._store.data = store._store.data
+        return await restarted.async_list("a"), await restarted.async_list("b")
+
+    jobs, others = asyncio.run(run())
+
+    assert batch.async_get_batch_job_store(hass) is store
+    assert [(job["id"], job["status"]) for job in jobs] == [("run", "in_progress")]
+    assert others == []
@@ -0,0 +1,17 @@
+"""Tests for cache helpers."""
+
+from __future__ import annotations
+
+from custom_components.ai_automation_suggester.cache_utils import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used_and_counts_lookups():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 1, "hit_rate": 0.5}
@@ -0,0 +1,115 @@
+"""Tests for the provider circuit breaker and rate-limit header parsing."""
+
+from __future__ import annotations
+
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.ai_automation_suggester import circuit_breaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock, **kwargs):
+    return circuit_breaker.CircuitBreaker("OpenAI", clock=clock, wall_clock=clock, jitter=lambda: 1.0, **kwargs)
+
+
+def test_retry_after_headers_are_parsed():
+    retry_after = circuit_breaker.retry_after_seconds
+
+    assert retry_after({"Retry-After": "7"}) == 7
+    assert retry_after({"retry-after-ms": "1500"}) == 1.5
+    assert retry_after({"Retry-After": formatdate(1060, usegmt=True)}, now=1000) == 60
+    assert retry_after({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m30s"}) == 90
+    assert retry_after({"x-ratelimit-remaining-tokens": "5000", "x-ratelimit-reset-tokens": "6m0s"}) is None
+    assert (
+        retry_after(
+            {
+                "anthropic-ratelimit-requests-remaining": "0",
+                "anthropic-ratelimit-requests-reset": "1970-01-01T00:17:00Z",
+            },
+            now=1000,
+        )
+        == 20
+    )
+    assert retry_after({"Retry-After": "soon"}) is None
+    assert retry_after(None) is None
+
+
+def test_consecutive_failures_open_the_circuit_and_short_circuit_requests():
+    clock = Clock()
+    breaker = make_breaker(clock, failure_threshold=2, base_delay=10)
+
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.CIRCUIT_CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == circuit_breaker.CIRCUIT_OPEN
+    with pytest.raises(circuit_breaker.CircuitOpenError, match="resume in 10 seconds"):
+        breaker.before_request()
+    assert breaker.snapshot()["consecutive_failures"] == 2
+
+
+def test_half_open_allows_one_probe_and_backs_off_on_failure():
+    clock = Clock()
+    breaker = make_breaker(clock, failure_threshold=1, base_delay=10)
+    breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.state == circuit_breaker.CIRCUIT_HALF_OPEN
+    assert breaker.before_request() is True
+    with pytest.raises(circuit_breaker.CircuitOpenError, match="recovering"):
+        breaker.before_request()
+
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.state == circuit_breaker.CIRCUIT_OPEN
+    clock.now += 10
+    assert breaker.before_request() is True
+    breaker.record_success()
+
+    assert breaker.state == circuit_breaker.CIRCUIT_CLOSED
+    assert breaker.before_request() is False
+
+
+def test_rate_limit_opens_at_once_for_the_server_requested_wait():
+    clock = Clock()
+    breaker = make_breaker(clock, failure_threshold=5)
+
+    breaker.record_failure(42, rate_limited=True)
+
+    assert breaker.state == circuit_breaker.CIRCUIT_OPEN
+    clock.now += 41
+    assert breaker.state == circuit_breaker.CIRCUIT_OPEN
+    clock.now += 1
+    assert breaker.state == circuit_breaker.CIRCUIT_HALF_OPEN
+
+
+def test_cancelled_probe_can_be_released():
+    clock = Clock()
+    breaker = make_breaker(clock, failure_threshold=1, base_delay=1)
+    breaker.record_failure()
+    clock.now += 1
+
+    assert breaker.before_request() is True
+    breaker.release_probe()
+    assert breaker.before_request() is True
+
+
+def test_entries_with_the_same_credential_share_a_breaker():
+    hass = SimpleNamespace(data={})
+
+    first = circuit_breaker.async_get_circuit_breaker(hass, "OpenAI", "sk-one")
+
+    assert circuit_breaker.async_get_circuit_breaker(hass, "OpenAI", "sk-one") is first
+    assert circuit_breaker.async_get_circuit_breaker(hass, "OpenAI", "sk-two") is not first
+    assert circuit_breaker.async_get_circuit_breaker(hass, "Groq", "sk-one") is not first
+    assert "sk-one" not in repr(hass.data)
@@ -0,0 +1,68 @@
+"""Tests for cached automations.yaml and scripts.yaml rendering."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+from custom_components.ai_automation_suggester import config_yaml
+from custom_components.ai_automation_suggester.config_yaml import KIND_AUTOMATIONS, KIND_SCRIPTS, YamlBlockCache
+
+
+class ExecutorHass:
+    def __init__(self):
+        self.executor_jobs = 0
+
+    async def async_add_executor_job(self, target, *args):
+        self.executor_jobs += 1
+        return await asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+
+def test_automation_blocks_are_rendered_in_executor_and_reused(tmp_path, monkeypatch):
+    path = tmp_path / "automations.yaml"
+    path.write_text("- alias: One\n  id: '1'\n- alias: Two\n  id: '2'\n- not a dict\n", encoding="utf-8")
+    hass = ExecutorHass()
+    cache = YamlBlockCache()
+    parses = []
+    real_parse = config_yaml._parse_items
+    monkeypatch.setattr(
+        config_yaml, "_parse_items", lambda kind, content: parses.append(kind) or real_parse(kind, content)
+    )
+
+    first = asyncio.run(cache.async_blocks(hass, KIND_AUTOMATIONS, path, 10))
+    second = asyncio.run(cache.async_blocks(hass, KIND_AUTOMATIONS, path, 1))
+
+    assert len(first) == 2
+    assert first[0].startswith("Automation YAML:\n```yaml\n- alias: One\n")
+    assert second == first[:1]
+    assert parses == [KIND_AUTOMATIONS]
+    assert hass.executor_jobs == 2
+
+
+def test_edited_file_is_parsed_again(tmp_path):
+    path = tmp_path / "scripts.yaml"
+    path.write_text("morning:\n  alias: Morning\n", encoding="utf-8")
+    hass = ExecutorHass()
+    cache = YamlBlockCache()
+
+    before = asyncio.run(cache.async_blocks(hass, KIND_SCRIPTS, path, 5))
+    path.write_text("evening:\n  alias: Evening lights\n", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    after = asyncio.run(cache.async_blocks(hass, KIND_SCRIPTS, path, 5))
+
+    assert "morning:" in before[0]
+    assert after == ["Script YAML:\n```yaml\nevening:\n  alias: Evening lights\n```\n---\n"]
+
+
+def test_missing_or_invalid_files_return_no_blocks(tmp_path):
+    hass = ExecutorHass()
+    cache = YamlBlockCache()
+    invalid = tmp_path / "automations.yaml"
+    invalid.write_text("- alias: [unterminated\n", encoding="utf-8")
+    wrong_shape = tmp_path / "scripts.yaml"
+    wrong_shape.write_text("- just a list\n", encoding="utf-8")
+
+    assert asyncio.run(cache.async_blocks(hass, KIND_AUTOMATIONS, tmp_path / "missing.yaml", 5)) == []
+    assert asyncio.run(cache.async_blocks(hass, KIND_AUTOMATIONS, invalid, 5)) == []
+    assert asyncio.run(cache.async_blocks(hass, KIND_SCRIPTS, wrong_shape, 5)) == []
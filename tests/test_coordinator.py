@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from types import SimpleNamespace
 
 import pytest
+from homeassistant.helpers import dispatcher
 
+from custom_components.ai_automation_suggester import batch as batch_module
 from custom_components.ai_automation_suggester import coordinator as coordinator_module
+from custom_components.ai_automation_suggester import events as events_module
 
 
 class FakeSession:
@@ -54,10 +57,18 @@ class FakeAreaRegistry(FakeRegistry):
 class FakeEntry:
     data: dict
     options: dict
+    entry_id: str = "entry"
+    title: str = "AI Automation Suggester"
+    unload_callbacks: list = field(default_factory=list)
 
     def async_on_unload(self, callback):
+        self.unload_callbacks.append(callback)
         return callback
 
+    def unload(self):
+        while self.unload_callbacks:
+            self.unload_callbacks.pop()()
+
 
 class FakeHass:
     def __init__(self, states):
@@ -67,6 +78,9 @@ class FakeHass:
         self.session = FakeSession()
         self.data = {}
 
+    def async_create_background_task(self, target, name, eager_start=True):
+        return asyncio.get_running_loop().create_task(target, name=name)
+
 
 def make_state(entity_id: str, state: str, attributes=None):
     timestamp = datetime(2026, 7, 11, 12, 0, tzinfo=UTC)
@@ -157,6 +171,105 @@ def test_prompt_records_only_entities_that_fit_budget(monkeypatch):
     assert any("input budget included" in warning for warning in result.warnings)
 
 
+def test_prompt_reports_token_count_and_respects_context_window(monkeypatch):
+    states = {"sensor.one": make_state("sensor.one", "1")}
+    coordinator, _, _ = make_coordinator(
+        monkeypatch,
+        states=states,
+        options={"openai_model": "gpt-4o-mini", "max_input_tokens": 200000, "max_output_tokens": 8000},
+    )
+
+    result = asyncio.run(coordinator._build_prompt(coordinator._collect_entities()))
+
+    assert result.context_window == 128000
+    assert result.input_budget == 120000
+    assert 0 < result.token_count < result.input_budget
+    assert any("context window" in warning for warning in result.warnings)
+
+
+def test_unchanged_entities_reuse_rendered_prompt_blocks(monkeypatch):
+    states = {
+        "sensor.one": make_state("sensor.one", "1", {"friendly_name": "One", "detail": "x" * 600}),
+        "sensor.two": make_state("sensor.two", "2"),
+    }
+    coordinator, _, _ = make_coordinator(monkeypatch, states=states, options={"max_input_tokens": 4000})
+
+    first = asyncio.run(coordinator._build_prompt(coordinator._collect_entities()))
+    states["sensor.two"] = make_state("sensor.two", "3")
+    states["sensor.two"].last_updated = datetime(2026, 7, 11, 12, 5, tzinfo=UTC)
+    second = asyncio.run(coordinator._build_prompt(coordinator._collect_entities()))
+
+    stats = coordinator.prompt_block_cache.stats()
+    assert stats["misses"] == 3
+    assert stats["hits"] == 1
+    assert "State: 3" in second.prompt
+    assert any("Long attribute text" in warning for warning in first.warnings)
+    assert any("Long attribute text" in warning for warning in second.warnings)
+
+
+def test_stable_layout_keeps_static_context_ahead_of_sorted_entities(monkeypatch):
+    states = {
+        "sensor.b": make_state("sensor.b", "1"),
+        "sensor.a": make_state("sensor.a", "2"),
+        "automation.morning": make_state("automation.morning", "on"),
+    }
+    coordinator, _, _ = make_coordinator(
+        monkeypatch, states=states, options={"stable_prompt_layout": True, "max_input_tokens": 4000}
+    )
+    monkeypatch.setattr(coordinator_module.random, "sample", lambda values, count: list(reversed(values))[:count])
+
+    first = asyncio.run(coordinator._build_prompt(coordinator._collect_entities()))
+    states["sensor.a"] = make_state("sensor.a", "3")
+    states["sensor.a"].last_updated = datetime(2026, 7, 11, 12, 5, tzinfo=UTC)
+    second = asyncio.run(coordinator._build_prompt(coordinator._collect_entities()))
+
+    assert list(first.entity_ids) == sorted(first.entity_ids)
+    assert first.prompt.index("Existing Automations Overview") < first.prompt.index("Entities in your Home Assistant")
+    assert first.prompt.startswith(first.static_prefix)
+    assert "Existing Automations Overview" in first.static_prefix
+    assert second.static_prefix == first.static_prefix
+    assert second.prompt != first.prompt
+
+    coordinator._prompt_static_prefix = first.static_prefix
+    content = coordinator._anthropic_content(first.prompt)
+    assert [block.get("cache_control") for block in content] == [{"type": "ephemeral"}, None]
+    assert "".join(block["text"] for block in content) == first.prompt
+
+
+def test_stable_layout_prefix_does_not_depend_on_the_sampled_entities(monkeypatch):
+    states = {f"sensor.s{index:02d}": make_state(f"sensor.s{index:02d}", str(index)) for index in range(40)}
+    states.update({f"automation.a{index}": make_state(f"automation.a{index}", "on") for index in range(5)})
+    coordinator, _, _ = make_coordinator(
+        monkeypatch, states=states, options={"stable_prompt_layout": True, "max_input_tokens": 1200}
+    )
+    coordinator.entity_limit = 10
+    entities = coordinator._collect_entities()
+    sensors = {entity_id: meta for entity_id, meta in entities.items() if entity_id.startswith("sensor.")}
+
+    # The sample is still random, so later entities get their turn; only its order is fixed.
+    monkeypatch.setattr(coordinator_module.random, "sample", lambda population, k: population[::-1][:k])
+    full = asyncio.run(coordinator._build_prompt(sensors))
+    few = asyncio.run(coordinator._build_prompt(dict(list(sensors.items())[:2])))
+
+    assert list(full.entity_ids) == sorted(full.entity_ids)
+    assert set(full.entity_ids) <= set(sorted(sensors)[-10:])
+    assert all(f"Entity: automation.a{index}" in full.static_prefix for index in range(5))
+    assert few.static_prefix == full.static_prefix
+    assert len(few.entity_ids) == 2 and len(full.entity_ids) > 2
+
+
+def test_default_layout_sends_no_cache_breakpoints(monkeypatch):
+    states = {"sensor.a": make_state("sensor.a", "2")}
+    coordinator, _, _ = make_coordinator(monkeypatch, states=states, options={"max_input_tokens": 4000})
+
+    result = asyncio.run(coordinator._build_prompt(coordinator._collect_entities()))
+    coordinator._prompt_static_prefix = result.static_prefix
+
+    assert result.prompt.index("Entities in your Home Assistant") < result.prompt.index("Existing Automations")
+    assert coordinator._anthropic_content(result.prompt) == [{"type": "text", "text": result.prompt}]
+    assert coordinator._openai_prompt_cache_params() == {}
+
+
 def test_only_sent_entities_are_marked_processed(monkeypatch):
     states = {
         "sensor.one": make_state("sensor.one", "1"),
@@ -239,3 +352,922 @@ def test_generate_propagates_provider_failure(monkeypatch):
 
     with pytest.raises(ValueError, match="rate limited"):
         asyncio.run(coordinator.async_generate_suggestions(all_entities=True))
+
+
+class StreamingSession:
+    def __init__(self, lines, *, hang=False):
+        self.lines = lines
+        self.hang = hang
+        self.bodies = []
+        self.aborted = False
+
+    def post(self, endpoint, *, headers=None, json=None, timeout=None):
+        self.bodies.append(json)
+        lines = self.lines
+        session = self
+
+        class Content:
+            async def _iterate(self):
+                for line in lines:
+                    yield line.encode()
+                if session.hang:
+                    await asyncio.Event().wait()
+
+            def __aiter__(self):
+                return self._iterate()
+
+        class Response:
+            status = 200
+            content = Content()
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, exc_type, *exc_info):
+                session.aborted = exc_type is asyncio.CancelledError
+                return False
+
+        return Response()
+
+
+def test_streaming_publishes_first_suggestion_before_response_completes(monkeypatch):
+    import json
+
+    states = {"light.kitchen": make_state("light.kitchen", "on")}
+    coordinator, _, _ = make_coordinator(
+        monkeypatch, states=states, options={"openai_api_key": "key", "openai_model": "gpt-4o-mini", "stream_responses": True},
+    )
+    envelope = json.dumps(
+        {
+            "suggestions": [
+                {"title": "First", "yaml": "alias: first\n", "entities_used": ["light.kitchen"]},
+                {"title": "Second", "yaml": "alias: second\n", "entities_used": ["light.kitchen"]},
+            ]
+        }
+    )
+    chunks = [envelope[index : index + 20] for index in range(0, len(envelope), 20)]
+    lines = [
+        line
+        for chunk in chunks
+        for line in (f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]})}\n", "\n")
+    ]
+    lines += ["data: [DONE]\n", "\n"]
+    coordinator.session = StreamingSession(lines)
+    notifications = []
+    monkeypatch.setattr(
+        coordinator_module,
+        "persistent_notification",
+        SimpleNamespace(async_create=lambda hass, **kwargs: notifications.append(kwargs)),
+    )
+    published = []
+    coordinator.async_update_listeners = lambda: published.append(
+        (coordinator.data["suggestion"]["title"], coordinator.data["suggestion_count"])
+    )
+    first_ids = []
+    original_feed = coordinator_module.StreamingSuggestionParser.feed
+
+    def feed(parser, chunk):
+        completed = original_feed(parser, chunk)
+        first_ids.extend(item["id"] for item in completed[:1] if not first_ids)
+        return completed
+
+    monkeypatch.setattr(coordinator_module.StreamingSuggestionParser, "feed", feed)
+    coordinator.scan_all = True
+    events = []
+    unsubscribe = dispatcher.async_dispatcher_connect(None, events_module.SIGNAL_SUGGESTION_EVENT, events.append)
+
+    try:
+        data = asyncio.run(coordinator._async_update_data())
+    finally:
+        unsubscribe()
+
+    assert coordinator.session.bodies[0]["stream"] is True
+    assert coordinator.session.bodies[0]["stream_options"] == {"include_usage": True}
+    assert published == [("First", 1), ("First", 2)]
+    assert len({notification["notification_id"] for notification in notifications}) == 1
+    assert data["request_succeeded"] is True
+    assert [item["title"] for item in data["suggestion_history"]] == ["First", "Second"]
+    assert data["suggestion"]["id"] == first_ids[0]
+    assert [event["type"] for event in events] == [
+        "generation_started",
+        "prompt_built",
+        "first_token",
+        "suggestion_parsed",
+        "suggestion_parsed",
+        "suggestions_added",
+        "generation_finished",
+    ]
+    assert len({event["run_id"] for event in events if "run_id" in event}) == 1
+    assert events[3]["suggestion"]["id"] == first_ids[0]
+    assert events[-1]["suggestion_ids"] == [item["id"] for item in data["suggestion_history"]]
+    assert [item["title"] for item in events[5]["suggestions"]] == ["First", "Second"]
+
+
+def test_cancel_generation_aborts_the_provider_request(monkeypatch):
+    states = {"light.kitchen": make_state("light.kitchen", "on")}
+    coordinator, _, _ = make_coordinator(
+        monkeypatch, states=states, options={"openai_api_key": "key", "openai_model": "gpt-4o-mini"}
+    )
+    coordinator.scan_all = True
+    aborted = []
+    started = []
+
+    async def slow_provider(prompt):
+        started.append(True)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            aborted.append(True)
+            raise
+
+    coordinator._openai = slow_provider
+
+    async def run():
+        update = asyncio.create_task(coordinator._async_update_data())
+        while not started:
+            await asyncio.sleep(0)
+        assert await coordinator.async_cancel_generation()
+        data = await update
+        return data, await coordinator.async_cancel_generation()
+
+    data, cancelled_again = asyncio.run(run())
+
+    assert aborted == [True]
+    assert cancelled_again is False
+    assert data["request_succeeded"] is False
+    assert data["last_error"] == "Suggestion generation was cancelled."
+    assert data["response_metadata"]["cancelled"] is True
+    assert data["response_metadata"]["cancel_reason"] == "cancelled"
+
+
+def test_deadline_keeps_suggestions_streamed_before_it(monkeypatch):
+    import json
+
+    states = {"light.kitchen": make_state("light.kitchen", "on")}
+    coordinator, _, _ = make_coordinator(
+        monkeypatch,
+        states=states,
+        options={
+            "openai_api_key": "key",
+            "openai_model": "gpt-4o-mini",
+            "stream_responses": True,
+            "generation_deadline": 0.05,
+        },
+    )
+    partial = '{"suggestions": [{"title": "First", "yaml": "alias: first\\n"}, {"title": "Sec'
+    lines = [f"data: {json.dumps({'choices': [{'delta': {'content': partial}}]})}\n", "\n"]
+    coordinator.session = StreamingSession(lines, hang=True)
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+    coordinator.async_update_listeners = lambda: None
+    coordinator.scan_all = True
+
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert coordinator.session.aborted
+    assert data["request_succeeded"] is True
+    assert data["response_metadata"]["cancel_reason"] == "deadline"
+    assert [item["title"] for item in data["suggestion_history"]][:1] == ["First"]
+    assert any("cancelled" in warning for warning in data["suggestion_history"][0]["warnings"])
+    assert coordinator.previous_entities == {}
+
+
+def test_response_cache_reuses_deterministic_responses_only(monkeypatch):
+    import json
+
+    states = {"light.kitchen": make_state("light.kitchen", "on")}
+    response = json.dumps({"suggestions": [{"title": "Cached", "yaml": "alias: cached\n"}]})
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+
+    def run_twice(temperature):
+        coordinator, _, _ = make_coordinator(
+            monkeypatch,
+            states=states,
+            options={
+                "openai_api_key": "key",
+                "openai_model": "gpt-4o-mini",
+                "openai_temperature": temperature,
+                "response_cache": True,
+            },
+        )
+        coordinator.async_update_listeners = lambda: None
+        calls = []
+
+        async def provider(prompt):
+            calls.append(prompt)
+            coordinator._last_response_metadata = {"model": "gpt-4o-mini"}
+            return response
+
+        coordinator._openai = provider
+
+        async def run():
+            results = []
+            for _ in range(2):
+                coordinator.scan_all = True
+                results.append(await coordinator._async_update_data())
+            return results
+
+        return coordinator, calls, asyncio.run(run())
+
+    coordinator, calls, (_, second) = run_twice(0.0)
+    assert len(calls) == 1
+    assert second["request_succeeded"] is True
+    assert second["response_metadata"]["cache_hit"] is True
+    assert coordinator.response_cache.stats()["hits"] == 1
+
+    coordinator, calls, _ = run_twice(0.7)
+    assert len(calls) == 2
+    assert coordinator.response_cache.stats()["bypassed"] == 2
+
+
+def test_response_cache_key_tracks_output_limit_and_skips_truncated_replies(monkeypatch):
+    import json
+
+    states = {"light.kitchen": make_state("light.kitchen", "on")}
+    response = json.dumps({"suggestions": [{"title": "Cut", "yaml": "alias: cut\n"}]})
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+    coordinator, _, _ = make_coordinator(
+        monkeypatch,
+        states=states,
+        options={
+            "openai_api_key": "key",
+            "openai_model": "gpt-4o-mini",
+            "openai_temperature": 0.0,
+            "response_cache": True,
+            "max_output_tokens": 500,
+        },
+    )
+    coordinator.async_update_listeners = lambda: None
+    calls = []
+
+    async def provider(prompt):
+        calls.append(prompt)
+        coordinator._last_response_metadata = {"finish_reason": "length"}
+        return response
+
+    coordinator._openai = provider
+    small = coordinator._response_cache_key("OpenAI", "gpt-4o-mini", "prompt")
+    coordinator.entry.options["max_output_tokens"] = 4000
+
+    assert coordinator._response_cache_key("OpenAI", "gpt-4o-mini", "prompt") != small
+
+    async def run():
+        for _ in range(2):
+            coordinator.scan_all = True
+            await coordinator._async_update_data()
+
+    asyncio.run(run())
+
+    assert len(calls) == 2
+    assert coordinator.response_cache.stats()["hits"] == 0
+
+
+def test_sharded_generation_covers_all_entities_in_one_stored_run(monkeypatch):
+    import json
+
+    states = {f"light.l{index}": make_state(f"light.l{index}", "on") for index in range(5)}
+    coordinator, _, _ = make_coordinator(
+        monkeypatch,
+        states=states,
+        options={
+            "openai_api_key": "key",
+            "sharded_generation": True,
+            "shard_grouping": "size",
+            "shard_concurrency": 2,
+            "max_input_tokens": 4000,
+        },
+    )
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+    coordinator.async_update_listeners = lambda: None
+    coordinator.scan_all = True
+    coordinator.entity_limit = 2
+    active = []
+    peak = []
+    prompts = []
+
+    async def provider(prompt):
+        active.append(prompt)
+        peak.append(len(active))
+        prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        active.remove(prompt)
+        shard = sorted(entity_id for entity_id in states if f"Entity: {entity_id}\n" in prompt)
+        coordinator._last_response_metadata = {"usage": {"prompt_tokens_details": {"cached_tokens": 100}}}
+        suggestions = [
+            {"title": f"Use {shard[0]}", "yaml": f"alias: {shard[0]}\n"},
+            {"title": "Shared idea", "yaml": "alias: shared\n"},
+        ]
+        return json.dumps({"suggestions": suggestions})
+
+    coordinator._openai = provider
+
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert len(prompts) == 3
+    assert max(peak) == 2
+    assert sum("Existing Automations Overview" in prompt for prompt in prompts) == 1
+    assert data["request_succeeded"] is True
+    titles = [suggestion["title"] for suggestion in data["suggestion_history"]]
+    assert titles[0] == "Shared idea"
+    assert sorted(titles[1:]) == ["Use light.l0", "Use light.l2", "Use light.l4"]
+    assert len({suggestion["run_id"] for suggestion in data["suggestion_history"]}) == 1
+    assert set(coordinator.previous_entities) == set(states)
+    assert [shard["status"] for shard in data["response_metadata"]["shards"]] == ["completed"] * 3
+    assert data["response_metadata"]["cached_input_tokens"] == 300
+
+
+def test_default_deadline_covers_every_wave_of_a_sharded_run(monkeypatch):
+    import json
+
+    states = {f"light.l{index}": make_state(f"light.l{index}", "on") for index in range(5)}
+    coordinator, _, _ = make_coordinator(
+        monkeypatch,
+        states=states,
+        options={
+            "openai_api_key": "key",
+            "sharded_generation": True,
+            "shard_grouping": "size",
+            "shard_concurrency": 2,
+            "request_timeout": 10,
+            "max_input_tokens": 4000,
+        },
+    )
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+    coordinator.async_update_listeners = lambda: None
+    coordinator.scan_all = True
+    coordinator.entity_limit = 2
+    timeouts = []
+    wait = asyncio.wait
+
+    async def recording_wait(tasks, *, timeout=None, **kwargs):
+        timeouts.append(timeout)
+        return await wait(tasks, timeout=timeout, **kwargs)
+
+    async def provider(prompt):
+        shard = sorted(entity_id for entity_id in states if f"Entity: {entity_id}\n" in prompt)
+        return json.dumps({"suggestions": [{"title": f"Use {shard[0]}", "yaml": f"alias: {shard[0]}\n"}]})
+
+    monkeypatch.setattr(coordinator_module.asyncio, "wait", recording_wait)
+    coordinator._openai = provider
+
+    data = asyncio.run(coordinator._async_update_data())
+
+    # Three shards at two concurrent requests take two waves.
+    assert timeouts == [20]
+    assert data["request_succeeded"] is True
+    assert [shard["status"] for shard in data["response_metadata"]["shards"]] == ["completed"] * 3
+    assert coordinator._generation_deadline(3) == 30
+    coordinator.entry.options["generation_deadline"] = 15
+    assert coordinator._generation_deadline(3) == 15
+
+
+def test_first_shard_keeps_the_automation_context_when_it_fits(monkeypatch):
+    states = {f"sensor.s{index:02d}": make_state(f"sensor.s{index:02d}", str(index)) for index in range(60)}
+    states.update({f"automation.a{index}": make_state(f"automation.a{index}", "on") for index in range(5)})
+    coordinator, _, _ = make_coordinator(
+        monkeypatch,
+        states=states,
+        options={"sharded_generation": True, "shard_grouping": "size", "max_input_tokens": 3000},
+    )
+    coordinator.entity_limit = 60
+    entities = coordinator._collect_entities()
+    picked = {entity_id: meta for entity_id, meta in entities.items() if entity_id.startswith("sensor.")}
+
+    prompts = asyncio.run(coordinator._async_build_shard_prompts(picked, run_id="run", warnings=[]))
+
+    assert len(prompts) > 1
+    assert all(f"Entity: automation.a{index}" in prompts[0].prompt for index in range(5))
+    assert not any("automation summaries" in warning for warning in prompts[0].warnings)
+    assert prompts[0].token_count <= prompts[0].input_budget
+    assert sum(len(prompt.entity_ids) for prompt in prompts) == 60
+
+
+def make_hedged_pair(monkeypatch, primary_options=None):
+    states = {"light.kitchen": make_state("light.kitchen", "on")}
+    primary, _, _ = make_coordinator(
+        monkeypatch,
+        states=states,
+        options={"openai_api_key": "key", "hedge_entry": "backup", "hedge_delay": 0.02, **(primary_options or {})},
+    )
+    secondary, _, _ = make_coordinator(
+        monkeypatch, states=states, options={"provider": "Groq", "groq_api_key": "key", "groq_model": "llama-x"}
+    )
+    secondary.entry.entry_id = "backup"
+    primary.hass.data.setdefault(coordinator_module.DOMAIN, {})["backup"] = secondary
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+    primary.async_update_listeners = lambda: None
+    primary.scan_all = True
+    return primary, secondary
+
+
+def test_hedged_request_uses_the_faster_entry_and_cancels_the_slow_one(monkeypatch):
+    import json
+
+    primary, secondary = make_hedged_pair(monkeypatch)
+    aborted = []
+
+    async def slow_provider(prompt):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            aborted.append(True)
+            raise
+
+    async def fast_provider(prompt):
+        secondary._last_response_metadata = {"finish_reason": "stop"}
+        return json.dumps({"suggestions": [{"title": "Backup idea", "yaml": "alias: backup\n"}]})
+
+    primary._openai = slow_provider
+    secondary._groq = fast_provider
+
+    data = asyncio.run(primary._async_update_data())
+
+    assert aborted == [True]
+    assert data["request_succeeded"] is True
+    assert data["provider"] == "Groq"
+    assert data["suggestion"]["title"] == "Backup idea"
+    assert data["response_metadata"]["finish_reason"] == "stop"
+    assert data["response_metadata"]["hedge"]["winner"] == "secondary"
+    assert secondary._last_response_metadata == {}
+
+
+def test_hedge_is_not_sent_when_the_primary_answers_in_time(monkeypatch):
+    import json
+
+    primary, secondary = make_hedged_pair(monkeypatch, {"hedge_delay": 5})
+    calls = []
+
+    async def primary_provider(prompt):
+        return json.dumps({"suggestions": [{"title": "Primary idea", "yaml": "alias: primary\n"}]})
+
+    async def secondary_provider(prompt):
+        calls.append(prompt)
+
+    primary._openai = primary_provider
+    secondary._groq = secondary_provider
+
+    data = asyncio.run(primary._async_update_data())
+
+    assert calls == []
+    assert data["provider"] == "OpenAI"
+    assert "hedge" not in data["response_metadata"]
+
+
+def test_rate_limit_opens_the_circuit_and_skips_provider_requests(monkeypatch):
+    class RateLimitedSession:
+        def __init__(self):
+            self.calls = 0
+
+        def post(self, endpoint, *, headers=None, json=None, timeout=None):
+            self.calls += 1
+
+            class Response:
+                status = 429
+                headers = {"Retry-After": "30"}
+
+                async def text(self):
+                    return '{"error": "rate limited"}'
+
+                async def __aenter__(self):
+                    return self
+
+                async def __aexit__(self, *exc_info):
+                    return False
+
+            return Response()
+
+    coordinator, _, _ = make_coordinator(
+        monkeypatch, states={}, options={"openai_api_key": "key", "openai_model": "gpt-4o-mini"}
+    )
+    coordinator.session = RateLimitedSession()
+
+    assert asyncio.run(coordinator._dispatch("prompt")) is None
+    assert "error 429" in coordinator._last_error
+    assert asyncio.run(coordinator._dispatch("prompt")) is None
+
+    assert coordinator.session.calls == 1
+    assert "requests resume in 30 seconds" in coordinator._last_error
+    assert coordinator.circuit_breaker.snapshot()["circuit_state"] == "open"
+
+    # Another entry using the same API key shares the open circuit.
+    options = {"openai_api_key": "key", "openai_model": "gpt-4o-mini"}
+    other = coordinator_module.AIAutomationCoordinator(
+        coordinator.hass, FakeEntry(data={"provider": "OpenAI"}, options=options, entry_id="other")
+    )
+    other.session = coordinator.session
+
+    assert other.circuit_breaker is coordinator.circuit_breaker
+    assert asyncio.run(other._dispatch("prompt")) is None
+    assert coordinator.session.calls == 1
+    assert "requests resume in 30 seconds" in other._last_error
+
+
+def test_litellm_errors_drive_the_circuit_through_a_probe_back_to_closed(monkeypatch):
+    from custom_components.ai_automation_suggester.circuit_breaker import CircuitBreaker
+
+    class APIError(Exception):
+        def __init__(self, status_code, headers=None):
+            super().__init__(f"status {status_code}")
+            self.status_code = status_code
+            self.response = SimpleNamespace(headers=headers or {})
+
+    class RateLimitError(APIError):
+        def __init__(self, retry_after):
+            super().__init__(429, {"retry-after": str(retry_after)})
+
+    answer = SimpleNamespace(
+        choices=[SimpleNamespace(finish_reason="stop", message=SimpleNamespace(content="ok"))],
+        usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+    )
+    outcomes = [APIError(503), APIError(503), APIError(503), answer, RateLimitError(30), answer]
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def import_litellm(hass):
+        return SimpleNamespace(acompletion=acompletion, RateLimitError=RateLimitError)
+
+    monkeypatch.setattr(coordinator_module, "async_import_litellm", import_litellm)
+    coordinator, _, _ = make_coordinator(
+        monkeypatch, states={}, options={"provider": "LiteLLM", "litellm_model": "openai/gpt-4o-mini"}
+    )
+    now = [1000.0]
+    breaker = CircuitBreaker("LiteLLM", clock=lambda: now[0], wall_clock=lambda: now[0], jitter=lambda: 1.0)
+    coordinator.circuit_breaker = breaker
+
+    for _ in range(3):
+        assert asyncio.run(coordinator._dispatch("prompt")) is None
+    assert breaker.snapshot()["circuit_state"] == "open"
+    assert asyncio.run(coordinator._dispatch("prompt")) is None
+    assert len(calls) == 3
+
+    # The half-open probe succeeds through LiteLLM and closes the circuit.
+    now[0] += breaker.base_delay
+    assert asyncio.run(coordinator._dispatch("prompt")) == "ok"
+    assert breaker.snapshot() == {"circuit_state": "closed", "consecutive_failures": 0, "circuit_retry_at": None}
+
+    # A LiteLLM rate limit opens the circuit at once for the provider's wait.
+    assert asyncio.run(coordinator._dispatch("prompt")) is None
+    assert breaker.snapshot()["circuit_state"] == "open"
+    assert breaker.last_retry_after == 30
+    now[0] += 29
+    assert asyncio.run(coordinator._dispatch("prompt")) is None
+    assert len(calls) == 5
+    now[0] += 1
+    assert asyncio.run(coordinator._dispatch("prompt")) == "ok"
+    assert breaker.snapshot()["circuit_state"] == "closed"
+
+
+def test_dispatch_reserves_tokens_and_settles_with_reported_usage(monkeypatch):
+    import json
+
+    class UsageSession:
+        def post(self, endpoint, *, headers=None, json=None, timeout=None):
+            class Response:
+                status = 200
+                headers = {"x-ratelimit-limit-requests": "500", "x-ratelimit-remaining-requests": "499"}
+
+                async def text(self):
+                    return json_text
+
+                async def json(self, content_type=None):
+                    return body
+
+                async def __aenter__(self):
+                    return self
+
+                async def __aexit__(self, *exc_info):
+                    return False
+
+            return Response()
+
+    body = {"choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}], "usage": {"total_tokens": 150}}
+    json_text = json.dumps(body)
+    options = {"openai_api_key": "key", "openai_model": "gpt-4o-mini", "rate_limit_tpm": 100000}
+    coordinator, _, _ = make_coordinator(monkeypatch, states={}, options=options)
+    coordinator.rate_governor._clock = lambda: 0.0
+    coordinator.session = UsageSession()
+
+    assert asyncio.run(coordinator._dispatch("prompt")) == "ok"
+
+    snapshot = coordinator.rate_governor.snapshot()
+    assert snapshot["tokens"] == {"limit_per_minute": 100000, "available": 99850.0}
+    assert snapshot["requests"] == {"limit_per_minute": 500, "available": 499.0}
+
+
+def test_unloaded_entries_release_their_rate_limits(monkeypatch):
+    options = {"openai_api_key": "key", "rate_limit_rpm": 10}
+    first, _, _ = make_coordinator(monkeypatch, states={}, options=options)
+    second_entry = FakeEntry(data={"provider": "OpenAI"}, options={**options, "rate_limit_rpm": 60}, entry_id="second")
+    second = coordinator_module.AIAutomationCoordinator(first.hass, second_entry)
+
+    assert second.rate_governor is first.rate_governor
+    assert first.rate_governor.snapshot()["shared_by_entries"] == 2
+    assert first.rate_governor.snapshot()["requests"]["limit_per_minute"] == 10
+
+    # Reloading with a higher limit replaces the old one instead of keeping the minimum.
+    first.entry.unload()
+    first.entry.options["rate_limit_rpm"] = 120
+    reloaded = coordinator_module.AIAutomationCoordinator(first.hass, first.entry)
+
+    assert reloaded.rate_governor.snapshot()["shared_by_entries"] == 2
+    assert reloaded.rate_governor.snapshot()["requests"]["limit_per_minute"] == 60
+
+    # Removing an entry drops its limit and its share.
+    second_entry.unload()
+
+    assert reloaded.rate_governor.snapshot()["shared_by_entries"] == 1
+    assert reloaded.rate_governor.snapshot()["requests"]["limit_per_minute"] == 120
+
+
+class OpenWebUISession:
+    """Open WebUI proxy that only serves Ollama under ``/ollama``."""
+
+    def __init__(self):
+        self.requests = []
+
+    def post(self, endpoint, *, headers=None, json=None, timeout=None):
+        self.requests.append((endpoint, json))
+        status = 200 if "/ollama/api/" in endpoint else 404
+        body = {"message": {"content": "ok"}, "done_reason": "stop", "eval_count": 3}
+
+        class Response:
+            async def text(self):
+                return "ok" if status == 200 else "Not Found"
+
+            async def read(self):
+                return b""
+
+            async def json(self, content_type=None):
+                return body
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        response = Response()
+        response.status = status
+        return response
+
+
+def make_ollama_coordinator(monkeypatch, **options):
+    coordinator, _, _ = make_coordinator(
+        monkeypatch,
+        states={},
+        options={"provider": "Ollama", "ollama_base_url": "http://webui:3000", "ollama_model": "qwen:14b", **options},
+    )
+    coordinator.session = OpenWebUISession()
+    return coordinator
+
+
+def test_ollama_remembers_the_endpoint_that_answered(monkeypatch):
+    coordinator = make_ollama_coordinator(monkeypatch, ollama_keep_alive="30m")
+
+    assert asyncio.run(coordinator._dispatch("prompt")) == "ok"
+    assert asyncio.run(coordinator._dispatch("prompt")) == "ok"
+
+    endpoints = [endpoint for endpoint, _ in coordinator.session.requests]
+    assert endpoints == [
+        "http://webui:3000/api/chat",
+        "http://webui:3000/ollama/api/chat",
+        "http://webui:3000/ollama/api/chat",
+    ]
+    assert coordinator.session.requests[-1][1]["keep_alive"] == "30m"
+
+
+def test_ollama_warmup_preloads_the_model_with_keep_alive(monkeypatch):
+    coordinator = make_ollama_coordinator(monkeypatch, ollama_warmup=True, ollama_keep_alive="-1")
+
+    assert asyncio.run(coordinator.async_warmup()) is True
+
+    endpoint, body = coordinator.session.requests[-1]
+    assert endpoint == "http://webui:3000/ollama/api/chat"
+    assert body == {"model": "qwen:14b", "messages": [], "stream": False, "keep_alive": -1}
+    assert coordinator._ollama_endpoint == endpoint
+
+
+class FakeBatchClient:
+    def __init__(self):
+        self.submitted = []
+        self.done = False
+
+    async def async_submit(self, endpoint, requests):
+        self.submitted.append((endpoint, requests))
+        return "batch_0"
+
+    async def async_status(self, batch_id):
+        return batch_module.BatchStatus("completed" if self.done else "in_progress", self.done, ("out",))
+
+    async def async_results(self, status):
+        import json
+
+        (_, requests), = self.submitted
+        results = {}
+        for custom_id, body in requests:
+            sent = json.dumps(body)
+            shard = [entity_id for entity_id in ("light.l0", "light.l1", "light.l2") if f"Entity: {entity_id}" in sent]
+            text = json.dumps({"suggestions": [{"title": f"Use {shard[0]}", "yaml": f"alias: {shard[0]}\n"}]})
+            results[custom_id] = batch_module.BatchResult({"output_text": text, "usage": {"total_tokens": 10}})
+        results[requests[-1][0]] = batch_module.BatchResult(None, "request expired")
+        return results
+
+
+def test_batch_run_is_submitted_then_ingested_after_a_restart(monkeypatch):
+    states = {f"light.l{index}": make_state(f"light.l{index}", "on") for index in range(3)}
+    options = {"openai_api_key": "key", "shard_grouping": "size", "max_input_tokens": 4000}
+    coordinator, _, _ = make_coordinator(monkeypatch, states=states, options=options)
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+    client = FakeBatchClient()
+    coordinator._batch_client = lambda provider: client
+    coordinator.async_update_listeners = lambda: None
+    coordinator.scan_all = True
+    coordinator.batch_mode = True
+    coordinator.entity_limit = 1
+    events = []
+    unsubscribe = dispatcher.async_dispatcher_connect(None, events_module.SIGNAL_SUGGESTION_EVENT, events.append)
+
+    submitted = asyncio.run(coordinator._async_update_data())
+    (endpoint, requests), = client.submitted
+    submit_events = [event["type"] for event in events]
+    events.clear()
+
+    assert endpoint == "/v1/responses"
+    assert len(requests) == 3
+    assert submitted["request_succeeded"] is True
+    assert submitted["suggestion_count"] == 0
+    assert submitted["response_metadata"]["batch"] == {"id": "batch_0", "status": "submitted", "requests": 3}
+    assert coordinator.previous_entities == {}
+
+    # A restart loses the in-memory store; the persisted job is picked up again.
+    persisted = coordinator.hass.data[coordinator_module.DOMAIN].pop(batch_module.HASS_BATCH_JOBS_KEY)
+    restarted, _, _ = make_coordinator(monkeypatch, states=states, options=options)
+    restarted.batch_jobs._store.data = persisted._store.data
+    restarted._batch_client = lambda provider: client
+    restarted.async_update_listeners = lambda: None
+
+    assert asyncio.run(restarted.async_poll_batch_jobs()) == 0
+    client.done = True
+    assert asyncio.run(restarted.async_poll_batch_jobs()) == 1
+
+    data = restarted.data
+    assert data["request_succeeded"] is True
+    assert sorted(suggestion["title"] for suggestion in data["suggestion_history"]) == [
+        "Use light.l0",
+        "Use light.l1",
+    ]
+    assert {suggestion["run_id"] for suggestion in data["suggestion_history"]} == {requests[0][0].rsplit("-", 1)[0]}
+    assert set(restarted.previous_entities) == {"light.l0", "light.l1"}
+    assert [shard["status"] for shard in data["response_metadata"]["shards"]] == ["completed", "completed", "failed"]
+    assert "1 of 3 batch requests failed" in data["warnings"][-1]
+    assert asyncio.run(restarted.batch_jobs.async_list()) == []
+    unsubscribe()
+    assert submit_events[0] == "generation_started" and submit_events[-1] == "generation_finished"
+    assert [event["type"] for event in events if event["type"].startswith("generation_")] == [
+        "generation_started",
+        "generation_finished",
+    ]
+
+
+def test_batch_ingest_errors_keep_the_job_for_another_poll_then_fail_the_run(monkeypatch):
+    states = {f"light.l{index}": make_state(f"light.l{index}", "on") for index in range(3)}
+    options = {"openai_api_key": "key", "shard_grouping": "size", "max_input_tokens": 4000}
+    coordinator, _, _ = make_coordinator(monkeypatch, states=states, options=options)
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+    client = FakeBatchClient()
+    coordinator._batch_client = lambda provider: client
+    coordinator.async_update_listeners = lambda: None
+    coordinator.scan_all = True
+    coordinator.batch_mode = True
+    coordinator.entity_limit = 1
+
+    asyncio.run(coordinator._async_update_data())
+    (job,) = asyncio.run(coordinator.batch_jobs.async_list())
+    asyncio.run(coordinator.batch_jobs.async_add({**job, "id": "other-run"}))
+    client.done = True
+    ingest = coordinator._async_ingest_batch
+    failing = {job["id"], "other-run"}
+
+    async def flaky_ingest(claimed, *args):
+        if claimed["id"] in failing:
+            raise OSError("disk full")
+        await ingest(claimed, *args)
+
+    coordinator._async_ingest_batch = flaky_ingest
+    events = []
+    unsubscribe = dispatcher.async_dispatcher_connect(None, events_module.SIGNAL_SUGGESTION_EVENT, events.append)
+    try:
+        assert asyncio.run(coordinator.async_poll_batch_jobs()) == 0
+        kept = {item["id"]: item for item in asyncio.run(coordinator.batch_jobs.async_list())}
+        assert [(item["ingested_at"], item["ingest_attempts"]) for item in kept.values()] == [(None, 1), (None, 1)]
+        assert "disk full" in kept["other-run"]["last_error"]
+
+        # A failed job does not stop the poll from ingesting the next one.
+        failing.discard("other-run")
+        assert asyncio.run(coordinator.async_poll_batch_jobs()) == 1
+        assert [item["id"] for item in asyncio.run(coordinator.batch_jobs.async_list())] == [job["id"]]
+        assert {suggestion["run_id"] for suggestion in coordinator.data["suggestion_history"]} == {"other-run"}
+
+        assert asyncio.run(coordinator.async_poll_batch_jobs()) == 0
+    finally:
+        unsubscribe()
+
+    assert asyncio.run(coordinator.batch_jobs.async_list()) == []
+    (failed,) = [event for event in events if event["type"] == "generation_failed"]
+    assert failed["run_id"] == job["id"]
+    assert "could not be stored: disk full" in failed["error"]
+    assert coordinator.data["request_succeeded"] is False
+
+
+def test_batch_entities_stay_pending_until_ingested_under_the_submitted_filters(monkeypatch):
+    states = {f"light.l{index}": make_state(f"light.l{index}", "on") for index in range(3)}
+    states["sensor.power"] = make_state("sensor.power", "10")
+    options = {"openai_api_key": "key", "shard_grouping": "size", "max_input_tokens": 4000}
+    coordinator, _, _ = make_coordinator(monkeypatch, states=states, options=options)
+    monkeypatch.setattr(
+        coordinator_module, "persistent_notification", SimpleNamespace(async_create=lambda hass, **kwargs: None)
+    )
+    client = FakeBatchClient()
+    coordinator._batch_client = lambda provider: client
+    coordinator.async_update_listeners = lambda: None
+    coordinator.batch_mode = True
+    coordinator.entity_limit = 1
+    coordinator.selected_domains = ["light"]
+
+    asyncio.run(coordinator._async_update_data())
+    assert asyncio.run(coordinator._async_batch_pending_entities()) == {"light.l0", "light.l1", "light.l2"}
+
+    # A later run with other filters only sends what is not already pending.
+    coordinator.selected_domains = []
+    asyncio.run(coordinator._async_update_data())
+    _, (_, second) = client.submitted
+    assert len(second) == 1 and "Entity: sensor.power" in str(second[0][1])
+    assert not any("Entity: light." in str(body) for _, body in second)
+    del client.submitted[1]
+    asyncio.run(coordinator.batch_jobs.async_remove(second[0][0].rsplit("-", 1)[0]))
+
+    # Ingestion marks the entities the job sent, whatever the filters are now.
+    coordinator.selected_domains = ["sensor"]
+    client.done = True
+    assert asyncio.run(coordinator.async_poll_batch_jobs()) == 1
+
+    assert set(coordinator.previous_entities) == {"light.l0", "light.l1"}
+    assert asyncio.run(coordinator._async_batch_pending_entities()) == set()
+
+
+def test_batch_requests_use_each_shard_prefix_and_are_ingested_once(monkeypatch):
+    states = {f"light.l{index}": make_state(f"light.l{index}", "on") for index in range(3)}
+    states["automation.morning"] = make_state("automation.morning", "on")
+    options = {
+        "anthropic_api_key": "key",
+        "shard_grouping": "size",
+        "max_input_tokens": 4000,
+        "stable_prompt_layout": True,
+    }
+    coordinator, _, _ = make_coordinator(monkeypatch, states=states, options=options)
+    coordinator.entry.data["provider"] = "Anthropic"
+    client = FakeBatchClient()
+    coordinator._batch_client = lambda provider: client
+    coordinator.scan_all = True
+    coordinator.batch_mode = True
+    coordinator.entity_limit = 1
+    coordinator._prompt_static_prefix = "stale prefix from an earlier run"
+
+    asyncio.run(coordinator._async_update_data())
+    (endpoint, requests), = client.submitted
+
+    assert endpoint == "/v1/messages"
+    contents = [body["messages"][0]["content"] for _, body in requests]
+    assert all(content[0]["cache_control"] == {"type": "ephemeral"} for content in contents)
+    assert "Existing Automations Overview" in contents[0][0]["text"]
+    assert "Existing Automations Overview" not in contents[1][0]["text"]
+
+    # Ingestion was claimed before a crash; the job is dropped rather than stored twice.
+    job_id = requests[0][0].rsplit("-", 1)[0]
+    asyncio.run(coordinator.batch_jobs.async_update(job_id, ingested_at="2026-07-11T12:00:00"))
+    client.done = True
+    client.async_results = None
+
+    assert asyncio.run(coordinator.async_poll_batch_jobs()) == 0
+    assert asyncio.run(coordinator.batch_jobs.async_list()) == []
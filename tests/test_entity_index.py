@@ -0,0 +1,171 @@
+"""Tests for the event-driven entity index."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from custom_components.ai_automation_suggester.entity_index import EntityContextIndex, EntityIndex
+
+
+class CountingStates:
+    def __init__(self, states):
+        self._states = states
+        self.scans = 0
+        self.lookups = 0
+
+    def async_entity_ids(self, domain=None):
+        self.scans += 1
+        return list(self._states)
+
+    def get(self, entity_id):
+        self.lookups += 1
+        return self._states.get(entity_id)
+
+
+class FakeBus:
+    def __init__(self):
+        self.listeners = {}
+
+    def async_listen(self, event_type, listener):
+        self.listeners[event_type] = listener
+        return lambda: self.listeners.pop(event_type, None)
+
+    def fire(self, event_type, **data):
+        self.listeners[event_type](SimpleNamespace(data=data))
+
+
+def make_state(entity_id, state):
+    timestamp = datetime(2026, 7, 11, 12, 0, tzinfo=UTC)
+    return SimpleNamespace(
+        entity_id=entity_id,
+        state=state,
+        attributes={"friendly_name": entity_id},
+        last_changed=timestamp,
+        last_updated=timestamp,
+    )
+
+
+def make_index(states):
+    hass = SimpleNamespace(states=CountingStates(states), bus=FakeBus())
+    return EntityIndex(hass), hass
+
+
+def test_refresh_reads_only_dirty_entities_while_listening():
+    states = {f"sensor.s{i}": make_state(f"sensor.s{i}", str(i)) for i in range(50)}
+    index, hass = make_index(states)
+    index.async_start()
+    key = ("defaults",)
+
+    first = index.async_eligible(key, lambda entity_id: True)
+    lookups_after_scan = hass.states.lookups
+    states["sensor.s3"] = make_state("sensor.s3", "changed")
+    states["light.new"] = make_state("light.new", "on")
+    del states["sensor.s4"]
+    for entity_id in ("sensor.s3", "light.new", "sensor.s4"):
+        hass.bus.fire("state_changed", entity_id=entity_id)
+
+    second = index.async_eligible(key, lambda entity_id: True)
+
+    assert len(first) == 50
+    assert hass.states.scans == 1
+    assert hass.states.lookups - lookups_after_scan == 3
+    assert second["sensor.s3"]["state"] == "changed"
+    assert "light.new" in second
+    assert "sensor.s4" not in second
+
+
+def test_filter_change_and_bulk_registry_update_reevaluate_eligibility():
+    states = {
+        "sensor.a": make_state("sensor.a", "1"),
+        "light.b": make_state("light.b", "on"),
+    }
+    index, hass = make_index(states)
+    index.async_start()
+
+    assert set(index.async_eligible(("all",), lambda entity_id: True)) == {"sensor.a", "light.b"}
+    lights_only = index.async_eligible(("light",), lambda entity_id: entity_id.startswith("light."))
+    assert set(lights_only) == {"light.b"}
+
+    hass.bus.fire("area_registry_updated", action="update", area_id="kitchen")
+    index.async_eligible(("light",), lambda entity_id: entity_id.startswith("light."))
+    assert hass.states.scans == 2
+
+
+def test_index_rescans_when_not_listening():
+    states = {"sensor.a": make_state("sensor.a", "1")}
+    index, hass = make_index(states)
+    stop = index.async_start()
+    stop()
+
+    index.async_eligible(("all",), lambda entity_id: True)
+    index.async_eligible(("all",), lambda entity_id: True)
+
+    assert hass.states.scans == 2
+    assert hass.bus.listeners == {}
+
+
+class CountingRegistry:
+    def __init__(self, entries, *, area=False):
+        self.entries = entries
+        self.calls = 0
+        if area:
+            self.async_get_area = self.async_get
+
+    def async_get(self, key):
+        self.calls += 1
+        return self.entries.get(key)
+
+
+def make_context_index():
+    entity_registry = CountingRegistry(
+        {"light.desk": SimpleNamespace(area_id=None, device_id="dev1")}
+    )
+    device_registry = CountingRegistry(
+        {
+            "dev1": SimpleNamespace(
+                id="dev1",
+                area_id="office",
+                manufacturer="Acme",
+                model="L1",
+                name="Desk lamp",
+                name_by_user=None,
+            )
+        }
+    )
+    area_registry = CountingRegistry({"office": SimpleNamespace(name="Office")}, area=True)
+    hass = SimpleNamespace(bus=FakeBus())
+    index = EntityContextIndex(hass, entity_registry, device_registry, area_registry)
+    return index, hass, entity_registry, area_registry
+
+
+def test_context_index_resolves_device_area_and_caches_until_registry_update():
+    index, hass, entity_registry, area_registry = make_context_index()
+    index.async_start()
+
+    context = index.async_resolve("light.desk")
+    index.async_resolve("light.desk")
+
+    assert context.area_name == "Office"
+    assert context.device_name == "Desk lamp"
+    assert context.area_keys == {"office"}
+    assert entity_registry.calls == 1
+
+    area_registry.entries["office"] = SimpleNamespace(name="Study")
+    hass.bus.fire("area_registry_updated", action="update", area_id="office")
+
+    assert index.async_resolve("light.desk").area_name == "Study"
+    assert entity_registry.calls == 2
+
+
+def test_context_index_drops_single_entity_on_entity_registry_update():
+    index, hass, entity_registry, _ = make_context_index()
+    index.async_start()
+    index.async_resolve("light.desk")
+
+    entity_registry.entries["light.desk"] = SimpleNamespace(area_id="garage", device_id=None)
+    hass.bus.fire("entity_registry_updated", action="update", entity_id="light.desk")
+
+    context = index.async_resolve("light.desk")
+    assert context.area_id == "garage"
+    assert context.device_id is None
@@ -0,0 +1,136 @@
+"""Tests for generation request coalescing and prioritisation."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def load_module(name: str):
+    path = Path(__file__).resolve().parents[1] / "custom_components" / "ai_automation_suggester" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+generation_queue = load_module("generation_queue")
+
+
+def make_queue(depth=4):
+    return generation_queue.GenerationQueue(lambda coro: asyncio.get_running_loop().create_task(coro), depth=depth)
+
+
+def test_identical_requests_share_one_run():
+    calls = []
+
+    async def run():
+        queue = make_queue()
+        release = asyncio.Event()
+
+        async def job():
+            calls.append("run")
+            await release.wait()
+            return {"request_succeeded": True}
+
+        waiters = [asyncio.create_task(queue.async_submit("same", job)) for _ in range(3)]
+        await asyncio.sleep(0)
+        late = asyncio.create_task(queue.async_submit("same", job))
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiters, late), queue.coalesced
+
+    results, coalesced = asyncio.run(run())
+
+    assert calls == ["run"]
+    assert coalesced == 3
+    assert all(result is results[0] for result in results)
+
+
+def test_manual_requests_run_before_automatic_ones():
+    order = []
+
+    async def run():
+        queue = make_queue()
+        release = asyncio.Event()
+
+        def job(name, wait=False):
+            async def runner():
+                if wait:
+                    await release.wait()
+                order.append(name)
+                return name
+
+            return runner
+
+        first = asyncio.create_task(queue.async_submit("busy", job("busy", wait=True)))
+        await asyncio.sleep(0)
+        automatic = asyncio.create_task(
+            queue.async_submit("auto", job("auto"), generation_queue.PRIORITY_AUTOMATIC)
+        )
+        manual = asyncio.create_task(queue.async_submit("manual", job("manual")))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, automatic, manual)
+
+    asyncio.run(run())
+
+    assert order == ["busy", "manual", "auto"]
+
+
+def test_depth_bound_displaces_automatic_work_and_rejects_excess():
+    async def run():
+        queue = make_queue(depth=1)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+
+        async def done():
+            return "ok"
+
+        busy = asyncio.create_task(queue.async_submit("busy", blocked))
+        await asyncio.sleep(0)
+        automatic = asyncio.create_task(queue.async_submit("auto", done, generation_queue.PRIORITY_AUTOMATIC))
+        await asyncio.sleep(0)
+        manual = asyncio.create_task(queue.async_submit("manual", done))
+        await asyncio.sleep(0)
+        with pytest.raises(generation_queue.GenerationQueueFullError):
+            await queue.async_submit("another", done)
+        release.set()
+        return await asyncio.gather(busy, automatic, manual, return_exceptions=True), queue.dropped
+
+    (busy, automatic, manual), dropped = asyncio.run(run())
+
+    assert busy is None
+    assert isinstance(automatic, generation_queue.GenerationQueueFullError)
+    assert manual == "ok"
+    assert dropped == 1
+
+
+def test_errors_reach_every_waiter_and_cancelling_one_waiter_keeps_the_run():
+    async def run():
+        queue = make_queue()
+        release = asyncio.Event()
+
+        async def failing():
+            await release.wait()
+            raise ValueError("rate limited")
+
+        first = asyncio.create_task(queue.async_submit("same", failing))
+        second = asyncio.create_task(queue.async_submit("same", failing))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(run())
+
+    assert isinstance(first, asyncio.CancelledError)
+    assert isinstance(second, ValueError)
@@ -0,0 +1,97 @@
+"""Tests for suggestions API filtering, paging, and conditional requests."""
+
+from __future__ import annotations
+
+import gzip
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def load_module(name: str):
+    path = Path(__file__).resolve().parents[1] / "custom_components" / "ai_automation_suggester" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+history_query = load_module("history_query")
+
+RECORDS = [
+    {"id": "e", "status": "new", "provider": "OpenAI", "created_at": "2026-07-11T12:00:00"},
+    {"id": "d", "status": "dismissed", "provider": "OpenAI", "created_at": "2026-07-11T11:00:00"},
+    {"id": "c", "status": "new", "provider": "Ollama", "created_at": "2026-07-11T10:00:00"},
+    {"id": "b", "status": "accepted", "provider": "OpenAI", "created_at": "2026-07-10T09:00:00"},
+    {"id": "a", "status": "new", "provider": "openai", "created_at": "2026-07-09T09:00:00"},
+]
+
+
+def ids(records):
+    return [record["id"] for record in records]
+
+
+def test_cursor_pages_through_filtered_records():
+    query = history_query.HistoryQuery.from_params({"limit": "2", "status": "new,accepted"})
+    first, cursor = history_query.select_records(RECORDS, query)
+    second, final_cursor = history_query.select_records(
+        RECORDS, history_query.HistoryQuery.from_params({"limit": "2", "status": "new,accepted", "cursor": cursor})
+    )
+
+    assert ids(first) == ["e", "c"]
+    assert cursor == "c"
+    assert ids(second) == ["b", "a"]
+    assert final_cursor is None
+    assert query.paginated
+
+
+def test_provider_and_since_filters():
+    query = history_query.HistoryQuery.from_params({"provider": "OpenAI", "since": "2026-07-10T00:00:00"})
+
+    page, cursor = history_query.select_records(RECORDS, query)
+
+    assert ids(page) == ["e", "d", "b"]
+    assert cursor is None
+    assert not query.paginated
+
+
+@pytest.mark.parametrize("params", [{"limit": "0"}, {"limit": "many"}, {"since": "yesterday"}])
+def test_invalid_parameters_are_rejected(params):
+    with pytest.raises(history_query.QueryError):
+        history_query.HistoryQuery.from_params(params)
+
+
+def test_unknown_cursor_is_rejected():
+    query = history_query.HistoryQuery.from_params({"cursor": "trimmed"})
+    with pytest.raises(history_query.QueryError):
+        history_query.select_records(RECORDS, query)
+
+
+def test_etag_depends_on_revision_query_and_encoding():
+    query = history_query.HistoryQuery.from_params({"status": "new,accepted"})
+    reordered = history_query.HistoryQuery.from_params({"status": "accepted, new"})
+    etag = history_query.make_etag("abc-1", query)
+
+    assert etag == history_query.make_etag("abc-1", reordered)
+    assert etag != history_query.make_etag("abc-2", query)
+    assert etag != history_query.make_etag("abc-1", query, gzipped=True)
+    assert history_query.etag_matches(f'"other", W/{etag}', etag)
+    assert history_query.etag_matches("*", etag)
+    assert not history_query.etag_matches(None, etag)
+
+
+def test_large_bodies_are_gzipped_when_accepted():
+    body = json.dumps(RECORDS * 20).encode()
+
+    encoded, gzipped = history_query.encode_body(body, allow_gzip=history_query.accepts_gzip("br, gzip;q=0.8"))
+
+    assert gzipped
+    assert gzip.decompress(encoded) == body
+    assert encoded == history_query.encode_body(body, allow_gzip=True)[0]
+    assert history_query.encode_body(b"[]", allow_gzip=True) == (b"[]", False)
+    assert not history_query.accepts_gzip("gzip;q=0")
@@ -0,0 +1,58 @@
+"""Tests for importing LiteLLM off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.ai_automation_suggester import litellm_loader
+
+
+class FakeHass:
+    def __init__(self):
+        self.data = {}
+        self.executor_jobs = 0
+
+    def async_add_executor_job(self, target, *args):
+        self.executor_jobs += 1
+        return asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+
+def test_litellm_is_imported_once_in_an_executor(monkeypatch):
+    module = SimpleNamespace(acompletion=None)
+    imports = []
+
+    def import_module(name):
+        imports.append(name)
+        return module
+
+    monkeypatch.setattr(litellm_loader.importlib, "import_module", import_module)
+    hass = FakeHass()
+
+    async def run():
+        return await asyncio.gather(*(litellm_loader.async_import_litellm(hass) for _ in range(3)))
+
+    assert asyncio.run(run()) == [module, module, module]
+    assert imports == ["litellm"]
+    assert hass.executor_jobs == 1
+    stats = litellm_loader.litellm_import_stats(hass)
+    assert stats["imported"] is True
+    assert stats["import_seconds"] >= 0
+
+
+def test_failed_import_can_be_retried(monkeypatch):
+    def import_module(name):
+        raise ImportError("No module named 'litellm'")
+
+    monkeypatch.setattr(litellm_loader.importlib, "import_module", import_module)
+    hass = FakeHass()
+
+    with pytest.raises(ImportError):
+        asyncio.run(litellm_loader.async_import_litellm(hass))
+
+    assert litellm_loader.litellm_import_stats(hass) == {"imported": False, "import_seconds": None}
+    monkeypatch.setattr(litellm_loader.importlib, "import_module", lambda name: SimpleNamespace())
+    asyncio.run(litellm_loader.async_import_litellm(hass))
+    assert hass.executor_jobs == 2
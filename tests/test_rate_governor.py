@@ -0,0 +1,106 @@
+"""Tests for the shared client-side rate governor."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.ai_automation_suggester import rate_governor as governor_module
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+def make_governor(provider="OpenAI"):
+    clock = Clock()
+    return governor_module.RateGovernor(provider, clock=clock, sleep=clock.sleep), clock
+
+
+def test_requests_wait_for_the_request_bucket_to_refill():
+    governor, clock = make_governor()
+    governor.configure("entry", rpm=2, tpm=0)
+
+    async def run():
+        for _ in range(3):
+            await governor.async_acquire(100)
+
+    asyncio.run(run())
+
+    assert clock.sleeps == [30.0]
+    assert governor.snapshot()["requests"] == {"limit_per_minute": 2, "available": 0.0}
+    assert governor.snapshot()["tokens"] is None
+    assert governor.snapshot()["throttled_requests"] == 1
+
+
+def test_token_reservations_are_corrected_with_reported_usage():
+    governor, clock = make_governor()
+    governor.configure("entry", rpm=0, tpm=1000)
+
+    async def run():
+        reserved = await governor.async_acquire(800)
+        governor.settle(reserved, 200)
+        await governor.async_acquire(800)
+
+    asyncio.run(run())
+
+    assert clock.sleeps == []
+    assert governor.snapshot()["tokens"]["available"] == 0.0
+
+
+def test_unconfigured_owner_no_longer_limits_the_bucket():
+    governor, _ = make_governor()
+    governor.configure("a", rpm=5, tpm=1000)
+    governor.configure("b", rpm=50, tpm=0)
+
+    governor.unconfigure("a")
+
+    assert governor.snapshot()["requests"]["limit_per_minute"] == 50
+    assert governor.snapshot()["tokens"] is None
+    assert governor.snapshot()["shared_by_entries"] == 1
+    governor.unconfigure("a")
+    governor.unconfigure("b")
+    assert governor.snapshot()["requests"] is None
+
+
+def test_lowest_configured_or_reported_limit_applies():
+    governor, _ = make_governor()
+    governor.configure("first", rpm=500, tpm=0)
+    governor.configure("second", rpm=60, tpm=0)
+    governor.learn({"x-ratelimit-limit-tokens": "30000", "x-ratelimit-remaining-tokens": "12000"})
+
+    snapshot = governor.snapshot()
+    assert snapshot["shared_by_entries"] == 2
+    assert snapshot["requests"]["limit_per_minute"] == 60
+    assert snapshot["tokens"] == {"limit_per_minute": 30000, "available": 12000.0}
+
+    governor.learn({"anthropic-ratelimit-requests-limit": "50", "anthropic-ratelimit-requests-remaining": "49"})
+    assert governor.snapshot()["requests"] == {"limit_per_minute": 50, "available": 49.0}
+
+
+def test_groq_daily_request_limit_is_not_treated_as_per_minute():
+    governor, _ = make_governor("Groq")
+
+    governor.learn({"x-ratelimit-limit-requests": "14400", "x-ratelimit-limit-tokens": "6000"})
+
+    assert governor.snapshot()["requests"] is None
+    assert governor.snapshot()["tokens"]["limit_per_minute"] == 6000
+
+
+def test_entries_with_the_same_credential_share_a_governor():
+    hass = SimpleNamespace(data={})
+
+    first = governor_module.async_get_rate_governor(hass, "OpenAI", "sk-one")
+
+    assert governor_module.async_get_rate_governor(hass, "OpenAI", "sk-one") is first
+    assert governor_module.async_get_rate_governor(hass, "OpenAI", "sk-two") is not first
+    assert "sk-one" not in repr(hass.data)
@@ -0,0 +1,83 @@
+"""Tests for the persistent provider response cache."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.ai_automation_suggester import response_cache as cache_module
+
+
+def make_cache(max_entries=32):
+    return cache_module.ResponseCache(SimpleNamespace(data={}), max_entries=max_entries)
+
+
+def test_key_ignores_whitespace_differences_but_not_settings():
+    key = cache_module.make_cache_key("OpenAI", "gpt-4o-mini", 0.0, "Entities:\r\nlight.a  \n")
+
+    assert key == cache_module.make_cache_key("OpenAI", "gpt-4o-mini", 0.0, "Entities:\nlight.a\n\n")
+    assert key != cache_module.make_cache_key("OpenAI", "gpt-4o", 0.0, "Entities:\nlight.a")
+    assert key != cache_module.make_cache_key("OpenAI", "gpt-4o-mini", 0.5, "Entities:\nlight.a")
+    assert key != cache_module.make_cache_key("OpenAI", "gpt-4o-mini", 0.0, "Entities:\nlight.b")
+
+
+def test_key_covers_output_settings_and_truncated_replies_are_detected():
+    small = cache_module.make_cache_key("OpenAI", "gpt-5.4-mini", None, "prompt", {"max_output_tokens": 500})
+
+    assert small == cache_module.make_cache_key("OpenAI", "gpt-5.4-mini", None, "prompt", {"max_output_tokens": 500})
+    assert small != cache_module.make_cache_key("OpenAI", "gpt-5.4-mini", None, "prompt", {"max_output_tokens": 4000})
+    assert small != cache_module.make_cache_key(
+        "OpenAI", "gpt-5.4-mini", None, "prompt", {"max_output_tokens": 500, "reasoning": "high"}
+    )
+    assert cache_module.is_truncated_response({"finish_reason": "length"})
+    assert cache_module.is_truncated_response({"stop_reason": "max_tokens"})
+    assert cache_module.is_truncated_response({"finish_reason": "MAX_TOKENS"})
+    assert cache_module.is_truncated_response(
+        {"status": "incomplete", "incomplete_details": {"reason": "max_output_tokens"}}
+    )
+    assert not cache_module.is_truncated_response({"finish_reason": "stop", "native_finish_reason": None})
+    assert not cache_module.is_truncated_response({"status": "completed"})
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = make_cache()
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+
+    async def run():
+        await cache.async_set("key", "response", {"model": "m"})
+        fresh = await cache.async_get("key", ttl=60)
+        now[0] += 61
+        return fresh, await cache.async_get("key", ttl=60)
+
+    fresh, stale = asyncio.run(run())
+
+    assert fresh["response"] == "response"
+    assert stale is None
+    assert cache.stats() == {
+        "size": 0,
+        "maxsize": 32,
+        "hits": 1,
+        "misses": 1,
+        "expired": 1,
+        "bypassed": 0,
+        "hit_rate": 0.5,
+    }
+
+
+def test_least_recently_used_entry_is_evicted_and_persisted():
+    cache = make_cache(max_entries=2)
+
+    async def run():
+        await cache.async_set("a", "A", {})
+        await cache.async_set("b", "B", {})
+        await cache.async_get("a", ttl=0)
+        await cache.async_set("c", "C", {})
+        return [await cache.async_get(key, ttl=0) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [True, False, True]
+    assert [entry["key"] for entry in cache._store.data["entries"]] == ["a", "c"]
+
+    reloaded = make_cache(max_entries=2)
+    reloaded._store.data = cache._store.data
+    assert asyncio.run(reloaded.async_get("c", ttl=0))["response"] == "C"
@@ -0,0 +1,167 @@
+"""Tests for the suggestion and provider status sensors."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.ai_automation_suggester import sensor as sensor_module
+from custom_components.ai_automation_suggester.circuit_breaker import CircuitBreaker
+from custom_components.ai_automation_suggester.const import (
+    CONF_COMPACT_ATTRIBUTES,
+    PROVIDER_STATUS_CIRCUIT_OPEN,
+    PROVIDER_STATUS_CONNECTED,
+    SENSOR_KEY_STATUS,
+    SENSOR_KEY_SUGGESTIONS,
+)
+from custom_components.ai_automation_suggester.store import async_get_suggestion_store
+
+
+class FakeHass:
+    def __init__(self):
+        self.data = {}
+        self.tasks = []
+
+    def async_create_task(self, coro):
+        task = asyncio.ensure_future(coro)
+        self.tasks.append(task)
+        return task
+
+
+def make_entry(**options):
+    return SimpleNamespace(entry_id="entry", data={"provider": "OpenAI"}, options=options, version=1)
+
+
+def make_sensor(sensor_class, key, coordinator, entry, hass):
+    description = sensor_module.SensorEntityDescription(key=key, name=key)
+    sensor = sensor_class(coordinator, entry, description)
+    sensor.hass = hass
+    return sensor
+
+
+def coordinator_data(history):
+    return {
+        "suggestions": "Turn off the hallway light",
+        "description": "Full text " * 200,
+        "yaml_block": "alias: Hallway\n" * 50,
+        "suggestion": history[0],
+        "suggestion_history": history,
+        "suggestion_count": len(history),
+        "entities_processed": ["light.hallway", "sensor.motion"],
+        "warnings": ["Prompt truncated"],
+        "last_update": 1000.0,
+        "provider": "OpenAI",
+        "model": "gpt-5.4-mini",
+        "request_succeeded": True,
+    }
+
+
+def test_compact_attributes_expose_ids_and_counts_only():
+    hass = FakeHass()
+    history = [
+        {"id": "b", "title": "Hallway light", "status": "new"},
+        {"id": "a", "title": "Porch light", "status": "accepted"},
+    ]
+    coordinator = SimpleNamespace(data=coordinator_data(history), last_update_success=True)
+    sensor = make_sensor(
+        sensor_module.AISuggestionsSensor,
+        SENSOR_KEY_SUGGESTIONS,
+        coordinator,
+        make_entry(**{CONF_COMPACT_ATTRIBUTES: True}),
+        hass,
+    )
+
+    sensor._handle_coordinator_update()
+    attributes = sensor.extra_state_attributes
+
+    assert sensor.native_value == "New Suggestions Available"
+    assert attributes["suggestion_id"] == "b"
+    assert attributes["suggestion_title"] == "Hallway light"
+    assert attributes["suggestion_ids"] == ["b", "a"]
+    assert (attributes["suggestion_count"], attributes["new_suggestion_count"]) == (2, 1)
+    assert (attributes["entities_processed_count"], attributes["warning_count"]) == (2, 1)
+    assert attributes["revision"] == async_get_suggestion_store(hass).revision
+    assert not {"suggestions", "description", "yaml_block", "entities_processed", "warnings"} & attributes.keys()
+
+
+def test_full_payload_attributes_are_not_recorded():
+    history = [{"id": "a", "title": "Hallway light", "status": "new"}]
+    coordinator = SimpleNamespace(data=coordinator_data(history), last_update_success=True)
+    sensor = make_sensor(
+        sensor_module.AISuggestionsSensor, SENSOR_KEY_SUGGESTIONS, coordinator, make_entry(), FakeHass()
+    )
+
+    sensor._handle_coordinator_update()
+    attributes = sensor.extra_state_attributes
+    large = {"suggestions", "description", "yaml_block", "entities_processed", "suggestion", "warnings"}
+
+    assert large <= attributes.keys()
+    assert large <= sensor._unrecorded_attributes
+    # The compact ID list can grow with the history, so it is not recorded either.
+    assert "suggestion_ids" in sensor._unrecorded_attributes
+    assert {"warnings", "response_metadata"} <= sensor_module.AIProviderStatusSensor._unrecorded_attributes
+
+
+def test_compact_sensor_refreshes_on_store_events():
+    hass = FakeHass()
+    history = [{"id": "a", "title": "Hallway light", "status": "new"}]
+    coordinator = SimpleNamespace(data=coordinator_data(history), last_update_success=True)
+    sensor = make_sensor(
+        sensor_module.AISuggestionsSensor,
+        SENSOR_KEY_SUGGESTIONS,
+        coordinator,
+        make_entry(**{CONF_COMPACT_ATTRIBUTES: True}),
+        hass,
+    )
+    store = async_get_suggestion_store(hass)
+
+    async def run():
+        await sensor.async_added_to_hass()
+        try:
+            await store.async_add_suggestions([{"id": "a", "title": "Hallway light", "status": "new"}])
+            await store.async_add_suggestions([{"id": "b", "title": "Porch light", "status": "new"}])
+            await store.async_update_status("a", "accepted")
+            await asyncio.gather(*hass.tasks)
+        finally:
+            for remove in sensor._on_remove:
+                remove()
+
+    asyncio.run(run())
+    attributes = sensor.extra_state_attributes
+
+    assert attributes["suggestion_ids"] == ["b", "a"]
+    assert (attributes["suggestion_count"], attributes["new_suggestion_count"]) == (2, 1)
+    assert attributes["revision"] == store.revision
+    assert sensor.written_states == len(hass.tasks) == 3
+
+    # The next coordinator update replaces the event-driven history again.
+    sensor._handle_coordinator_update()
+    assert sensor.extra_state_attributes["suggestion_ids"] == ["a"]
+
+
+def test_provider_status_reports_an_open_circuit():
+    now = [1000.0]
+    breaker = CircuitBreaker("OpenAI", clock=lambda: now[0], wall_clock=lambda: now[0], jitter=lambda: 1.0)
+    coordinator = SimpleNamespace(
+        data={"request_succeeded": True, "provider": "OpenAI"}, last_update_success=True, circuit_breaker=breaker
+    )
+    sensor = make_sensor(
+        sensor_module.AIProviderStatusSensor, SENSOR_KEY_STATUS, coordinator, make_entry(), FakeHass()
+    )
+
+    assert sensor.native_value == PROVIDER_STATUS_CONNECTED
+    assert sensor.extra_state_attributes["circuit_state"] == "closed"
+
+    breaker.record_failure(30, rate_limited=True)
+    sensor._handle_coordinator_update()
+
+    assert sensor.native_value == PROVIDER_STATUS_CIRCUIT_OPEN
+    assert sensor.extra_state_attributes["circuit_state"] == "open"
+    assert sensor.extra_state_attributes["consecutive_failures"] == 1
+    assert sensor.extra_state_attributes["circuit_retry_at"] is not None
+
+    now[0] += 31
+    sensor._handle_coordinator_update()
+
+    assert sensor.native_value == PROVIDER_STATUS_CONNECTED
+    assert sensor.extra_state_attributes["circuit_state"] == "half_open"
@@ -0,0 +1,86 @@
+"""Tests for entity sharding and suggestion merging."""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def load_module(name: str):
+    path = Path(__file__).resolve().parents[1] / "custom_components" / "ai_automation_suggester" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+sharding = load_module("sharding")
+
+
+def item(entity_id, group="", tokens=10):
+    return sharding.ShardItem(entity_id, group, tokens)
+
+
+def test_groups_stay_together_when_they_fit_an_empty_shard():
+    items = [
+        item("light.kitchen", "kitchen", 30),
+        item("sensor.kitchen", "kitchen", 30),
+        item("light.bedroom", "bedroom", 40),
+        item("sensor.bedroom", "bedroom", 40),
+    ]
+
+    shards, deferred = sharding.partition_entities(items, capacity=100, max_entities=10, max_shards=4)
+
+    assert shards == [["light.bedroom", "sensor.bedroom"], ["light.kitchen", "sensor.kitchen"]]
+    assert deferred == []
+
+
+def test_large_groups_are_split_and_limits_defer_the_rest():
+    items = [item(f"sensor.s{index}", "all", 40) for index in range(7)]
+    items.append(item("sensor.huge", "all", 500))
+
+    shards, deferred = sharding.partition_entities(items, capacity=100, max_entities=10, max_shards=2)
+
+    assert shards == [["sensor.s0", "sensor.s1"], ["sensor.s2", "sensor.s3"]]
+    assert deferred == ["sensor.huge", "sensor.s4", "sensor.s5", "sensor.s6"]
+
+
+def test_entity_limit_caps_each_shard():
+    shards, _ = sharding.partition_entities(
+        [item(f"light.l{index}") for index in range(5)], capacity=1000, max_entities=2, max_shards=8
+    )
+
+    assert [len(shard) for shard in shards] == [2, 2, 1]
+
+
+def test_first_shard_capacity_leaves_room_for_context():
+    items = [item(f"sensor.s{index}", "all", 40) for index in range(5)]
+
+    shards, deferred = sharding.partition_entities(
+        items, capacity=100, max_entities=10, max_shards=4, first_capacity=50
+    )
+
+    assert shards == [["sensor.s0"], ["sensor.s1", "sensor.s2"], ["sensor.s3", "sensor.s4"]]
+    assert deferred == []
+
+
+def test_shard_group_keys():
+    assert sharding.shard_group("light.kitchen", "Kitchen", "area") == "kitchen"
+    assert sharding.shard_group("light.kitchen", None, "domain") == "light"
+    assert sharding.shard_group("light.kitchen", "Kitchen", "size") == ""
+
+
+def test_merge_deduplicates_and_ranks_by_agreement_then_confidence():
+    shared = {"title": "Night light", "yamlCode": "alias: night\ntrigger: []", "confidence": 0.4, "warnings": []}
+    batches = [
+        [{"title": "Solo", "yamlCode": "alias: solo", "confidence": 0.9, "warnings": []}, shared],
+        [{**shared, "title": "Night light (again)", "yamlCode": "alias:   night\n trigger: []"}],
+        [{"title": "Plain", "yamlCode": None, "confidence": None, "warnings": ["x"]}],
+    ]
+
+    merged = sharding.merge_suggestions(batches)
+
+    assert [suggestion["title"] for suggestion in merged] == ["Night light", "Solo", "Plain"]
@@ -12,6 +12,7 @@ class MemoryStore:
     def __init__(self, *args):
         self.data = None
         self.saved = []
+        self.delayed = None
 
     async def async_load(self):
         await asyncio.sleep(0)
@@ -19,12 +20,22 @@ class MemoryStore:
 
     async def async_save(self, data):
         await asyncio.sleep(0)
-        self.data = {"suggestions": [dict(item) for item in data["suggestions"]]}
+        self.data = {"suggestions": [dict(item) for item in data["suggestions"]], "runs": dict(data.get("runs", {}))}
+        self.saved.append(self.data)
+        self.delayed = None
+
+    def async_delay_save(self, data_func, delay=0):
+        self.delayed = (data_func, delay)
+
+    def fire_delayed(self):
+        data_func, _delay = self.delayed
+        self.delayed = None
+        self.data = data_func()
         self.saved.append(self.data)
 
 
 def make_store(monkeypatch):
-    monkeypatch.setattr(store_module, "Store", MemoryStore)
+    monkeypatch.setattr(store_module, "_HistoryStore", MemoryStore)
     return store_module.SuggestionStore(SimpleNamespace())
 
 
@@ -56,3 +67,165 @@ def test_status_update_and_clear_are_persisted(monkeypatch):
 
     assert updated["status"] == "accepted"
     assert history == []
+
+
+def test_status_update_replaces_only_the_target_record(monkeypatch):
+    suggestion_store = make_store(monkeypatch)
+
+    async def run():
+        await suggestion_store.async_add_suggestions(
+            [{"id": "one", "status": "new"}, {"id": "two", "status": "new", "yamlCode": "alias: two"}]
+        )
+        before = await suggestion_store.async_list()
+        updated = await suggestion_store.async_update_status("one", "dismissed")
+        after = await suggestion_store.async_list()
+        return before, updated, after, await suggestion_store.async_get("one")
+
+    before, updated, after, fetched = asyncio.run(run())
+
+    assert before[0]["status"] == "new"
+    assert updated is fetched
+    assert after[0] is updated
+    assert after[1] is before[1]
+    assert asyncio.run(suggestion_store.async_update_status("missing", "accepted")) is None
+
+
+def test_loaded_history_is_indexed_and_legacy_records_get_ids(monkeypatch):
+    suggestion_store = make_store(monkeypatch)
+    suggestion_store._store.data = {"suggestions": [{"id": "one"}, {"title": "legacy"}, {"id": "one"}]}
+
+    history = asyncio.run(suggestion_store.async_list())
+
+    assert [item.get("title") for item in history] == [None, "legacy"]
+    assert history[1]["id"]
+    assert asyncio.run(suggestion_store.async_get(history[1]["id"])) is history[1]
+
+
+def test_shortest_configured_save_delay_applies_until_its_entry_unloads(monkeypatch):
+    suggestion_store = make_store(monkeypatch)
+
+    suggestion_store.configure_save_delay("slow", 30)
+    suggestion_store.configure_save_delay("fast", 5)
+    assert suggestion_store.save_delay == 5
+
+    # Reloading with a longer window replaces the old one.
+    suggestion_store.unconfigure_save_delay("fast")
+    assert suggestion_store.save_delay == 30
+    suggestion_store.configure_save_delay("fast", 60)
+    assert suggestion_store.save_delay == 30
+
+    suggestion_store.unconfigure_save_delay("slow")
+    suggestion_store.unconfigure_save_delay("fast")
+    assert suggestion_store.save_delay == store_module.DEFAULT_HISTORY_SAVE_DELAY
+
+
+def test_delayed_saves_coalesce_and_flush(monkeypatch):
+    suggestion_store = make_store(monkeypatch)
+    suggestion_store.save_delay = 5
+    backing = suggestion_store._store
+
+    async def run():
+        await suggestion_store.async_add_suggestions([{"id": "one"}, {"id": "two"}], retention=10)
+        for suggestion_id in ("one", "two"):
+            await suggestion_store.async_update_status(suggestion_id, "dismissed")
+        in_memory = await suggestion_store.async_list()
+        saved_before_flush = list(backing.saved)
+        await suggestion_store.async_flush()
+        return in_memory, saved_before_flush
+
+    in_memory, saved_before_flush = asyncio.run(run())
+
+    assert [item["status"] for item in in_memory] == ["dismissed", "dismissed"]
+    assert saved_before_flush == []
+    assert len(backing.saved) == 1
+    assert [item["status"] for item in backing.data["suggestions"]] == ["dismissed", "dismissed"]
+    assert backing.delayed is None
+
+    # A delayed write that already ran leaves nothing for the next flush.
+    asyncio.run(suggestion_store.async_update_status("one", "accepted"))
+    backing.fire_delayed()
+    asyncio.run(suggestion_store.async_flush())
+    assert len(backing.saved) == 2
+    assert backing.data["suggestions"][0]["status"] == "accepted"
+
+
+def test_run_context_is_stored_once_and_pruned_with_its_suggestions(monkeypatch):
+    suggestion_store = make_store(monkeypatch)
+    first_run = {"id": "run-1", "entities_processed": ["light.a", "light.b"], "response_metadata": {}}
+    second_run = {"id": "run-2", "entities_processed": ["light.c"], "response_metadata": {}}
+
+    async def run():
+        await suggestion_store.async_add_suggestions(
+            [{"id": "one", "run_id": "run-1"}, {"id": "two", "run_id": "run-1"}], retention=2, run=first_run
+        )
+        await suggestion_store.async_add_suggestions(
+            [{"id": "three", "run_id": "run-2"}, {"id": "four", "run_id": "run-2"}], retention=2, run=second_run
+        )
+        return await suggestion_store.async_get_run("run-1"), await suggestion_store.async_get_run("run-2")
+
+    dropped, kept = asyncio.run(run())
+
+    assert dropped is None
+    assert kept["entities_processed"] == ["light.c"]
+    assert suggestion_store._store.data["runs"] == {"run-2": second_run}
+    assert "entities_processed" not in suggestion_store._store.data["suggestions"][0]
+
+
+def test_v1_history_migration_groups_context_by_generation():
+    legacy = {
+        "suggestions": [
+            {
+                "id": "one",
+                "provider": "OpenAI",
+                "model": "gpt-5.5",
+                "created_at": "2026-07-11T12:00:00",
+                "entities_processed": ["light.hall"],
+                "response_metadata": {"finish_reason": "stop"},
+            },
+            {
+                "id": "two",
+                "provider": "OpenAI",
+                "model": "gpt-5.5",
+                "created_at": "2026-07-11T12:00:00",
+                "entities_processed": ["light.hall"],
+                "response_metadata": {"finish_reason": "stop"},
+            },
+            {"id": "three", "provider": "Ollama", "created_at": "2026-07-10T08:00:00", "entities_processed": []},
+            {"id": "manual"},
+        ]
+    }
+
+    migrated = store_module.migrate_v1_history(legacy)
+
+    one, two, three, manual = migrated["suggestions"]
+    assert one["run_id"] == two["run_id"] != three["run_id"]
+    assert "run_id" not in manual
+    assert all("entities_processed" not in record for record in migrated["suggestions"])
+    assert migrated["runs"][one["run_id"]]["entities_processed"] == ["light.hall"]
+    assert migrated["runs"][one["run_id"]]["response_metadata"] == {"finish_reason": "stop"}
+    assert migrated["runs"][three["run_id"]]["model"] is None
+    assert "entities_processed" in legacy["suggestions"][0]
+
+
+def test_revision_changes_only_when_history_changes(monkeypatch):
+    suggestion_store = make_store(monkeypatch)
+
+    async def run():
+        revisions = [suggestion_store.revision]
+        await suggestion_store.async_list()
+        revisions.append(suggestion_store.revision)
+        await suggestion_store.async_list()
+        revisions.append(suggestion_store.revision)
+        await suggestion_store.async_add_suggestions([{"id": "one"}], retention=10)
+        revisions.append(suggestion_store.revision)
+        await suggestion_store.async_update_status("missing", "accepted")
+        revisions.append(suggestion_store.revision)
+        await suggestion_store.async_update_status("one", "accepted")
+        revisions.append(suggestion_store.revision)
+        return revisions
+
+    initial, loaded, unchanged, added, missing, updated = asyncio.run(run())
+
+    assert loaded == unchanged
+    assert len({initial, loaded, added, updated}) == 4
+    assert missing == added
@@ -0,0 +1,133 @@
+"""Tests for streamed provider response decoding."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from custom_components.ai_automation_suggester.streaming import (
+    AnthropicStream,
+    ChatCompletionStream,
+    GoogleStream,
+    OllamaStream,
+    ResponsesStream,
+    StreamDecoder,
+    iter_ndjson,
+    iter_sse_json,
+)
+
+
+class FakeContent:
+    def __init__(self, lines):
+        self._lines = [line.encode() for line in lines]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for line in self._lines:
+            yield line
+
+
+class FakeStreamResponse:
+    def __init__(self, lines):
+        self.content = FakeContent(lines)
+
+
+def sse(*payloads):
+    lines = []
+    for payload in payloads:
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        lines.extend([f"data: {data}\n", "\n"])
+    return lines
+
+
+def decode(decoder, lines):
+    async def run():
+        events = iter_ndjson if decoder.ndjson else iter_sse_json
+        return [decoder.feed(payload) async for payload in events(FakeStreamResponse(lines))]
+
+    return asyncio.run(run())
+
+
+def test_chat_completion_stream_collects_deltas_and_metadata():
+    decoder = ChatCompletionStream("OpenAI")
+    lines = [": keep-alive\n", "\n"] + sse(
+        {"choices": [{"delta": {"content": '{"sugg'}}]},
+        {"choices": [{"delta": {"content": 'estions": []}'}, "finish_reason": "stop"}]},
+        {"choices": [], "usage": {"total_tokens": 12}},
+        "[DONE]",
+    )
+
+    deltas = decode(decoder, lines)
+
+    assert deltas == ['{"sugg', 'estions": []}', ""]
+    assert decoder.text == '{"suggestions": []}'
+    assert decoder.metadata["finish_reason"] == "stop"
+    assert decoder.metadata["usage"] == {"total_tokens": 12}
+
+
+def test_chat_completion_stream_falls_back_to_reasoning_content():
+    decoder = ChatCompletionStream("LocalAI")
+    decode(decoder, sse({"choices": [{"delta": {"reasoning_content": "answer"}}]}))
+
+    assert decoder.text == "answer"
+
+
+def test_anthropic_google_responses_and_ollama_streams():
+    anthropic = AnthropicStream("Anthropic")
+    decode(
+        anthropic,
+        sse(
+            {"type": "message_start", "message": {"usage": {"input_tokens": 5}}},
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "hi"}},
+            {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": 2}},
+        ),
+    )
+    google = GoogleStream("Google")
+    decode(
+        google,
+        sse(
+            {"candidates": [{"content": {"parts": [{"text": "a"}]}}]},
+            {"candidates": [{"content": {"parts": [{"text": "b"}]}, "finishReason": "STOP"}], "usageMetadata": {"x": 1}},
+        ),
+    )
+    responses = ResponsesStream("OpenAI Responses")
+    decode(
+        responses,
+        sse(
+            {"type": "response.output_text.delta", "delta": "ok"},
+            {"type": "response.completed", "response": {"status": "completed", "usage": {"total_tokens": 3}}},
+        ),
+    )
+    ollama = OllamaStream("Ollama")
+    decode(
+        ollama,
+        [
+            json.dumps({"message": {"content": "x"}, "done": False}) + "\n",
+            json.dumps({"message": {"content": "y"}, "done": True, "done_reason": "stop", "eval_count": 4}) + "\n",
+        ],
+    )
+
+    assert (anthropic.text, anthropic.metadata) == (
+        "hi",
+        {"stop_reason": "end_turn", "usage": {"input_tokens": 5, "output_tokens": 2}},
+    )
+    assert (google.text, google.metadata["finish_reason"]) == ("ab", "STOP")
+    assert (responses.text, responses.metadata["status"]) == ("ok", "completed")
+    assert (ollama.text, ollama.metadata) == ("xy", {"done_reason": "stop", "usage": 4})
+
+
+def test_stream_error_event_raises():
+    with pytest.raises(ValueError, match="overloaded"):
+        decode(AnthropicStream("Anthropic"), sse({"type": "error", "error": {"message": "overloaded"}}))
+
+
+def test_decoder_without_delta_cannot_be_instantiated():
+    class Incomplete(StreamDecoder):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("Test")
@@ -326,4 +326,139 @@ def test_invalid_confidence_is_ignored_with_warning():
     )
 
     assert parsed[0]["confidence"] is None
-    assert any("confidence outside" in warning for warning in parsed[0]["warnings"])
\ No newline at end of file
+    assert any("confidence outside" in warning for warning in parsed[0]["warnings"])
+
+def make_stream_parser(**overrides):
+    options = {
+        "provider": "OpenAI",
+        "model": "gpt-5.5",
+        "created_at": datetime(2026, 7, 11, 12, 0, 0),
+        "entities_processed": ["light.hall"],
+        **overrides,
+    }
+    return suggestions.StreamingSuggestionParser(**options)
+
+
+def without_ids(records):
+    return [{key: value for key, value in record.items() if key not in {"id", "run_id"}} for record in records]
+
+
+def test_stream_parser_emits_each_object_when_it_closes():
+    raw = (
+        '```json\n{"suggestions": [{"title": "First {braces}", "yaml": "alias: a\\ntriggers: []\\nactions: []"},'
+        ' {"title": "Second \\"quoted\\"", "yaml": "alias: b\\ntriggers: []\\nactions: []"}]}\n```'
+    )
+    parser = make_stream_parser()
+    emitted = []
+    for index in range(0, len(raw), 5):
+        emitted.extend((index, item["title"]) for item in parser.feed(raw[index : index + 5]))
+
+    assert [title for _, title in emitted] == ["First {braces}", 'Second "quoted"']
+    assert emitted[0][0] < raw.index("Second")
+
+    buffered = suggestions.parse_suggestion_response(
+        raw,
+        provider="OpenAI",
+        model="gpt-5.5",
+        created_at=datetime(2026, 7, 11, 12, 0, 0),
+        entities_processed=["light.hall"],
+        response_metadata={"finish_reason": "stop"},
+    )
+    streamed = parser.close({"finish_reason": "stop"})
+    assert without_ids(streamed) == without_ids(buffered)
+    assert [record["id"] for record in streamed] == [item["id"] for item in parser.items]
+
+
+def test_stream_parser_repairs_control_characters_and_trailing_commas():
+    raw = '{"suggestions": [{"title": "Tab\there", "yaml": "alias: x\ntriggers: []\nactions: []", "warnings": [],},]}'
+    parser = make_stream_parser()
+    for char in raw:
+        parser.feed(char)
+
+    records = parser.close()
+
+    assert parser.failed == 0
+    assert records[0]["title"] == "Tab\there"
+    assert records[0]["yamlCode"] == "alias: x\ntriggers: []\nactions: []"
+    assert suggestions.PARSE_REPAIR_WARNING in records[0]["warnings"]
+
+
+def test_stream_parser_closes_object_truncated_by_output_limit():
+    raw = '{"suggestions": [{"title": "Complete", "yaml": "alias: a"}, {"title": "Cut off", "yaml": "alias: b\\ntrig'
+    parser = make_stream_parser()
+    parser.feed(raw)
+
+    records = parser.close({"finish_reason": "length"})
+
+    assert [record["title"] for record in records] == ["Complete", "Cut off"]
+    assert records[1]["yamlCode"] == "alias: b\ntrig"
+    assert suggestions.PARSE_REPAIR_WARNING in records[1]["warnings"]
+    assert any("length finish reason" in warning for warning in records[0]["warnings"])
+
+
+def test_unrecoverable_stream_object_falls_back_to_loose_parsing():
+    parser = make_stream_parser()
+    parser.feed('{"suggestions": [{"title": "Broken" "yaml": "alias: a"}]}')
+
+    assert parser.close() == []
+    assert parser.failed == 1
+
+
+def test_stream_parser_only_emits_objects_from_the_suggestions_array():
+    raw = (
+        '{"notes": [{"a": 1}], "meta": {"suggestions": [{"title": "Nested"}]}, '
+        '"suggestions": [{"title": "Real", "yaml": "alias: a", "extra": [{"b": 2}]}]}'
+    )
+    for chunk_size in (1, 7, len(raw)):
+        parser = make_stream_parser()
+        for index in range(0, len(raw), chunk_size):
+            parser.feed(raw[index : index + chunk_size])
+
+        records = parser.close()
+
+        assert [record["title"] for record in records] == ["Real"]
+        assert records[0]["yamlCode"] == "alias: a"
+
+
+def test_stream_parser_skips_brackets_in_prose_before_the_json():
+    raw = 'Here you go [see below: {"suggestions": [{"title": "Porch light", "yaml": "alias: Porch"}]}'
+
+    parsed = suggestions.parse_suggestion_response(
+        raw,
+        provider="OpenAI",
+        model="gpt-5.5",
+        created_at=datetime(2026, 7, 11, 12, 0, 0),
+        entities_processed=[],
+    )
+
+    assert [record["title"] for record in parsed] == ["Porch light"]
+    assert parsed[0]["yamlCode"] == "alias: Porch"
+
+
+def test_stream_object_without_content_falls_back_to_buffered_parsing():
+    parser = make_stream_parser()
+    parser.feed('[{"a": 1}]')
+
+    assert parser.close() == []
+    assert parser.failed == 1
+
+
+def test_loose_parser_extracts_all_fields_per_segment():
+    raw = r"""
+    {"suggestions": [
+        {"title": "Hall "night" light", "description": "Dims \"softly\".",
+         "yaml": "alias: Hall\ntriggers: []", "entities_used": ["light.hall"], "confidence": 0.7}
+        {"title": "Porch", "yaml": "alias: Porch", "warnings": ["check ] bracket"], "script_ids_used": ["script.a"]}
+    ]}
+    """
+
+    items = suggestions._try_loose_structured_items(raw)
+
+    assert [item["title"] for item in items] == ["Hall", "Porch"]
+    assert items[0]["description"] == 'Dims "softly".'
+    assert items[0]["yaml"] == "alias: Hall\ntriggers: []"
+    assert items[0]["entities_used"] == ["light.hall"]
+    assert items[0]["confidence"] == 0.7
+    assert items[1]["warnings"] == ["check ] bracket"]
+    assert items[1]["script_ids_used"] == ["script.a"]
+    assert "confidence" not in items[1]
@@ -0,0 +1,163 @@
+"""Tests for offline prompt token estimation."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.ai_automation_suggester.token_utils import (
+    TOKENIZER_PROFILES,
+    TokenCounter,
+    cached_input_tokens,
+    get_token_counter,
+    tokenizer_family,
+    usage_total_tokens,
+)
+
+ENTITY_BLOCK = (
+    "Entity: light.living_room_ceiling\n"
+    "Friendly Name: Living Room Ceiling\n"
+    "Domain: light\n"
+    "State: on\n"
+    "Attributes: {'supported_color_modes': ['color_temp', 'hs'], 'color_mode': 'color_temp', "
+    "'brightness': 180, 'color_temp_kelvin': 2700, 'friendly_name': 'Living Room Ceiling', "
+    "'supported_features': 40}\n"
+    "Area: Living Room\n"
+    "Device Info:\n"
+    "  Manufacturer: Signify Netherlands B.V.\n"
+    "  Model: Hue white ambiance A19 (LTA009)\n"
+    "  Device Name: Living Room Ceiling\n"
+    "  Device ID: 5f1c2d7e9a0b4c3d8e6f7a1b2c3d4e5f\n"
+    "Last Changed: 2026-07-11 18:42:07.512345+00:00\n"
+    "Last Updated: 2026-07-11 18:42:07.512345+00:00\n"
+    "---\n"
+)
+AUTOMATION_YAML = (
+    "alias: Turn on the porch light at sunset\n"
+    "description: Switches the porch light on when the sun sets and someone is home.\n"
+    "trigger:\n"
+    "  - platform: sun\n"
+    "    event: sunset\n"
+    "    offset: \"-00:15:00\"\n"
+    "condition:\n"
+    "  - condition: state\n"
+    "    entity_id: group.family\n"
+    "    state: home\n"
+    "action:\n"
+    "  - service: light.turn_on\n"
+    "    target:\n"
+    "      entity_id: light.porch\n"
+    "    data:\n"
+    "      brightness_pct: 60\n"
+    "mode: single\n"
+)
+GERMAN_BLOCK = (
+    "Entity: sensor.kuche_temperatur\n"
+    "Friendly Name: Küche Temperatur\n"
+    "Domain: sensor\n"
+    "State: 21.4\n"
+    "Attributes: {'state_class': 'measurement', 'unit_of_measurement': '°C', "
+    "'device_class': 'temperature', 'friendly_name': 'Küche Temperatur'}\n"
+    "Area: Küche und Eßzimmer\n"
+    "---\n"
+)
+RUSSIAN_BLOCK = (
+    "Entity: switch.gostinaia_svet\n"
+    "Friendly Name: Гостиная свет над диваном\n"
+    "Domain: switch\n"
+    "State: off\n"
+    "Area: Гостиная\n"
+    "---\n"
+)
+CHINESE_BLOCK = (
+    "Entity: climate.ke_ting_kong_tiao\n"
+    "Friendly Name: 客厅空调\n"
+    "Domain: climate\n"
+    "State: cool\n"
+    "Attributes: {'current_temperature': 27, 'temperature': 24, 'friendly_name': '客厅空调'}\n"
+    "Area: 客厅\n"
+    "---\n"
+)
+
+# Token counts from the real tokenizers, without BOS or other special tokens:
+# tiktoken cl100k_base for OpenAI, the Claude tokenizer Anthropic published
+# (newer Claude models use an unpublished one), the Llama 3 tokenizer.model,
+# Mistral's tekken_240911.json, and the Gemma 4 vocabulary Gemini shares. The
+# default profile is held to cl100k_base.
+REFERENCE_TOKENS = {
+    "openai": {"entity": 203, "yaml": 105, "german": 74, "russian": 40, "chinese": 63},
+    "anthropic": {"entity": 214, "yaml": 107, "german": 88, "russian": 48, "chinese": 69},
+    "google": {"entity": 253, "yaml": 122, "german": 77, "russian": 39, "chinese": 63},
+    "llama": {"entity": 203, "yaml": 105, "german": 74, "russian": 36, "chinese": 58},
+    "mistral": {"entity": 247, "yaml": 112, "german": 77, "russian": 38, "chinese": 69},
+    "default": {"entity": 203, "yaml": 105, "german": 74, "russian": 40, "chinese": 63},
+}
+CORPUS = {
+    "entity": ENTITY_BLOCK,
+    "yaml": AUTOMATION_YAML,
+    "german": GERMAN_BLOCK,
+    "russian": RUSSIAN_BLOCK,
+    "chinese": CHINESE_BLOCK,
+}
+# Prompt budgets must never overflow the context window, so estimates may
+# overshoot the real count by up to this factor but never undershoot it.
+MAX_OVERESTIMATE = 1.25
+
+
+@pytest.mark.parametrize("family", sorted(TOKENIZER_PROFILES))
+def test_estimates_stay_within_tolerance_of_reference_tokenizers(family):
+    counter = TokenCounter(TOKENIZER_PROFILES[family])
+
+    for name, text in CORPUS.items():
+        reference = REFERENCE_TOKENS[family][name]
+        estimate = counter.count(text)
+        assert reference <= estimate <= reference * MAX_OVERESTIMATE, (name, estimate, reference)
+
+
+def test_identifiers_and_timestamps_cost_more_than_plain_words():
+    counter = get_token_counter("OpenAI", "gpt-4o-mini")
+
+    plain = "Turn on the hall light when someone arrives home"
+    timestamp = "Last Changed: 2026-07-11 12:00:00+00:00\n"
+
+    assert counter.count(plain) <= len(plain) // 4
+    assert counter.count(timestamp) > len(timestamp) // 4
+
+
+def test_non_latin_text_is_not_undercounted():
+    counter = get_token_counter("Anthropic", "claude-sonnet-4-6")
+
+    assert counter.count("客厅灯光控制") >= 6
+    assert counter.count("Гостиная свет") > len("Гостиная свет") // 4
+
+
+def test_counts_are_cached_by_text():
+    counter = get_token_counter("Ollama", "llama3.1")
+
+    first = counter.count("sensor.living_room_temperature")
+    second = counter.count("sensor.living_room_temperature")
+
+    assert first == second
+    assert counter.stats()["hits"] == 1
+
+
+def test_router_models_use_model_name_family():
+    assert tokenizer_family("OpenRouter", "anthropic/claude-sonnet-4-6") == "anthropic"
+    assert tokenizer_family("Ollama", "mistral-nemo") == "mistral"
+    assert tokenizer_family("LocalAI", "phi4") == "default"
+
+
+def test_cached_input_tokens_reads_each_provider_usage_shape():
+    assert cached_input_tokens({"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 1536}}) == 1536
+    assert cached_input_tokens({"input_tokens_details": {"cached_tokens": 1024}}) == 1024
+    assert cached_input_tokens({"input_tokens": 40, "cache_read_input_tokens": 1800}) == 1800
+    assert cached_input_tokens({"promptTokenCount": 900, "cachedContentTokenCount": 512}) == 512
+    assert cached_input_tokens({"prompt_tokens": 10}) is None
+    assert cached_input_tokens(None) is None
+
+
+def test_usage_total_tokens_reads_each_provider_usage_shape():
+    assert usage_total_tokens({"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}) == 15
+    assert usage_total_tokens({"input_tokens": 40, "output_tokens": 20, "cache_read_input_tokens": 100}) == 160
+    assert usage_total_tokens({"promptTokenCount": 9, "totalTokenCount": 12}) == 12
+    assert usage_total_tokens({}) is None
+    assert usage_total_tokens(42) is None